@@ -0,0 +1,97 @@
+# backend/app/batch.py
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from . import schemas, columnar, metrics, serialize
+from .snapshot import RosterSnapshot
+
+# Matching many briefs in one call. All briefs share one roster snapshot and
+# the creator-side work that doesn't depend on the brief (performance scores,
+# platform membership); the hard constraints are evaluated for the whole
+# brief x creator matrix at once.
+#
+# Large batches can be fanned out to a process pool. Set MATCH_BATCH_WORKERS
+# to the number of worker processes (0, the default, keeps everything
+# in-process).
+
+BATCH_WORKERS = int(os.environ.get("MATCH_BATCH_WORKERS", "0"))
+PARALLEL_MIN_BRIEFS = int(os.environ.get("MATCH_BATCH_PARALLEL_MIN", "32"))
+CHUNK_SIZE = 16 # Briefs per constraint-matrix block; bounds the (B, N) mask memory
+
+
+def _match_chunk(briefs: List[schemas.BrandBrief], roster: RosterSnapshot, limit: Optional[int], performance,
+                 fields: Optional[Tuple[str, ...]] = None) -> List[str]:
+    cols = roster.columns
+    with metrics.stage("constraint_matrix"):
+        budget_ok, platform_ok, safety_ok = columnar.constraint_matrix(briefs, cols)
+    results = []
+    for b, brief in enumerate(briefs):
+        masks = (budget_ok[b], platform_ok[b], safety_ok[b])
+        scores = columnar.score_brief(brief, cols, roster.index, masks=masks, performance=performance)
+        scores, order, promoted = columnar.select(brief, cols, limit=limit, scores=scores)
+        with metrics.stage("serialize"):
+            items = serialize.matches_json(brief, cols, scores, order, roster.fragments, promoted, fields)
+            results.append(serialize.json_array(items))
+    return results
+
+
+def match_batch_local(briefs: List[schemas.BrandBrief], roster: RosterSnapshot, limit: Optional[int] = None,
+                      fields: Optional[Tuple[str, ...]] = None) -> List[str]:
+    """Matches every brief against the roster in this process."""
+    performance = roster.performance # Shared by every brief
+    results = []
+    for start in range(0, len(briefs), CHUNK_SIZE):
+        results.extend(_match_chunk(briefs[start:start + CHUNK_SIZE], roster, limit, performance, fields))
+    return results
+
+
+# --- Process pool ---
+# Each worker receives the roster once, when the pool is created, and keeps
+# it until a newer snapshot is published.
+
+_worker_roster: Optional[RosterSnapshot] = None
+
+
+def _init_worker(roster: RosterSnapshot):
+    global _worker_roster
+    _worker_roster = roster
+
+
+def _worker_match(briefs: List[schemas.BrandBrief], limit: Optional[int], fields: Optional[Tuple[str, ...]]):
+    return match_batch_local(briefs, _worker_roster, limit, fields)
+
+
+_pool_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_roster: Optional[RosterSnapshot] = None
+
+
+def _get_pool(roster: RosterSnapshot) -> ProcessPoolExecutor:
+    global _pool, _pool_roster
+    with _pool_lock:
+        if _pool is None or _pool_roster is not roster:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(BATCH_WORKERS, initializer=_init_worker, initargs=(roster,))
+            _pool_roster = roster
+        return _pool
+
+
+def match_batch(briefs: List[schemas.BrandBrief], roster: RosterSnapshot, limit: Optional[int] = None,
+                fields: Optional[Tuple[str, ...]] = None) -> List[str]:
+    """Ranked results for each brief, in the same order as `briefs`, as JSON arrays of MatchedCreator."""
+    if BATCH_WORKERS <= 1 or len(briefs) < PARALLEL_MIN_BRIEFS:
+        return match_batch_local(briefs, roster, limit, fields)
+
+    pool = _get_pool(roster)
+    per_worker = -(-len(briefs) // BATCH_WORKERS) # Ceiling division
+    futures = [
+        pool.submit(_worker_match, briefs[start:start + per_worker], limit, fields)
+        for start in range(0, len(briefs), per_worker)
+    ]
+    results = []
+    for future in futures:
+        results.extend(future.result())
+    return results
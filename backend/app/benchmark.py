@@ -0,0 +1,382 @@
+# backend/app/benchmark.py
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List, Optional
+import numpy as np
+from . import synthetic
+
+# Benchmarks for the match path, on synthetic rosters of any size.
+#
+#   python -m app.benchmark --sizes 10000,100000 --save baseline.json
+#   python -m app.benchmark --sizes 10000,100000 --baseline baseline.json
+#
+# Every stage is timed separately: building the roster columns and indexes,
+# each scoring step for a mix of briefs, the scalar reference scorer in
+# scoring.py, database loads and the /api/match endpoint itself. The
+# per-creator heap size of each creator representation is reported too. Results are
+# written as JSON; with --baseline the run is compared against an earlier
+# one and the exit status is 1 if any stage got slower than the tolerance.
+#
+# Database stages run against a scratch SQLite database in a temp directory
+# (or --database-url), never against taag.db. App modules that touch the
+# database are imported only after DATABASE_URL has been set.
+
+DEFAULT_SIZES = "10000,100000"
+DEFAULT_TOLERANCE = 0.25 # A stage regressed if its median is 25% slower...
+MIN_DELTA_MS = 0.05 # ...and by more than this, so sub-50µs noise isn't flagged
+
+
+class Timings:
+    """Collects wall-clock samples per stage, plus plain counters (e.g. candidate rows)."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.counts: Dict[str, List[int]] = defaultdict(list)
+
+    @contextlib.contextmanager
+    def time(self, stage: str):
+        start = time.perf_counter()
+        yield
+        self.samples[stage].append(time.perf_counter() - start)
+
+    def summary(self) -> Dict[str, dict]:
+        result = {}
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[stage] = {
+                "runs": len(samples),
+                "median_ms": round(statistics.median(ordered) * 1000, 4),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+                "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+                "min_ms": round(ordered[0] * 1000, 4),
+            }
+        for name, values in self.counts.items():
+            result[name] = {"runs": len(values), "median": statistics.median(values), "max": max(values)}
+        return result
+
+
+# --- Stages ---
+
+def bench_in_memory(timings: Timings, creators, briefs, limit: Optional[int], repeat: int):
+    """Column / index builds and every scoring stage, without the database."""
+    from . import columnar, indexes, serialize, records
+    from .scoring import WEIGHTS
+
+    for _ in range(repeat):
+        with timings.time("build.columns"):
+            cols = columnar.CreatorColumns(creators)
+        # What the roster snapshot holds: compact records, and columns encoded from them
+        with timings.time("build.records"):
+            compact = [records.CreatorRecord.from_creator(c) for c in creators]
+        with timings.time("build.columns_records"):
+            columnar.CreatorColumns(compact)
+        del compact
+        with timings.time("build.index"):
+            index = indexes.ConstraintIndex(cols)
+
+    fragments = serialize.Fragments(creators)
+    with contextlib.redirect_stdout(io.StringIO()): # diversify prints its decisions
+        for brief in briefs:
+            # The steps of columnar.score_brief, one by one
+            with timings.time("score.constraints"):
+                budget_ok, platform_ok, safety_ok = index.constraint_masks(brief)
+                rows = (budget_ok & platform_ok & safety_ok).nonzero()[0]
+                candidates = cols.subset(rows)
+            timings.counts["candidates"].append(len(rows))
+            with timings.time("score.relevance"):
+                vertical_rows, past_rows = index.category_rows(brief.category)
+                hits = (np.isin(rows, vertical_rows), np.isin(rows, past_rows))
+                relevance = columnar.relevance_scores(brief, candidates, hits)[0]
+            with timings.time("score.audience"):
+                audience = columnar.audience_scores(brief, candidates)[0]
+            with timings.time("score.performance"):
+                performance = columnar.performance_scores(candidates)
+            with timings.time("score.final"):
+                columnar._round_scores(
+                    relevance * WEIGHTS["relevance"] + audience * WEIGHTS["audience"]
+                    + performance * WEIGHTS["performance"] + 100 * WEIGHTS["constraints"]
+                )
+
+            with timings.time("score.total"):
+                scores = columnar.score_brief(brief, cols, index)
+            with timings.time("rank"):
+                order = columnar.rank(scores, limit)
+            with timings.time("diversify"):
+                order, promoted = columnar.diversify(order, scores, cols)
+            with timings.time("build_results"):
+                columnar.build_results(brief, cols, scores, order, promoted)
+            with timings.time("serialize"):
+                serialize.json_array(serialize.matches_json(brief, cols, scores, order, fragments, promoted))
+            with timings.time("match.total"):
+                columnar.match(brief, cols, index, limit)
+
+
+def bench_lookalike(timings: Timings, creators, queries: int, k: int = 10):
+    """Lookalike index build, approximate and exact searches, and the recall@k of the approximate one."""
+    from . import columnar, lookalike
+
+    cols = columnar.CreatorColumns(creators)
+    with timings.time("build.lookalike"):
+        index = lookalike.LookalikeIndex.build(cols)
+    rows = np.random.default_rng(0).choice(len(cols), min(queries, len(cols)), replace=False)
+    found = 0
+    for row in rows:
+        with timings.time("lookalike.query"):
+            approx, _ = index.search(int(row), k)
+        with timings.time("lookalike.exact"):
+            exact, _ = index.search(int(row), k, exact=True)
+        found += len(set(approx.tolist()) & set(exact.tolist()))
+    timings.counts["lookalike.recall_pct"].append(round(100 * found / max(len(rows) * k, 1)))
+
+
+def bench_portfolio(timings: Timings, creators, briefs):
+    """Budget-constrained slates, plain and with a per-vertical cap, and how often they're proven optimal."""
+    from . import columnar, indexes, portfolio
+
+    cols = columnar.CreatorColumns(creators)
+    index = indexes.ConstraintIndex(cols)
+    proven = runs = 0
+    for brief in briefs:
+        scores = columnar.score_brief(brief, cols, index)
+        eligible = np.flatnonzero(scores.qualified)
+        for stage, cap in (("portfolio.solve", None), ("portfolio.solve_capped", 2)):
+            with timings.time(stage):
+                result = portfolio.solve(scores.final[eligible], cols.base_price[eligible],
+                                         cols.primary_vertical[eligible], brief.budgetINR, cap)
+            proven += result.optimal
+            runs += 1
+    timings.counts["portfolio.optimal_pct"].append(round(100 * proven / max(runs, 1)))
+
+
+def bench_reference(timings: Timings, creators, briefs, limit: Optional[int]):
+    """The per-creator scorer in scoring.py, for comparison, on Pydantic, ORM and compact records."""
+    from . import scoring, models, records
+
+    orm = [models.Creator(**c.model_dump()) for c in creators]
+    compact = [records.CreatorRecord.from_creator(c) for c in creators]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for brief in briefs:
+            with timings.time("reference.score"):
+                matches = [scoring.calculate_final_score(brief, c) for c in creators]
+            with timings.time("reference.score_orm"):
+                [scoring.calculate_final_score(brief, c) for c in orm]
+            with timings.time("reference.score_records"):
+                [scoring.calculate_final_score(brief, c) for c in compact]
+            with timings.time("reference.sort_diversify"):
+                ranked = scoring.apply_diversification(sorted(matches, key=lambda m: m.score, reverse=True))
+                ranked[:limit]
+
+
+def _bytes_per_item(build, count: int) -> int:
+    """Heap allocated per item by `build(i)`, kept alive, as measured by tracemalloc."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return size // count
+
+
+def bench_memory(timings: Timings, creators, sample: int = 10000):
+    """Per-creator heap footprint of each in-memory creator representation, and of the columns."""
+    from . import columnar, models, records
+
+    creators = creators[:sample]
+    # Each representation is built from freshly decoded JSON, as when loading
+    # rows, so the lists and dicts it keeps are counted too
+    texts = [c.model_dump_json() for c in creators]
+    n = len(creators)
+    timings.counts["memory.orm_bytes"].append(_bytes_per_item(lambda i: models.Creator(**json.loads(texts[i])), n))
+    timings.counts["memory.pydantic_bytes"].append(_bytes_per_item(lambda i: type(creators[i]).model_validate_json(texts[i]), n))
+    timings.counts["memory.record_bytes"].append(_bytes_per_item(lambda i: records.CreatorRecord.from_dict(json.loads(texts[i])), n))
+    cols = columnar.CreatorColumns(creators)
+    timings.counts["memory.columns_bytes"].append(sum(getattr(cols, name).nbytes for name in cols.ARRAYS) // max(n, 1))
+
+
+def bench_database(timings: Timings, size: int, seed: int, briefs, limit: Optional[int], repeat: int, workdir: str):
+    """Bulk ingest, roster loads (database and roster file) and the /api/match endpoint against a fresh database."""
+    from . import models, features, ingest, snapshot, cache, rosterfile
+    from .database import engine, SessionLocal
+
+    models.Base.metadata.drop_all(bind=engine)
+    features.upgrade(engine, verbose=False)
+
+    path = os.path.join(workdir, f"creators-{size}.ndjson")
+    with open(path, "w") as f:
+        for record in synthetic.creators(size, seed):
+            f.write(json.dumps(record) + "\n")
+    with timings.time("db.ingest"):
+        ingest.ingest_file(path, resume=False, verbose=False)
+    os.remove(path)
+
+    db = SessionLocal()
+    try:
+        for _ in range(repeat):
+            with timings.time("db.load_creators"):
+                creators = snapshot.load_creators(db)
+            with timings.time("db.load_columns"):
+                features.load_columns(db, creators)
+    finally:
+        db.close()
+    for _ in range(repeat):
+        with timings.time("db.snapshot_rebuild"):
+            roster = snapshot.rebuild()
+
+    path = os.path.join(workdir, f"roster-{size}.bin")
+    with timings.time("file.export"):
+        rosterfile.write(path, roster)
+    for _ in range(repeat):
+        with timings.time("file.load"):
+            snapshot.load_file(path).index # Mapped columns + constraint index, ready to score
+    os.remove(path)
+
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError: # Needs httpx
+        print("  (skipping endpoint stages: fastapi.testclient is not available)")
+        return
+    from .main import app
+
+    client = TestClient(app)
+    params = {"limit": limit} if limit else {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for brief in briefs:
+            body = brief.model_dump()
+            cache.match_cache.clear()
+            with timings.time("endpoint.match"):
+                response = client.post("/api/match", json=body, params=params)
+            response.raise_for_status()
+            with timings.time("endpoint.match_cached"):
+                client.post("/api/match", json=body, params=params)
+
+
+def run(sizes: List[int], n_briefs: int, limit: Optional[int], seed: int, repeat: int,
+        reference_max: int, db_max: int, workdir: str) -> dict:
+    import numpy
+    import pydantic
+
+    briefs = synthetic.briefs(n_briefs, seed)
+    results = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "pydantic": pydantic.VERSION,
+            "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+            "briefs": n_briefs,
+            "limit": limit,
+            "seed": seed,
+        },
+        "sizes": {},
+    }
+    for size in sizes:
+        print(f"Roster of {size:,} creators")
+        timings = Timings()
+        started = time.perf_counter()
+        creators = synthetic.roster(size, seed)
+        print(f"  generated in {time.perf_counter() - started:.1f}s")
+
+        bench_in_memory(timings, creators, briefs, limit, repeat)
+        bench_memory(timings, creators)
+        bench_lookalike(timings, creators, n_briefs)
+        bench_portfolio(timings, creators, briefs)
+        if reference_max:
+            # The scalar scorer is slow; time it on a prefix of the roster and a few briefs
+            bench_reference(timings, creators[:reference_max], briefs[:max(1, n_briefs // 10)], limit)
+        if size <= db_max:
+            bench_database(timings, size, seed, briefs[:max(1, n_briefs // 5)], limit, repeat, workdir)
+        del creators
+
+        results["sizes"][str(size)] = timings.summary()
+        print_summary(results["sizes"][str(size)])
+    return results
+
+
+# --- Reporting ---
+
+def print_summary(summary: Dict[str, dict]):
+    for stage, s in summary.items():
+        if "median_ms" not in s:
+            print(f"  {stage:28} {s['median']:>10,.0f} median {s['max']:>13,} max")
+            continue
+        print(f"  {stage:28} {s['median_ms']:>10.3f} ms median {s['p95_ms']:>10.3f} ms p95  ({s['runs']} runs)")
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Stages whose median got slower than `tolerance` relative to the baseline."""
+    regressions = []
+    for size, stages in results["sizes"].items():
+        base_stages = baseline.get("sizes", {}).get(size, {})
+        for stage, s in stages.items():
+            base = base_stages.get(stage)
+            if base is None or "median_ms" not in s or base.get("median_ms", 0) <= 0:
+                continue
+            ratio = s["median_ms"] / base["median_ms"]
+            if ratio > 1 + tolerance and s["median_ms"] - base["median_ms"] > MIN_DELTA_MS:
+                regressions.append(
+                    f"{size:>8} {stage:28} {base['median_ms']:.3f} ms -> {s['median_ms']:.3f} ms ({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the creator match path on synthetic rosters.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated roster sizes (default %(default)s)")
+    parser.add_argument("--briefs", type=int, default=50, help="Briefs per roster size")
+    parser.add_argument("--limit", type=int, default=100, help="Results per match; 0 = the full ranking")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each build / load stage")
+    parser.add_argument("--reference-max", type=int, default=10000,
+                        help="Creators scored by the scalar reference scorer; 0 skips it")
+    parser.add_argument("--db-max", type=int, default=100000,
+                        help="Largest roster to load into the database; 0 skips the database stages")
+    parser.add_argument("--database-url", help="Scratch database (default: SQLite in a temp directory). Its tables are dropped!")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as JSON (e.g. a new baseline)")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against an earlier result file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="taag-bench-")
+    # Must happen before anything imports app.database
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    try:
+        results = run(
+            [int(s) for s in args.sizes.split(",")], args.briefs, args.limit or None, args.seed,
+            args.repeat, args.reference_max, args.db_max, workdir,
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESSIONS (> {args.tolerance:.0%} slower than {args.baseline}):")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print(f"\nNo regressions against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
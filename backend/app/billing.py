@@ -0,0 +1,263 @@
+# backend/app/billing.py
+
+import codecs
+import csv
+import io
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import Annotated, AsyncIterator, BinaryIO, Iterator, List, Optional, Tuple, Type
+from pydantic import AfterValidator, BaseModel, ValidationError
+from pydantic.networks import validate_email
+from . import schemas, validation, serialize
+
+# Bulk billing validation for month-end uploads.
+#
+# The uploaded file (CSV with a header row, or NDJSON) is spooled to a
+# temporary file (in memory up to BILLING_SPOOL_BYTES, then on disk) and read
+# back one batch of rows at a time. Each row is validated with the same
+# schema as the single-record endpoint; brand rows additionally have their
+# GSTIN check character verified. GST is computed for a whole batch at once.
+# The result is streamed back one line per input row (NDJSON or CSV), in
+# input order, followed by a summary with the totals. Only one batch is in
+# memory at any time.
+#
+# Email addresses are most of the per-row cost (EmailStr runs the full
+# email_validator / IDNA checks), and a month's invoices repeat the same few
+# billing addresses, so bulk rows validate emails through a memoized copy of
+# the same check.
+
+BILLING_BATCH_SIZE = int(os.environ.get("BILLING_BATCH_SIZE", "1000"))
+BILLING_SPOOL_BYTES = int(os.environ.get("BILLING_SPOOL_BYTES", str(8 * 1024 * 1024)))
+GST_RATE = 0.18
+
+FORMATS = ("csv", "ndjson")
+
+
+@lru_cache(maxsize=65536)
+def _normalized_email(value: str) -> str:
+    # What EmailStr stores; invalid addresses raise (and aren't cached)
+    return validate_email(value)[1]
+
+
+class _BulkBrandBillingDetails(schemas.BrandBillingDetails):
+    email: Annotated[str, AfterValidator(_normalized_email)]
+
+
+class BulkKind:
+    """What a bulk upload contains: the row schema, and the fields echoed back per row."""
+
+    def __init__(self, schema: Type[BaseModel], echo: Tuple[str, ...], gst: bool, checks=()):
+        self.schema = schema
+        self.echo = echo
+        self.gst = gst # Brand invoices carry a budget to compute GST on
+        self.checks = checks # Extra (field, validator) checks on top of the schema
+
+
+BRAND = BulkKind(
+    _BulkBrandBillingDetails, ("companyName", "gstin"), gst=True,
+    checks=(("gstin", validation.validate_gstin_checksum),),
+)
+CREATOR = BulkKind(schemas.CreatorPayoutDetails, ("name", "pan"), gst=False)
+
+
+def detect_format(format: Optional[str], content_type: Optional[str]) -> str:
+    """The upload format: `format` if given, else from the Content-Type. Raises ValueError."""
+    if format is None:
+        content_type = (content_type or "").lower()
+        if "csv" in content_type:
+            format = "csv"
+        elif "ndjson" in content_type or "jsonl" in content_type or "json" in content_type:
+            format = "ndjson"
+    if format not in FORMATS:
+        raise ValueError("Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson")
+    return format
+
+
+async def spool(chunks: AsyncIterator[bytes]) -> BinaryIO:
+    """Copies a request body to a temporary file (memory first, disk past the limit), rewound."""
+    upload = tempfile.SpooledTemporaryFile(max_size=BILLING_SPOOL_BYTES)
+    async for chunk in chunks:
+        upload.write(chunk)
+    upload.seek(0)
+    return upload
+
+
+def check_encoding(upload: BinaryIO, chunk_size: int = 1024 * 1024):
+    """Raises ValueError unless the whole upload is UTF-8; leaves it rewound."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="strict")
+    offset = 0
+    try:
+        while chunk := upload.read(chunk_size):
+            decoder.decode(chunk)
+            offset += len(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise ValueError(f"The upload is not UTF-8 (invalid byte at offset {offset + e.start})")
+    finally:
+        upload.seek(0)
+
+
+# --- Reading ---
+
+def read_rows(upload: BinaryIO, format: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yields (row number, record or None, parse error or None), row numbers from 1."""
+    # Uploads through the API are checked with check_encoding first; a job's
+    # input file is not, so bytes that are not UTF-8 are kept as lone
+    # surrogates and make just the rows they are in invalid.
+    text = io.TextIOWrapper(upload, encoding="utf-8-sig", errors="surrogateescape", newline="")
+    for i, record, error in _parse(text, format):
+        if record is not None and not _is_utf8(record):
+            record, error = None, "Row is not valid UTF-8"
+        yield i, record, error
+
+
+def _is_utf8(record: dict) -> bool:
+    try:
+        "".join(f"{k}{v}" for k, v in record.items()).encode("utf-8")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+def _parse(text: io.TextIOWrapper, format: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    if format == "csv":
+        for i, record in enumerate(csv.DictReader(text), start=1):
+            if None in record: # More cells than header columns
+                yield i, None, "Row has more cells than the header"
+                continue
+            yield i, {k: v for k, v in record.items() if v not in (None, "")}, None
+        return
+    i = 0
+    for line in text:
+        if not line.strip():
+            continue
+        i += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield i, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield i, None, "Each line must be a JSON object"
+            continue
+        yield i, record, None
+
+
+def _batches(rows: Iterator, size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- Validation ---
+
+def _errors(e: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()]
+
+
+def validate_batch(kind: BulkKind, batch: list) -> List[dict]:
+    """Validates one batch of read_rows output. Returns one result dict per row, in order."""
+    results, budgets, budget_rows = [], [], []
+    for number, record, error in batch:
+        if error is not None:
+            results.append({"row": number, "valid": False, "errors": [error]})
+            continue
+        # Echo the identifying fields of rejected rows too, so they can be found in the upload
+        rejected = {"row": number, "valid": False, **{f: record[f] for f in kind.echo if f in record}}
+        try:
+            details = kind.schema.model_validate(record)
+        except ValidationError as e:
+            results.append({**rejected, "errors": _errors(e)})
+            continue
+        errors = []
+        for field, check in kind.checks:
+            try:
+                check(getattr(details, field))
+            except ValueError as e:
+                errors.append(f"{field}: {e}")
+        if errors:
+            results.append({**rejected, "errors": errors})
+            continue
+        result = {"row": number, "valid": True, **{f: getattr(details, f) for f in kind.echo}}
+        if kind.gst:
+            budgets.append(details.budget)
+            budget_rows.append(len(results))
+        results.append(result)
+
+    # GST for the whole batch at once (same arithmetic as /api/billing/brand)
+    if budgets:
+        import numpy as np # Only bulk validation needs it; kept out of the app's import
+
+        budget = np.array(budgets, dtype=np.float64)
+        gst = budget * GST_RATE
+        total = budget + gst
+        for k, i in enumerate(budget_rows):
+            results[i].update(budget=float(budget[k]), gst=round(float(gst[k]), 2), total=round(float(total[k]), 2))
+    return results
+
+
+class Summary:
+    """Running totals over the validated rows."""
+
+    def __init__(self):
+        self.rows = self.valid = 0
+        self.budget = self.gst = self.total = 0.0
+
+    def add(self, results: List[dict]):
+        self.rows += len(results)
+        for r in results:
+            if r["valid"]:
+                self.valid += 1
+                if "budget" in r:
+                    self.budget += r["budget"]
+                    self.gst += r["budget"] * GST_RATE
+        self.total = self.budget + self.gst
+
+    def as_dict(self, gst: bool) -> dict:
+        summary = {"rows": self.rows, "valid": self.valid, "invalid": self.rows - self.valid}
+        if gst:
+            summary.update(budget=round(self.budget, 2), gst=round(self.gst, 2), total=round(self.total, 2))
+        return summary
+
+
+# --- Output ---
+
+def process(upload: BinaryIO, format: str, kind: BulkKind, output: str = "ndjson",
+            batch_size: int = BILLING_BATCH_SIZE) -> Iterator[str]:
+    """Validates an upload batch by batch, yielding the per-row results (and a final summary) as text."""
+    summary = Summary()
+    columns = ["row", "valid", "errors", *kind.echo] + (["budget", "gst", "total"] if kind.gst else [])
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, columns, extrasaction="ignore")
+    if output == "csv":
+        writer.writeheader()
+    try:
+        for batch in _batches(read_rows(upload, format), batch_size):
+            results = validate_batch(kind, batch)
+            summary.add(results)
+            if output == "csv":
+                for r in results:
+                    writer.writerow({**r, "errors": "; ".join(r.get("errors", ()))})
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                yield "".join(serialize.dumps(r) + "\n" for r in results)
+    finally:
+        upload.close()
+
+    totals = summary.as_dict(kind.gst)
+    if output == "csv":
+        # Trailer row: "TOTAL" in the row column, counts / sums in the others
+        writer.writerow({"row": "TOTAL", "valid": totals["valid"], "errors": f"{totals['invalid']} invalid",
+                         **{k: totals[k] for k in ("budget", "gst", "total") if k in totals}})
+        yield buffer.getvalue()
+    else:
+        yield serialize.dumps({"summary": totals}) + "\n"
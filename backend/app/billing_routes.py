@@ -0,0 +1,79 @@
+# backend/app/billing_routes.py
+
+from typing import Optional
+from fastapi import APIRouter, Request, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from . import schemas, billing
+
+# Billing endpoints. main.py only includes this router when "billing" is in
+# API_FEATURES, so match-only workers don't import billing.py or register
+# (and build the request validation of) these routes.
+
+router = APIRouter()
+
+
+@router.post("/api/billing/brand", response_model=schemas.BillingSummary)
+def process_brand_billing(details: schemas.BrandBillingDetails): # <-- SIGNATURE IS NOW CLEAN
+    """
+    Receives and validates brand billing details and returns a summary with GST.
+    """
+    # Calculate GST (assuming 18%)
+    gst_amount = details.budget * 0.18
+    total_amount = details.budget + gst_amount
+    
+    return {
+        "status": "success",
+        "message": "Brand billing details received and validated.",
+        "submitted_details": details.dict(),
+        "billing_summary": {
+            "budget": f"INR {details.budget:,.2f}",
+            "gst_18_percent": f"INR {gst_amount:,.2f}",
+            "total_payable": f"INR {total_amount:,.2f}"
+        }
+    }
+
+async def bulk_billing(request: Request, kind: billing.BulkKind, format: Optional[str], output: str):
+    try:
+        input_format = billing.detect_format(format, request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    upload = await billing.spool(request.stream())
+    try:
+        billing.check_encoding(upload) # Before the 200 goes out
+    except ValueError as e:
+        upload.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    media_type = "text/csv" if output == "csv" else "application/x-ndjson"
+    return StreamingResponse(billing.process(upload, input_format, kind, output), media_type=media_type)
+
+BULK_FORMAT = Query(None, pattern="^(csv|ndjson)$", description="Upload format; taken from the Content-Type if omitted")
+BULK_OUTPUT = Query("ndjson", pattern="^(csv|ndjson)$", description="Result file format")
+
+@router.post("/api/billing/brand/bulk")
+async def process_brand_billing_bulk(request: Request, format: Optional[str] = BULK_FORMAT, output: str = BULK_OUTPUT):
+    """
+    Validates a CSV / NDJSON upload of brand billing records (the fields of
+    /api/billing/brand, one record per row) and computes their GST. Streams
+    back one result per row, with the errors of invalid rows, then the totals.
+    GSTINs must also have a valid check character.
+    """
+    return await bulk_billing(request, billing.BRAND, format, output)
+
+@router.post("/api/billing/creator/bulk")
+async def process_creator_payout_bulk(request: Request, format: Optional[str] = BULK_FORMAT, output: str = BULK_OUTPUT):
+    """
+    Validates a CSV / NDJSON upload of creator payout records (the fields of
+    /api/billing/creator). Streams back one result per row, then the totals.
+    """
+    return await bulk_billing(request, billing.CREATOR, format, output)
+
+@router.post("/api/billing/creator", response_model=schemas.BillingSummary)
+def process_creator_payout(details: schemas.CreatorPayoutDetails): # <-- SIGNATURE IS NOW CLEAN
+    """
+    Receives and validates creator payout details.
+    """
+    return {
+        "status": "success",
+        "message": "Creator payout details received and validated.",
+        "submitted_details": details.dict()
+    }
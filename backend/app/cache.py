@@ -0,0 +1,116 @@
+# backend/app/cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from . import schemas
+
+# A small LRU + TTL cache for match results. Keys are a canonical hash of the
+# brief, so briefs that only differ in ways the scorer ignores (case of the
+# category / tones, list order of tones and platforms, extra constraint keys)
+# share an entry. Every entry remembers the roster version it was computed
+# for; the first lookup after the roster changes empties the cache.
+
+MATCH_CACHE_SIZE = int(os.environ.get("MATCH_CACHE_SIZE", "256"))
+MATCH_CACHE_TTL = float(os.environ.get("MATCH_CACHE_TTL", "300")) # seconds
+
+
+def normalize_brief(brief: schemas.BrandBrief) -> Dict[str, Any]:
+    """The parts of a brief that affect matching, in canonical form."""
+    return {
+        "category": brief.category.lower(), # The scorer lowercases categories and tones
+        "budgetINR": brief.budgetINR,
+        # Location order is kept: the geo overlap is summed in this order
+        "targetLocations": list(brief.targetLocations),
+        "targetAges": list(brief.targetAges),
+        # Tones are matched as a set but the count is part of the score, so keep duplicates
+        "tone": sorted(t.lower() for t in brief.tone),
+        "platforms": sorted(set(brief.platforms)),
+        "noAdultContent": bool(brief.constraints.get("noAdultContent")),
+    }
+
+
+def brief_key(brief: schemas.BrandBrief) -> str:
+    """A stable hash of the normalized brief."""
+    canonical = json.dumps(normalize_brief(brief), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class MatchCache:
+    """Thread-safe LRU cache with per-entry expiry and roster-version invalidation."""
+
+    def __init__(self, maxsize: int = MATCH_CACHE_SIZE, ttl: float = MATCH_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: int) -> bool:
+        """Drops everything once a newer roster version shows up. False for stale callers."""
+        if self._version is None or version > self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+        return version == self._version
+
+    def get(self, key: Hashable, version: int):
+        """The cached value for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key) if self._check_version(version) else None
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, version: int, value):
+        with self._lock:
+            if not self._check_version(version) or self.maxsize <= 0:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "roster_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# Process-wide cache used by /api/match
+match_cache = MatchCache()
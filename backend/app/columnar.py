@@ -0,0 +1,540 @@
+# backend/app/columnar.py
+
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional
+from . import schemas, models, metrics, logs
+from .scoring import WEIGHTS
+
+# The per-creator functions in scoring.py are the reference implementation.
+# This module computes exactly the same numbers, but for the whole roster at
+# once: every creator field the scorer looks at is encoded once into NumPy
+# columns, and a brief is then scored with a handful of array operations.
+
+_PAD = -1 # Code used to pad the ragged list columns
+
+logger = logs.sampled_logger(__name__) # Logs on every match: sampled (see logs.py)
+
+
+def _encode_lists(values: List[List[str]], vocab: Dict[str, int], lower: bool = False, unique: bool = False) -> np.ndarray:
+    """Dictionary-encodes a list-valued field into a padded (N, K) code matrix."""
+    rows = []
+    for items in values:
+        items = [v.lower() for v in items] if lower else list(items)
+        if unique:
+            items = list(dict.fromkeys(items)) # Set semantics, first-seen order
+        rows.append([vocab.setdefault(v, len(vocab)) for v in items])
+
+    width = max((len(r) for r in rows), default=0)
+    codes = np.full((len(rows), max(width, 1)), _PAD, dtype=np.int32)
+    for i, row in enumerate(rows):
+        codes[i, :len(row)] = row
+    return codes
+
+
+def _encode_shares(values: List[Dict[str, float]], vocab: Dict[str, int]):
+    """Encodes a {key: share} field into padded (N, K) code and share matrices."""
+    width = max((len(d) for d in values), default=0)
+    codes = np.full((len(values), max(width, 1)), _PAD, dtype=np.int32)
+    shares = np.zeros(codes.shape, dtype=np.float64)
+    for i, d in enumerate(values):
+        for k, (key, share) in enumerate(d.items()):
+            codes[i, k] = vocab.setdefault(key, len(vocab))
+            shares[i, k] = share
+    return codes, shares
+
+
+def _encode_age_ranges(values: List[Dict[str, float]]):
+    """Parses "18-24" style keys once into (N, K) bound, share and validity matrices."""
+    width = max((len(d) for d in values), default=0)
+    shape = (len(values), max(width, 1))
+    lows = np.zeros(shape, dtype=np.int64)
+    highs = np.zeros(shape, dtype=np.int64)
+    shares = np.zeros(shape, dtype=np.float64)
+    valid = np.zeros(shape, dtype=bool)
+    # Keep each creator's dict order so the overlap sums add up in the same order.
+    for i, d in enumerate(values):
+        for k, (age_range, share) in enumerate(d.items()):
+            try:
+                low, high = map(int, age_range.split('-'))
+            except ValueError:
+                continue # Same rule as the scorer: skip unexpected formats
+            lows[i, k], highs[i, k], shares[i, k], valid[i, k] = low, high, share, True
+    return lows, highs, shares, valid
+
+
+def _widen(a: np.ndarray, width: int, fill) -> np.ndarray:
+    """Pads a (N, K) matrix on the right to (N, width)."""
+    if a.shape[1] >= width:
+        return a
+    pad = np.full((a.shape[0], width - a.shape[1]), fill, dtype=a.dtype)
+    return np.hstack([a, pad])
+
+
+class CreatorColumns:
+    """Struct-of-arrays view of a creator roster, ready for batched scoring."""
+
+    # Every array column, with the fill value used to pad it (None = 1-D column)
+    ARRAYS = {
+        "avg_views": None, "engagement_rate": None, "base_price": None, "cost_per_view": None,
+        "vertical_codes": _PAD, "past_codes": _PAD, "tone_codes": _PAD, "platform_codes": _PAD,
+        "adult": None, "geo_codes": _PAD, "geo_shares": 0, "age_low": 0, "age_high": 0,
+        "age_shares": 0, "age_valid": False, "primary_vertical": None,
+    }
+    VOCABS = ("category_vocab", "tone_vocab", "platform_vocab", "geo_vocab", "primary_vocab")
+
+    def __init__(self, creators: List[models.Creator], base: Optional["CreatorColumns"] = None):
+        self.creators = list(creators)
+        # Continue the vocabularies of `base` so codes stay comparable across both
+        for name in self.VOCABS:
+            setattr(self, name, dict(getattr(base, name)) if base is not None else {})
+
+        c = self.creators
+
+        # 1. Numeric columns
+        self.avg_views = np.array([x.avgViews for x in c], dtype=np.int64)
+        self.engagement_rate = np.array([x.engagementRate for x in c], dtype=np.float64)
+        self.base_price = np.array([x.basePriceINR for x in c], dtype=np.int64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cost_per_view = self.base_price / self.avg_views
+        self.cost_per_view = np.where(self.avg_views > 0, cost_per_view, np.inf)
+
+        # 2. Encoded relevance columns (verticals and past work share one vocabulary)
+        self.vertical_codes = _encode_lists([x.verticals for x in c], self.category_vocab, lower=True)
+        self.past_codes = _encode_lists([x.pastBrandCategories for x in c], self.category_vocab, lower=True)
+        self.tone_codes = _encode_lists([x.contentTone for x in c], self.tone_vocab, lower=True, unique=True)
+
+        # 3. Constraint columns (platforms are compared case-sensitively by the scorer)
+        self.platform_codes = _encode_lists([x.platforms for x in c], self.platform_vocab)
+        self.adult = np.array([bool(x.safetyFlags.get("adult")) for x in c], dtype=bool)
+
+        # 4. Audience columns
+        self.geo_codes, self.geo_shares = _encode_shares([x.audienceGeo for x in c], self.geo_vocab)
+        self.age_low, self.age_high, self.age_shares, self.age_valid = _encode_age_ranges([x.audienceAge for x in c])
+
+        # 5. Primary vertical (as stored, not lowercased) for the diversification rule
+        self.primary_vertical = np.array(
+            [self.primary_vocab.setdefault(x.verticals[0], len(self.primary_vocab)) if x.verticals else _PAD for x in c],
+            dtype=np.int32,
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], vocabs: Dict[str, Dict[str, int]], creators: Optional[list] = None) -> "CreatorColumns":
+        """
+        Wraps already-encoded columns (e.g. memory-mapped ones) without copying.
+        Without `creators` the columns can be scored but not turned into results.
+        """
+        cols = cls.__new__(cls)
+        cols.creators = creators
+        for name in cls.VOCABS:
+            setattr(cols, name, vocabs[name])
+        for name in cls.ARRAYS:
+            setattr(cols, name, arrays[name])
+        return cols
+
+    def __len__(self) -> int:
+        return len(self.avg_views)
+
+    def subset(self, rows: np.ndarray) -> "CreatorColumns":
+        """Returns the columns for the given row ids only (vocabularies are shared)."""
+        return CreatorColumns.from_arrays(
+            {name: getattr(self, name)[rows] for name in self.ARRAYS},
+            {name: getattr(self, name) for name in self.VOCABS},
+            [self.creators[i] for i in rows] if self.creators is not None else None,
+        )
+
+    def slice(self, start: int, stop: int) -> "CreatorColumns":
+        """Rows start..stop as views of these columns (no copy)."""
+        return CreatorColumns.from_arrays(
+            {name: getattr(self, name)[start:stop] for name in self.ARRAYS},
+            {name: getattr(self, name) for name in self.VOCABS},
+            self.creators[start:stop] if self.creators is not None else None,
+        )
+
+    def extended(self, creators: List[models.Creator]) -> "CreatorColumns":
+        """Returns a new CreatorColumns with `creators` appended, encoding only the new rows."""
+        block = CreatorColumns(creators, base=self)
+        merged = CreatorColumns.__new__(CreatorColumns)
+        merged.creators = self.creators + block.creators
+        for name in self.VOCABS:
+            setattr(merged, name, getattr(block, name))
+        for name, fill in self.ARRAYS.items():
+            old, new = getattr(self, name), getattr(block, name)
+            if fill is not None:
+                width = max(old.shape[1], new.shape[1])
+                old, new = _widen(old, width, fill), _widen(new, width, fill)
+            setattr(merged, name, np.concatenate([old, new]))
+        return merged
+
+
+class BriefScores(NamedTuple):
+    """Per-creator component scores for one brief, aligned with the roster order."""
+    budget_ok: np.ndarray
+    platform_ok: np.ndarray
+    safety_ok: np.ndarray
+    qualified: np.ndarray
+    category_match: np.ndarray # 0 = none, 1 = primary vertical, 2 = past work
+    tone_matches: np.ndarray
+    geo_overlap: np.ndarray
+    age_overlap: np.ndarray
+    relevance: np.ndarray
+    audience: np.ndarray
+    performance: np.ndarray
+    final: np.ndarray
+
+
+def _codes(values: List[str], vocab: Dict[str, int]) -> List[int]:
+    return [vocab[v] for v in values if v in vocab]
+
+
+def _round_scores(values: np.ndarray) -> np.ndarray:
+    """Rounds to 2 decimals exactly like the builtin round() used by the scorer."""
+    rounded = np.round(values, 2)
+    # np.round scales by 100 before rounding, which can disagree with round()
+    # on values sitting right at a tie (e.g. 2.675). Redo those few by hand.
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+def relevance_scores(brief: schemas.BrandBrief, cols: CreatorColumns, category_hits=None):
+    """Vectorized calculate_relevance_score. Returns (score, category_match, tone_matches).
+
+    `category_hits` can pass in precomputed (vertical_hit, past_hit) masks, e.g. from an index.
+    """
+    n = len(cols)
+    category = cols.category_vocab.get(brief.category.lower())
+    if category_hits is not None:
+        vertical_hit, past_hit = category_hits
+    elif category is None:
+        vertical_hit = past_hit = np.zeros(n, dtype=bool)
+    else:
+        vertical_hit = (cols.vertical_codes == category).any(axis=1)
+        past_hit = (cols.past_codes == category).any(axis=1)
+    category_match = np.where(vertical_hit, 1, np.where(past_hit, 2, 0))
+    tone_matches = tone_match_counts(brief.tone, cols)
+    return relevance_total(brief, category_match, tone_matches), category_match, tone_matches
+
+
+def tone_match_counts(tones: List[str], cols: CreatorColumns) -> np.ndarray:
+    """How many of the (distinct, lowercased) `tones` each creator has."""
+    codes = _codes(list({t.lower() for t in tones}), cols.tone_vocab)
+    if not codes:
+        return np.zeros(len(cols), dtype=np.int64)
+    return np.isin(cols.tone_codes, codes).sum(axis=1)
+
+
+def relevance_total(brief: schemas.BrandBrief, category_match: np.ndarray, tone_matches: np.ndarray) -> np.ndarray:
+    """The relevance score from its parts (category_match: 0 = none, 1 = vertical, 2 = past work)."""
+    score = np.where(category_match == 1, 70, np.where(category_match == 2, 50, 0)).astype(np.float64)
+    if brief.tone:
+        tone_score = (tone_matches / len(brief.tone)) * 30
+        score = score + np.where(tone_matches > 0, tone_score, 0)
+    return score
+
+
+def geo_overlaps(locations: List[str], cols: CreatorColumns, start: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Audience share in `locations`, summed in list order. Continues from the
+    overlap `start` of the locations before these, if given.
+    """
+    geo_overlap = np.zeros(len(cols), dtype=np.float64) if start is None else start
+    for loc in locations:
+        code = cols.geo_vocab.get(loc)
+        if code is not None:
+            geo_overlap = geo_overlap + np.where(cols.geo_codes == code, cols.geo_shares, 0).sum(axis=1)
+    return geo_overlap
+
+
+def age_overlaps(target_ages: List[int], cols: CreatorColumns) -> np.ndarray:
+    """Audience share in age buckets overlapping `target_ages`, summed in each creator's own bucket order."""
+    brand_min_age, brand_max_age = target_ages
+    age_overlap = np.zeros(len(cols), dtype=np.float64)
+    for k in range(cols.age_shares.shape[1]):
+        overlap_min = np.maximum(brand_min_age, cols.age_low[:, k])
+        overlap_max = np.minimum(brand_max_age, cols.age_high[:, k])
+        hit = cols.age_valid[:, k] & (overlap_max > overlap_min)
+        age_overlap = age_overlap + np.where(hit, cols.age_shares[:, k], 0)
+    return age_overlap
+
+
+def audience_total(geo_overlap: np.ndarray, age_overlap: np.ndarray) -> np.ndarray:
+    return (
+        np.where(geo_overlap > 0, np.minimum(geo_overlap, 1.0) * 50, 0)
+        + np.where(age_overlap > 0, np.minimum(age_overlap, 1.0) * 50, 0)
+    )
+
+
+def audience_scores(brief: schemas.BrandBrief, cols: CreatorColumns):
+    """Vectorized calculate_audience_score. Returns (score, geo_overlap, age_overlap)."""
+    geo_overlap = geo_overlaps(brief.targetLocations, cols)
+    age_overlap = age_overlaps(brief.targetAges, cols)
+    return audience_total(geo_overlap, age_overlap), geo_overlap, age_overlap
+
+
+def performance_scores(cols: CreatorColumns) -> np.ndarray:
+    """Vectorized calculate_performance_price_score. Independent of the brief."""
+    er = cols.engagement_rate
+    cpv = cols.cost_per_view
+    er_score = np.where(er > 0.05, 50, np.where(er > 0.03, 30, 0))
+    value_score = np.where(cpv < 0.5, 50, np.where(cpv < 1.0, 25, 0))
+    return (er_score + value_score).astype(np.float64)
+
+
+def constraint_masks(brief: schemas.BrandBrief, cols: CreatorColumns):
+    """Vectorized check_constraints. Returns (budget_ok, platform_ok, safety_ok)."""
+    budget_ok = cols.base_price <= brief.budgetINR
+    platforms = _codes(brief.platforms, cols.platform_vocab)
+    platform_ok = np.isin(cols.platform_codes, platforms).any(axis=1) if platforms else np.zeros(len(cols), dtype=bool)
+    if brief.constraints.get("noAdultContent"):
+        safety_ok = ~cols.adult
+    else:
+        safety_ok = np.ones(len(cols), dtype=bool)
+    return budget_ok, platform_ok, safety_ok
+
+
+def final_scores(relevance: np.ndarray, audience: np.ndarray, performance: np.ndarray) -> np.ndarray:
+    """The rounded final score of qualified creators."""
+    # Same weighted sum (and evaluation order) as calculate_final_score
+    final = (
+        (relevance * WEIGHTS["relevance"]) +
+        (audience * WEIGHTS["audience"]) +
+        (performance * WEIGHTS["performance"]) +
+        (100 * WEIGHTS["constraints"])
+    )
+    return _round_scores(final)
+
+
+def _scatter(values: np.ndarray, rows: np.ndarray, size: int) -> np.ndarray:
+    """Spreads per-candidate values back to a roster-length array (zeros elsewhere)."""
+    out = np.zeros(size, dtype=values.dtype)
+    out[rows] = values
+    return out
+
+
+def constraint_matrix(briefs: List[schemas.BrandBrief], cols: CreatorColumns):
+    """constraint_masks for many briefs at once. Returns (B, N) budget/platform/safety masks."""
+    budgets = np.array([b.budgetINR for b in briefs], dtype=np.int64)
+    budget_ok = cols.base_price[None, :] <= budgets[:, None]
+
+    # Creator x platform membership, multiplied with the briefs' platform one-hots
+    n_platforms = len(cols.platform_vocab)
+    members = np.zeros((len(cols), n_platforms + 1), dtype=np.float32)
+    members[np.arange(len(cols))[:, None], cols.platform_codes] = 1 # _PAD lands in the last column
+    wanted = np.zeros((len(briefs), n_platforms + 1), dtype=np.float32)
+    for b, brief in enumerate(briefs):
+        wanted[b, _codes(brief.platforms, cols.platform_vocab)] = 1
+    platform_ok = (wanted[:, :n_platforms] @ members[:, :n_platforms].T) > 0
+
+    no_adult = np.array([bool(b.constraints.get("noAdultContent")) for b in briefs])
+    safety_ok = ~(no_adult[:, None] & cols.adult[None, :])
+    return budget_ok, platform_ok, safety_ok
+
+
+def score_brief(brief: schemas.BrandBrief, cols: CreatorColumns, index=None, masks=None, performance=None) -> BriefScores:
+    """Scores every creator in the roster against one brief.
+
+    Hard constraints are resolved first (from `index`, an indexes.ConstraintIndex,
+    when given) and the other components are only computed for the creators
+    that pass them. Disqualified creators get zeros.
+
+    Batch callers can pass precomputed constraint `masks` and the roster-wide
+    `performance` scores, which don't depend on the brief.
+    """
+    # 1. Hard constraints -> candidate rows
+    with metrics.stage("constraints"):
+        if masks is not None:
+            budget_ok, platform_ok, safety_ok = masks
+        elif index is None:
+            budget_ok, platform_ok, safety_ok = constraint_masks(brief, cols)
+        else:
+            budget_ok, platform_ok, safety_ok = index.constraint_masks(brief)
+        qualified = budget_ok & platform_ok & safety_ok
+        rows = np.flatnonzero(qualified)
+        candidates = cols.subset(rows)
+    metrics.observe_candidates(len(rows))
+
+    # 2. Score components for the candidates only
+    with metrics.stage("relevance"):
+        category_hits = None
+        if index is not None:
+            vertical_rows, past_rows = index.category_rows(brief.category)
+            category_hits = (
+                np.isin(rows, vertical_rows, assume_unique=True),
+                np.isin(rows, past_rows, assume_unique=True),
+            )
+        relevance, category_match, tone_matches = relevance_scores(brief, candidates, category_hits)
+    with metrics.stage("audience"):
+        audience, geo_overlap, age_overlap = audience_scores(brief, candidates)
+    with metrics.stage("performance"):
+        performance = performance_scores(candidates) if performance is None else performance[rows]
+
+    with metrics.stage("final"):
+        final = final_scores(relevance, audience, performance)
+
+    n = len(cols)
+    return BriefScores(
+        budget_ok, platform_ok, safety_ok, qualified,
+        _scatter(category_match, rows, n), _scatter(tone_matches, rows, n),
+        _scatter(geo_overlap, rows, n), _scatter(age_overlap, rows, n),
+        _scatter(relevance, rows, n), _scatter(audience, rows, n),
+        _scatter(performance, rows, n), _scatter(final, rows, n),
+    )
+
+
+def rank(scores: BriefScores, limit: Optional[int] = None) -> np.ndarray:
+    """Roster indices sorted by score, descending. Stable, like sorted(..., reverse=True).
+
+    Qualified creators always score above 0, so the disqualified ones simply
+    follow in roster order and only the candidates need sorting. With `limit`,
+    only the best `limit` candidates are selected (np.partition) and sorted,
+    so the work scales with the limit instead of the roster.
+    """
+    qualified = np.flatnonzero(scores.qualified)
+    finals = scores.final[qualified]
+
+    if limit is not None and limit < len(qualified):
+        # Keep everything above the limit-th best score, then fill up with the
+        # tied rows in roster order, which is what a stable sort would keep.
+        threshold = np.partition(finals, len(finals) - limit)[len(finals) - limit]
+        above = finals > threshold
+        ties = np.flatnonzero(finals == threshold)[:limit - int(above.sum())]
+        keep = np.sort(np.concatenate([np.flatnonzero(above), ties]))
+        qualified, finals = qualified[keep], finals[keep]
+
+    ranked = qualified[np.argsort(-finals, kind="stable")]
+    rejected = np.flatnonzero(~scores.qualified)
+    if limit is not None:
+        rejected = rejected[:max(limit - len(ranked), 0)]
+    return np.concatenate([ranked, rejected])
+
+
+def diversify(order: np.ndarray, scores: BriefScores, cols: CreatorColumns):
+    """
+    scoring.apply_diversification on roster indices. `order` may be just the top
+    of the ranking: the replacement is searched over all qualified creators.
+    Returns (new order, promoted row or None).
+    """
+    # Rule only applies if there are at least 3 qualified results.
+    if scores.qualified.sum() < 3:
+        return order, None
+
+    top_three = order[:3]
+    primary = cols.primary_vertical[top_three]
+    if (primary == _PAD).any() or len(set(primary.tolist())) != 1:
+        return order, None
+
+    dominating = primary[0]
+    dominating_name = cols.creators[top_three[0]].verticals[0]
+    logger.info("Top 3 dominated by '%s'. Applying diversification.", dominating_name)
+
+    # The best-ranked qualified creator with a different primary vertical:
+    # highest score, earliest roster row on ties (argmax returns the first).
+    others = np.flatnonzero(scores.qualified & (cols.primary_vertical != dominating))
+    if len(others) == 0:
+        logger.info("Diversification needed, but no suitable replacement found.")
+        return order, None
+    candidate = others[np.argmax(scores.final[others])]
+
+    logger.info("Found replacement: %s. Swapping with %s.", cols.creators[candidate].handle, cols.creators[top_three[2]].handle)
+    order = order.copy()
+    position = np.flatnonzero(order == candidate)
+    if len(position):
+        order[position[0]] = order[2]
+    order[2] = candidate # If it was past the limit, the old third place drops out
+    return order, int(candidate)
+
+
+def match_reasons(brief: schemas.BrandBrief, cols: CreatorColumns, scores: BriefScores, i: int) -> List[str]:
+    """Rebuilds the reasons calculate_final_score would give creator i."""
+    creator = cols.creators[i]
+
+    # Disqualified creators only get the first failed constraint
+    if not scores.budget_ok[i]:
+        return ["Price over budget"]
+    if not scores.platform_ok[i]:
+        return ["Does not use required platforms"]
+    if not scores.safety_ok[i]:
+        return ["Violates content safety rules"]
+
+    reasons = []
+    if scores.category_match[i] == 1:
+        reasons.append("Primary Vertical Match")
+    elif scores.category_match[i] == 2:
+        reasons.append("Past Work Match")
+    if scores.tone_matches[i]:
+        reasons.append(f"Tone Fit ({scores.tone_matches[i]}/{len(brief.tone)})")
+
+    geo_overlap = float(scores.geo_overlap[i])
+    if geo_overlap > 0:
+        reasons.append(f"Geographic Overlap ({geo_overlap:.0%})")
+    age_overlap = float(scores.age_overlap[i])
+    if age_overlap > 0:
+        reasons.append(f"Target Age Match ({age_overlap:.0%})")
+
+    if creator.engagementRate > 0.05:
+        reasons.append(f"High ER ({creator.engagementRate:.1%})")
+    elif creator.engagementRate > 0.03:
+        reasons.append(f"Good ER ({creator.engagementRate:.1%})")
+    cost_per_view = cols.cost_per_view[i]
+    if cost_per_view < 0.5:
+        reasons.append("Excellent Value")
+    elif cost_per_view < 1.0:
+        reasons.append("Good Value")
+
+    platform_match = set(brief.platforms) & set(creator.platforms)
+    reasons.append("Within Budget")
+    reasons.append(f"On Platform ({', '.join(platform_match)})")
+    return list(set(reasons)) # Use set to remove duplicate reasons
+
+
+def build_match(brief: schemas.BrandBrief, cols: CreatorColumns, scores: BriefScores, i: int) -> schemas.MatchedCreator:
+    """Builds the MatchedCreator response object for roster index i."""
+    creator = cols.creators[i]
+    if not scores.qualified[i]:
+        return schemas.MatchedCreator(creator=creator, score=0, reasons=match_reasons(brief, cols, scores, i))
+    return schemas.MatchedCreator(
+        creator=schemas.Creator.from_orm(creator),
+        score=float(scores.final[i]),
+        reasons=match_reasons(brief, cols, scores, i),
+    )
+
+
+def select(brief: schemas.BrandBrief, cols: CreatorColumns, index=None, limit: Optional[int] = None, scores: Optional[BriefScores] = None):
+    """
+    Scores, ranks and diversifies the roster for a brief without building any
+    response objects. Returns (scores, order, promoted): the rows of the top
+    `limit` results (all of them by default), in order, and the row promoted
+    for diversity (or None).
+    """
+    if scores is None:
+        scores = score_brief(brief, cols, index)
+    # Diversification can touch the 3rd place, so always rank at least 3
+    with metrics.stage("rank"):
+        order = rank(scores, None if limit is None else max(limit, 3))
+    with metrics.stage("diversify"):
+        order, promoted = diversify(order, scores, cols)
+    if limit is not None:
+        order = order[:limit]
+    return scores, order, promoted
+
+
+def match(brief: schemas.BrandBrief, cols: CreatorColumns, index=None, limit: Optional[int] = None, scores: Optional[BriefScores] = None) -> List[schemas.MatchedCreator]:
+    """
+    Scores, ranks and diversifies the roster for a brief and returns the top
+    `limit` results (all of them by default). Response objects are only built
+    for the returned creators. Pass `scores` if the brief was already scored.
+    """
+    scores, order, promoted = select(brief, cols, index, limit, scores)
+    with metrics.stage("build_results"):
+        return build_results(brief, cols, scores, order, promoted)
+
+
+def build_results(brief: schemas.BrandBrief, cols: CreatorColumns, scores: BriefScores, order, promoted: Optional[int] = None) -> List[schemas.MatchedCreator]:
+    """MatchedCreator objects for the given rows, flagging the diversity promotion."""
+    results = [build_match(brief, cols, scores, int(i)) for i in order]
+    for result, i in zip(results, order):
+        if i == promoted:
+            result.reasons.append("Promoted for Diversity")
+    return results
@@ -1,7 +1,17 @@
 # backend/app/crud.py
 
+from typing import TYPE_CHECKING
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from . import models, schemas
+from . import models, schemas, generations
+
+if TYPE_CHECKING: # The asyncio extension needs greenlet; only import it for type checkers
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# The write paths import the feature / snapshot modules (and NumPy) when
+# they run, so the read endpoints don't load them with the app. They are
+# synchronous and no endpoint calls them on the event loop: writes come from
+# the ingest / seed CLIs and the job workers, which run in their own threads.
 
 # --- Creator CRUD Functions ---
 
@@ -15,10 +25,17 @@ def get_creators(db: Session, skip: int = 0, limit: int = 100):
 
 def create_creator(db: Session, creator: schemas.CreatorCreate):
     """Create a new creator in the database."""
-    db_creator = models.Creator(**creator.dict())
+    from . import features, snapshot
+
+    data = creator.dict()
+    db_creator = models.Creator(**data, **features.derive_features(data))
     db.add(db_creator)
+    db.flush() # Assigns the id the feature rows point at
+    features.write_features(db, {db_creator.id: data}, replace=False)
+    generation = generations.bump(db, generations.CREATORS) # Tells the other processes
     db.commit()
     db.refresh(db_creator)
+    snapshot.on_creator_saved(db_creator, generation) # Keep the match roster in sync
     return db_creator
 
 # --- Brand CRUD Functions ---
@@ -33,8 +50,29 @@ def get_brands(db: Session, skip: int = 0, limit: int = 100):
 
 def create_brand(db: Session, brand: schemas.BrandCreate):
     """Create a new brand in the database."""
+    from . import shortlists
+
     db_brand = models.Brand(**brand.dict())
     db.add(db_brand)
+    generations.bump(db, generations.BRANDS)
     db.commit()
     db.refresh(db_brand)
-    return db_brand
\ No newline at end of file
+    shortlists.match_shortlists.notify() # Build the new brand's shortlist
+    return db_brand
+
+# --- Async read functions (used with database.AsyncSessionLocal) ---
+
+async def async_get_creators(db: "AsyncSession", skip: int = 0, limit: int = 100):
+    """Fetch creators with pagination, without blocking the event loop."""
+    result = await db.execute(select(models.Creator).order_by(models.Creator.id).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def async_get_creator_by_handle(db: "AsyncSession", handle: str):
+    """Fetch a single creator by their handle, without blocking the event loop."""
+    result = await db.execute(select(models.Creator).filter(models.Creator.handle == handle))
+    return result.scalars().first()
+
+async def async_get_brands(db: "AsyncSession", skip: int = 0, limit: int = 100):
+    """Fetch brands with pagination, without blocking the event loop."""
+    result = await db.execute(select(models.Brand).order_by(models.Brand.id).offset(skip).limit(limit))
+    return result.scalars().all()
@@ -0,0 +1,41 @@
+# backend/app/dependencies.py
+
+from typing import Optional
+from fastapi import HTTPException, Response
+from . import serialize
+from .database import SessionLocal, AsyncSessionLocal
+
+# Request dependencies and response helpers shared by main.py and the
+# optional routers (billing_routes.py, job_routes.py).
+
+
+# --- Dependency ---
+def get_db():
+    """Dependency to get a database session for each request."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """Dependency to get an async database session (needs aiosqlite / asyncpg)."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# --- Match response helpers ---
+# Match endpoints write their JSON directly (see serialize.py) instead of
+# returning models for FastAPI to validate and encode; the response_model
+# declarations stay for the API docs.
+
+FIELDS_DESCRIPTION = "Comma-separated creator fields to return, e.g. handle,platforms (id is always included). All fields by default."
+
+def parse_fields(fields: Optional[str]):
+    try:
+        return serialize.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def json_response(body: str, roster_version: int, status_code: int = 200) -> Response:
+    return Response(content=body, status_code=status_code, media_type="application/json",
+                    headers={"X-Roster-Version": str(roster_version)})
@@ -0,0 +1,225 @@
+# backend/app/features.py
+
+import numpy as np
+from typing import Dict, List, Optional
+from sqlalchemy import delete, inspect, select, text, update
+from sqlalchemy.orm import Session
+from . import models, schemas, columnar, generations
+
+# Derived creator features, computed once when a creator is written.
+#
+# The scorer only needs normalized views of the raw JSON fields: lowercased
+# categories and tones, parsed age-range bounds, the adult flag, cost per
+# view. These are stored next to the creator row (scalar columns) and in
+# one-row-per-entry side tables, so building the match roster reads plain
+# typed columns instead of decoding and re-parsing JSON.
+
+BACKFILL_BATCH = 1000
+_PAD = columnar._PAD
+
+# Side table -> value columns, in the order load_columns reads them
+SIDE_TABLES = {
+    models.CreatorPlatform: ("platform",),
+    models.CreatorCategory: ("kind", "category"),
+    models.CreatorTone: ("tone",),
+    models.CreatorAudienceGeo: ("city", "share"),
+    models.CreatorAgeRange: ("minAge", "maxAge", "share"),
+}
+
+# Columns added to `creators` for older databases, with their SQL types
+FEATURE_COLUMNS = {"primaryVertical": "VARCHAR", "isAdult": "BOOLEAN", "costPerView": "FLOAT"}
+
+
+def parse_age_range(age_range: str):
+    """(low, high) for a "18-24" style key, or None (the scorer skips those)."""
+    try:
+        low, high = map(int, age_range.split('-'))
+    except ValueError:
+        return None
+    return low, high
+
+
+def derive_features(data: dict) -> dict:
+    """The scalar feature columns for a creator, given its CreatorCreate fields."""
+    verticals, avg_views = data["verticals"], data["avgViews"]
+    return {
+        "primaryVertical": verticals[0] if verticals else None,
+        "isAdult": bool(data["safetyFlags"].get("adult")),
+        "costPerView": data["basePriceINR"] / avg_views if avg_views > 0 else None,
+    }
+
+
+def feature_rows(creator_id: int, data: dict) -> Dict[type, List[dict]]:
+    """The side-table rows for one creator, keyed by model."""
+    rows = {model: [] for model in SIDE_TABLES}
+    for k, platform in enumerate(data["platforms"]):
+        rows[models.CreatorPlatform].append({"creator_id": creator_id, "position": k, "platform": platform})
+    for kind, field in (("vertical", "verticals"), ("past", "pastBrandCategories")):
+        for k, category in enumerate(data[field]):
+            rows[models.CreatorCategory].append(
+                {"creator_id": creator_id, "kind": kind, "position": k, "category": category.lower()}
+            )
+    for k, tone in enumerate(dict.fromkeys(t.lower() for t in data["contentTone"])):
+        rows[models.CreatorTone].append({"creator_id": creator_id, "position": k, "tone": tone})
+    for k, (city, share) in enumerate(data["audienceGeo"].items()):
+        rows[models.CreatorAudienceGeo].append({"creator_id": creator_id, "position": k, "city": city, "share": share})
+    for k, (age_range, share) in enumerate(data["audienceAge"].items()):
+        bounds = parse_age_range(age_range)
+        if bounds is not None:
+            rows[models.CreatorAgeRange].append(
+                {"creator_id": creator_id, "position": k, "minAge": bounds[0], "maxAge": bounds[1], "share": share}
+            )
+    return rows
+
+
+def write_features(db: Session, creators: Dict[int, dict], replace: bool = True):
+    """
+    Writes the side-table rows for {creator id: CreatorCreate fields}. With
+    replace=True the creators' old rows are deleted first. Doesn't commit.
+    """
+    if not creators:
+        return
+    ids = list(creators)
+    batched = {model: [] for model in SIDE_TABLES}
+    for creator_id, data in creators.items():
+        for model, rows in feature_rows(creator_id, data).items():
+            batched[model].extend(rows)
+    for model, rows in batched.items():
+        if replace:
+            db.execute(delete(model).where(model.creator_id.in_(ids)))
+        if rows:
+            db.execute(model.__table__.insert(), rows)
+
+
+# --- Schema upgrade ---
+
+def upgrade(bind, verbose: bool = True) -> int:
+    """
+    Brings an existing database up to date: creates the side tables, adds the
+    feature columns to `creators` and backfills creators written before they
+    existed. Safe to run repeatedly. Returns the number of backfilled creators.
+    """
+    models.Base.metadata.create_all(bind=bind)
+    existing = {c["name"] for c in inspect(bind).get_columns("creators")}
+    missing = [name for name in FEATURE_COLUMNS if name not in existing]
+    if missing:
+        with bind.begin() as conn:
+            for name in missing:
+                conn.execute(text(f'ALTER TABLE creators ADD COLUMN "{name}" {FEATURE_COLUMNS[name]}'))
+        for index in models.Creator.__table__.indexes:
+            if any(c.name in missing for c in index.columns):
+                index.create(bind, checkfirst=True)
+
+    backfilled = 0
+    with Session(bind) as db:
+        generations.ensure(db)
+        while True:
+            # isAdult is never NULL once a creator's features were written
+            batch = db.execute(
+                select(models.Creator).where(models.Creator.isAdult.is_(None))
+                .order_by(models.Creator.id).limit(BACKFILL_BATCH)
+            ).scalars().all()
+            if not batch:
+                break
+            creators = {c.id: schemas.CreatorCreate.model_validate(c, from_attributes=True).model_dump() for c in batch}
+            db.execute(update(models.Creator), [{"id": i, **derive_features(d)} for i, d in creators.items()])
+            write_features(db, creators)
+            generations.bump(db, generations.CREATORS) # The roster's feature columns changed
+            db.commit()
+            backfilled += len(batch)
+    if verbose and backfilled:
+        print(f"Backfilled derived features for {backfilled} creators.")
+    return backfilled
+
+
+# --- Reading ---
+
+def _matrix(n: int, rows: np.ndarray, positions: np.ndarray, values, fill, dtype) -> np.ndarray:
+    """Scatters (row, position, value) triples into a padded (n, K) matrix."""
+    width = int(positions.max()) + 1 if len(positions) else 1
+    out = np.full((n, width), fill, dtype=dtype)
+    out[rows, positions] = values
+    return out
+
+
+def _encode(values, vocab: Dict[str, int]) -> np.ndarray:
+    return np.array([vocab.setdefault(v, len(vocab)) for v in values], dtype=np.int32)
+
+
+def load_columns(db: Session, creators: List[schemas.Creator]) -> Optional[columnar.CreatorColumns]:
+    """
+    Builds the CreatorColumns for `creators` (in id order, as loaded by
+    snapshot.load_creators) from the feature columns and side tables. Returns
+    None if some creators have no stored features yet.
+    """
+    C = models.Creator
+    scalars = db.connection().execute(
+        select(C.id, C.avgViews, C.engagementRate, C.basePriceINR, C.costPerView, C.isAdult, C.primaryVertical)
+        .order_by(C.id)
+    ).all()
+    ids = np.array([row[0] for row in scalars], dtype=np.int64)
+    if len(ids) != len(creators) or any(row[5] is None for row in scalars) or \
+            not np.array_equal(ids, [c.id for c in creators]):
+        return None # Not backfilled (or the table changed under us); encode from the records instead
+
+    n = len(ids)
+    cols = columnar.CreatorColumns.__new__(columnar.CreatorColumns)
+    cols.creators = list(creators)
+    for name in cols.VOCABS:
+        setattr(cols, name, {})
+
+    # 1. Scalar columns
+    cols.avg_views = np.array([row[1] for row in scalars], dtype=np.int64)
+    cols.engagement_rate = np.array([row[2] for row in scalars], dtype=np.float64)
+    cols.base_price = np.array([row[3] for row in scalars], dtype=np.int64)
+    cols.cost_per_view = np.array([np.inf if row[4] is None else row[4] for row in scalars], dtype=np.float64)
+    cols.adult = np.array([row[5] for row in scalars], dtype=bool)
+    cols.primary_vertical = np.array(
+        [_PAD if row[6] is None else cols.primary_vocab.setdefault(row[6], len(cols.primary_vocab)) for row in scalars],
+        dtype=np.int32,
+    )
+
+    conn = db.connection() # Core rows; no ORM row processing
+
+    def side(model):
+        """(roster rows, positions, value columns) of a side table."""
+        value_columns = SIDE_TABLES[model]
+        result = conn.execute(
+            select(model.creator_id, model.position, *(getattr(model, c) for c in value_columns))
+        ).all()
+        if not result or not n:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, [np.zeros(0, dtype=object) for _ in value_columns]
+        columns = list(zip(*result))
+        creator_ids = np.array(columns[0], dtype=np.int64)
+        rows = np.searchsorted(ids, creator_ids)
+        keep = (rows < n) & (ids[np.minimum(rows, n - 1)] == creator_ids) # Drops rows of deleted creators
+        positions = np.array(columns[1], dtype=np.int64)[keep]
+        return rows[keep], positions, [np.array(c, dtype=object)[keep] for c in columns[2:]]
+
+    # 2. Relevance columns
+    rows, positions, (kinds, categories) = side(models.CreatorCategory)
+    is_vertical = kinds == "vertical"
+    codes = _encode(categories, cols.category_vocab)
+    cols.vertical_codes = _matrix(n, rows[is_vertical], positions[is_vertical], codes[is_vertical], _PAD, np.int32)
+    cols.past_codes = _matrix(n, rows[~is_vertical], positions[~is_vertical], codes[~is_vertical], _PAD, np.int32)
+
+    rows, positions, (tones,) = side(models.CreatorTone)
+    cols.tone_codes = _matrix(n, rows, positions, _encode(tones, cols.tone_vocab), _PAD, np.int32)
+
+    # 3. Constraint columns
+    rows, positions, (platforms,) = side(models.CreatorPlatform)
+    cols.platform_codes = _matrix(n, rows, positions, _encode(platforms, cols.platform_vocab), _PAD, np.int32)
+
+    # 4. Audience columns
+    rows, positions, (cities, shares) = side(models.CreatorAudienceGeo)
+    cols.geo_codes = _matrix(n, rows, positions, _encode(cities, cols.geo_vocab), _PAD, np.int32)
+    cols.geo_shares = _matrix(n, rows, positions, shares, 0, np.float64)
+
+    rows, positions, (lows, highs, shares) = side(models.CreatorAgeRange)
+    cols.age_low = _matrix(n, rows, positions, lows, 0, np.int64)
+    cols.age_high = _matrix(n, rows, positions, highs, 0, np.int64)
+    cols.age_shares = _matrix(n, rows, positions, shares, 0, np.float64)
+    cols.age_valid = _matrix(n, rows, positions, True, False, bool)
+    return cols
+
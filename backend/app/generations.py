@@ -0,0 +1,46 @@
+# backend/app/generations.py
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from . import models
+
+# Change counters kept in the database, so a process can tell that the
+# creators or brands were written by another one: another uvicorn worker, the
+# ingest / seed CLIs, a job running elsewhere. Writers bump the counter in the
+# same transaction as their rows; readers compare it with the value their
+# in-memory copy was built from (snapshot.py, shortlists.py).
+
+CREATORS = "creators"
+BRANDS = "brands"
+NAMES = (CREATORS, BRANDS)
+
+
+def read(db: Session, name: str) -> int:
+    """The current value of counter `name` (0 if it has no row yet)."""
+    return db.execute(select(models.Generation.value).where(models.Generation.name == name)).scalar() or 0
+
+
+def bump(db: Session, name: str) -> int:
+    """Increments counter `name` in the caller's transaction. Returns the new value."""
+    result = db.execute(
+        update(models.Generation).where(models.Generation.name == name).values(value=models.Generation.value + 1),
+        execution_options={"synchronize_session": False},
+    )
+    if result.rowcount == 0: # Database older than the counters and not upgraded since
+        db.add(models.Generation(name=name, value=1))
+        db.flush()
+    return read(db, name)
+
+
+def ensure(db: Session):
+    """Creates the missing counter rows (run by features.upgrade)."""
+    existing = set(db.execute(select(models.Generation.name)).scalars())
+    missing = [name for name in NAMES if name not in existing]
+    if not missing:
+        return
+    db.add_all(models.Generation(name=name, value=0) for name in missing)
+    try:
+        db.commit()
+    except IntegrityError: # Another process created them first
+        db.rollback()
@@ -0,0 +1,102 @@
+# backend/app/indexes.py
+
+import numpy as np
+from typing import Dict, Tuple
+from . import schemas
+from .columnar import CreatorColumns, _PAD
+
+# Inverted indexes over a creator roster. They let us resolve the hard
+# constraints of a brief (budget, platforms, adult content) to a candidate
+# set with a few bitmap operations, so the expensive scoring only has to run
+# for creators that can actually qualify.
+#
+# Bitmaps are NumPy bool masks packed 8 rows per byte (np.packbits).
+
+
+def _postings(codes: np.ndarray) -> Dict[int, np.ndarray]:
+    """Turns a padded (N, K) code matrix into {code: sorted unique row ids}."""
+    rows, cols = np.nonzero(codes != _PAD)
+    values = codes[rows, cols]
+    order = np.lexsort((rows, values))
+    values, rows = values[order], rows[order]
+
+    # Drop repeated (code, row) pairs, e.g. "Fashion" and "fashion" on one creator
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1:] = (values[1:] != values[:-1]) | (rows[1:] != rows[:-1])
+    values, rows = values[keep], rows[keep]
+
+    bounds = np.flatnonzero(np.diff(values)) + 1
+    return {int(group[0]): r for group, r in zip(np.split(values, bounds), np.split(rows, bounds)) if len(group)}
+
+
+class ConstraintIndex:
+    """Platform, category, price and safety indexes for one CreatorColumns."""
+
+    def __init__(self, cols: CreatorColumns):
+        self.size = len(cols)
+
+        # 1. platform -> bitmap of creators on that platform (case-sensitive, like the scorer)
+        platform_rows = _postings(cols.platform_codes)
+        self.platform_bitmaps: Dict[str, np.ndarray] = {
+            name: self._bitmap(platform_rows[code])
+            for name, code in cols.platform_vocab.items() if code in platform_rows
+        }
+
+        # 2. lowercased vertical / past brand category -> creator ids
+        vertical_rows = _postings(cols.vertical_codes)
+        past_rows = _postings(cols.past_codes)
+        self.vertical_rows: Dict[str, np.ndarray] = {
+            name: vertical_rows[code] for name, code in cols.category_vocab.items() if code in vertical_rows
+        }
+        self.past_category_rows: Dict[str, np.ndarray] = {
+            name: past_rows[code] for name, code in cols.category_vocab.items() if code in past_rows
+        }
+
+        # 3. Prices sorted ascending, for budget range cuts
+        self.price_order = np.argsort(cols.base_price, kind="stable")
+        self.sorted_prices = cols.base_price[self.price_order]
+
+        # 4. Safety flag bitmap
+        self.adult_bitmap = np.packbits(cols.adult)
+
+    def _bitmap(self, rows: np.ndarray) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+
+    def _unpack(self, bitmap: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bitmap, count=self.size).astype(bool)
+
+    def within_budget(self, budget: int) -> np.ndarray:
+        """Row ids with basePriceINR <= budget, cheapest first."""
+        return self.price_order[:np.searchsorted(self.sorted_prices, budget, side="right")]
+
+    def category_rows(self, category: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Row ids whose verticals / past brand categories contain `category` (case-insensitive)."""
+        empty = np.empty(0, dtype=np.int64)
+        key = category.lower()
+        return self.vertical_rows.get(key, empty), self.past_category_rows.get(key, empty)
+
+    def constraint_masks(self, brief: schemas.BrandBrief) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Same result as columnar.constraint_masks, resolved from the indexes."""
+        budget_ok = np.zeros(self.size, dtype=bool)
+        budget_ok[self.within_budget(brief.budgetINR)] = True
+        return budget_ok, self.platform_mask(brief.platforms), self.safety_mask(brief)
+
+    def platform_mask(self, platforms) -> np.ndarray:
+        """Creators on any of `platforms`."""
+        bitmaps = [self.platform_bitmaps[p] for p in platforms if p in self.platform_bitmaps]
+        if bitmaps:
+            return self._unpack(np.bitwise_or.reduce(bitmaps))
+        return np.zeros(self.size, dtype=bool)
+
+    def safety_mask(self, brief: schemas.BrandBrief) -> np.ndarray:
+        """Creators allowed by the brief's content constraints."""
+        if brief.constraints.get("noAdultContent"):
+            return self._unpack(~self.adult_bitmap)
+        return np.ones(self.size, dtype=bool)
+
+    def candidates(self, brief: schemas.BrandBrief) -> np.ndarray:
+        """Sorted row ids of the creators that pass every hard constraint."""
+        budget_ok, platform_ok, safety_ok = self.constraint_masks(brief)
+        return np.flatnonzero(budget_ok & platform_ok & safety_ok)
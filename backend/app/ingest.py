@@ -0,0 +1,336 @@
+# backend/app/ingest.py
+
+import argparse
+import codecs
+import json
+import os
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from . import models, schemas, snapshot, features, shortlists, generations
+from .database import SessionLocal, engine
+
+# Bulk, idempotent ingestion of creator / brand exports.
+#
+# - Files are streamed record by record (JSON arrays and NDJSON), never fully loaded.
+# - Rows are validated with CreatorCreate / BrandCreate a batch at a time;
+#   invalid rows (including NDJSON lines that aren't JSON objects) are
+#   reported and skipped instead of aborting the import. The first
+#   MAX_REPORTED_ERRORS messages are kept in the import statistics.
+# - Each batch is written with one multi-row upsert in its own transaction,
+#   keyed on creators.handle / brands.name.
+# - After every committed batch the byte offset is saved to a checkpoint file,
+#   so an interrupted import picks up where it stopped.
+#
+# Usage: python -m app.ingest data/creators.json --kind creators
+
+BATCH_SIZE = 1000
+READ_SIZE = 1 << 16
+MAX_REPORTED_ERRORS = 100
+
+KINDS = {
+    "creators": (models.Creator, schemas.CreatorCreate, "handle"),
+    "brands": (models.Brand, schemas.BrandCreate, "name"),
+}
+
+
+# --- Streaming readers ---
+# Both yield (record, byte offset just after the record).
+
+class InvalidRecord(NamedTuple):
+    """A record that couldn't even be decoded; validate_batch reports it as invalid."""
+    line: int
+    error: str
+
+
+def _count_lines(f, offset: int) -> int:
+    """Newlines in the first `offset` bytes (to number the lines of a resumed read)."""
+    f.seek(0)
+    count = 0
+    while offset > 0:
+        chunk = f.read(min(READ_SIZE, offset))
+        if not chunk:
+            break
+        count += chunk.count(b"\n")
+        offset -= len(chunk)
+    return count
+
+
+def _iter_ndjson(f, offset: int) -> Iterator[Tuple[dict, int]]:
+    line_number = _count_lines(f, offset) if offset else 0
+    f.seek(offset)
+    while True:
+        line = f.readline()
+        if not line:
+            return
+        offset += len(line)
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e: # JSONDecodeError, or bytes that aren't UTF-8
+            yield InvalidRecord(line_number, f"not valid JSON ({e})"), offset
+            continue
+        if not isinstance(record, dict):
+            yield InvalidRecord(line_number, f"expected a JSON object, got {type(record).__name__}"), offset
+            continue
+        yield record, offset
+
+
+def _iter_json_array(f, offset: int) -> Iterator[Tuple[dict, int]]:
+    """Decodes the objects of a top-level JSON array one at a time."""
+    f.seek(offset)
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf, pos, pos_offset = "", 0, offset # pos_offset = byte offset of buf[pos]
+    in_array = offset > 0 # Resumed reads start inside the array
+    eof = False
+
+    while True:
+        # Skip separators between records
+        i = pos
+        while i < len(buf) and (buf[i].isspace() or buf[i] == "," or (buf[i] == "[" and not in_array)):
+            in_array = in_array or buf[i] == "["
+            i += 1
+        if i < len(buf) and buf[i] == "]":
+            return
+        try:
+            if i == len(buf):
+                raise json.JSONDecodeError("Need more data", buf, i)
+            record, end = decoder.raw_decode(buf, i)
+        except json.JSONDecodeError:
+            if eof:
+                if buf[i:].strip():
+                    raise
+                return
+            # Refill, dropping what has already been consumed
+            chunk = f.read(READ_SIZE)
+            eof = not chunk
+            buf = buf[pos:] + utf8.decode(chunk, final=eof)
+            pos = 0
+            continue
+
+        pos_offset += len(buf[pos:end].encode("utf-8"))
+        pos = end
+        yield record, pos_offset
+
+
+def iter_records(path: str, offset: int = 0) -> Iterator[Tuple[dict, int]]:
+    """Streams records from a .json array or an .ndjson / .jsonl file."""
+    with open(path, "rb") as f:
+        if path.endswith((".ndjson", ".jsonl")):
+            yield from _iter_ndjson(f, offset)
+        else:
+            yield from _iter_json_array(f, offset)
+
+
+# --- Checkpoints ---
+
+def _checkpoint_path(path: str) -> str:
+    return path + ".checkpoint"
+
+
+def _file_signature(path: str) -> Dict[str, float]:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def load_checkpoint(path: str) -> Optional[dict]:
+    """The saved progress for `path`, if it was written for this exact file."""
+    try:
+        with open(_checkpoint_path(path)) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get("file") != _file_signature(path):
+        return None # The file changed since; start over
+    return checkpoint
+
+
+def save_checkpoint(path: str, offset: int, stats: dict):
+    tmp = _checkpoint_path(path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"file": _file_signature(path), "offset": offset, "stats": stats}, f)
+    os.replace(tmp, _checkpoint_path(path)) # Atomic, so a crash never leaves half a checkpoint
+
+
+# --- Writing ---
+
+def _upsert_statement(db: Session, model, columns: List[str], key: str, update: bool):
+    """
+    A dialect-specific INSERT ... ON CONFLICT, or None if unsupported. It's
+    executed with the whole batch as parameters, which SQLAlchemy sends as
+    multi-row INSERTs from one cached, compiled statement.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    stmt = insert(model)
+    if update:
+        return stmt.on_conflict_do_update(
+            index_elements=[key], set_={c: getattr(stmt.excluded, c) for c in columns if c != key}
+        )
+    return stmt.on_conflict_do_nothing(index_elements=[key])
+
+
+def write_batch(db: Session, kind: str, rows: List[dict], update: bool = False) -> Dict[str, int]:
+    """Upserts one batch of validated rows in a single transaction."""
+    model, _, key = KINDS[kind]
+    rows = list({row[key]: row for row in rows}.values()) # Last one wins within a batch
+    if kind == "creators":
+        rows = [dict(row, **features.derive_features(row)) for row in rows]
+    keys = [row[key] for row in rows]
+    existing = set(db.execute(select(getattr(model, key)).where(getattr(model, key).in_(keys))).scalars())
+
+    new_rows = [row for row in rows if row[key] not in existing]
+    changed_rows = [row for row in rows if row[key] in existing] if update else []
+
+    # brands.name has no unique constraint, so brands can't use ON CONFLICT
+    stmt = _upsert_statement(db, model, list(rows[0]), key, update) if kind == "creators" else None
+    if stmt is not None:
+        db.execute(stmt, rows)
+    else:
+        if new_rows:
+            db.execute(model.__table__.insert(), new_rows)
+        for row in changed_rows:
+            db.query(model).filter(getattr(model, key) == row[key]).update(row, synchronize_session=False)
+    if kind == "creators":
+        _write_features(db, new_rows, changed_rows)
+    if new_rows or changed_rows:
+        generations.bump(db, generations.CREATORS if kind == "creators" else generations.BRANDS)
+    db.commit()
+    return {
+        "inserted": len(new_rows),
+        "updated": len(changed_rows),
+        "skipped": len(rows) - len(new_rows) - len(changed_rows),
+    }
+
+
+def _write_features(db: Session, new_rows: List[dict], changed_rows: List[dict]):
+    """Writes the feature side tables for the creators this batch inserted or updated."""
+    written = new_rows + changed_rows
+    if not written:
+        return
+    handles = [row["handle"] for row in written]
+    ids = dict(db.execute(select(models.Creator.handle, models.Creator.id).where(models.Creator.handle.in_(handles))).all())
+    features.write_features(db, {ids[row["handle"]]: row for row in new_rows}, replace=False)
+    features.write_features(db, {ids[row["handle"]]: row for row in changed_rows})
+
+
+def validate_batch(kind: str, records: List[dict]) -> Tuple[List[dict], List[str]]:
+    """Validates raw records. Returns (valid rows as dicts, error messages)."""
+    _, schema, key = KINDS[kind]
+    rows, errors = [], []
+    for record in records:
+        if isinstance(record, InvalidRecord):
+            errors.append(f"line {record.line}: {record.error}")
+            continue
+        try:
+            rows.append(schema.model_validate(record).model_dump())
+        except ValidationError as e:
+            label = record.get(key, "?") if isinstance(record, dict) else "?"
+            errors.append(f"{label}: {e.error_count()} validation error(s): {e.errors()[0]['msg']}")
+    return rows, errors
+
+
+def ingest_file(path: str, kind: str = "creators", batch_size: int = BATCH_SIZE, update: bool = False,
+                resume: bool = True, progress_every: float = 5.0, verbose: bool = True,
+                progress: Optional[Callable[[int, dict], None]] = None) -> dict:
+    """
+    Streams `path` into the database. Existing rows (same handle / name) are
+    skipped, or overwritten with update=True, so re-running an import is safe.
+    With resume=False any saved checkpoint is ignored (a new one is still
+    written). `progress(byte offset, stats)` is called after every committed
+    batch; an exception it raises stops the import at that checkpoint.
+    Returns the import statistics.
+    """
+    features.upgrade(engine, verbose=verbose) # Creates the tables if needed
+
+    stats = {"read": 0, "inserted": 0, "updated": 0, "skipped": 0, "invalid": 0, "errors": []}
+    offset = 0
+    checkpoint = load_checkpoint(path) if resume else None
+    if checkpoint:
+        offset = checkpoint["offset"]
+        stats.update(checkpoint["stats"])
+        if verbose:
+            print(f"Resuming {path} from byte {offset:,} ({stats['read']:,} records already done)")
+
+    started = last_report = time.monotonic()
+    read_at_start = stats["read"]
+    db = SessionLocal()
+    try:
+        records: List[dict] = []
+        for record, end_offset in iter_records(path, offset):
+            records.append(record)
+            if len(records) < batch_size:
+                continue
+            _flush(db, kind, records, update, stats, verbose)
+            save_checkpoint(path, end_offset, stats)
+            records = []
+            if progress is not None:
+                progress(end_offset, stats)
+
+            now = time.monotonic()
+            if verbose and now - last_report >= progress_every:
+                rate = (stats["read"] - read_at_start) / (now - started)
+                print(f"  {stats['read']:,} {kind} processed ({rate:,.0f} rows/sec)")
+                last_report = now
+        if records:
+            _flush(db, kind, records, update, stats, verbose)
+    finally:
+        db.close()
+        # Batches are committed one by one, so an import that failed or was
+        # cancelled partway has still written rows the readers must see
+        if stats["inserted"] or stats["updated"]:
+            _announce(kind)
+
+    # The whole import finished; the checkpoint is no longer needed
+    if os.path.exists(_checkpoint_path(path)):
+        os.remove(_checkpoint_path(path))
+
+    elapsed = time.monotonic() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round((stats["read"] - read_at_start) / elapsed, 1) if elapsed > 0 else 0.0
+
+    if verbose:
+        print(f"Ingested {path}: {stats}")
+    return stats
+
+
+def _announce(kind: str):
+    """Tells the in-memory readers that an import wrote `kind` rows."""
+    if kind == "creators":
+        snapshot.invalidate() # Too many changes to patch; rebuild on next match
+    else:
+        shortlists.match_shortlists.notify()
+
+
+def _flush(db: Session, kind: str, records: List[dict], update: bool, stats: dict, verbose: bool):
+    rows, errors = validate_batch(kind, records)
+    stats["read"] += len(records)
+    stats["invalid"] += len(errors)
+    stats["errors"].extend(errors[:MAX_REPORTED_ERRORS - len(stats["errors"])])
+    if verbose:
+        for error in errors:
+            print(f"  Skipped invalid record {error}")
+    if rows:
+        for name, count in write_batch(db, kind, rows, update).items():
+            stats[name] += count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load creators or brands from a JSON / NDJSON file.")
+    parser.add_argument("path")
+    parser.add_argument("--kind", choices=sorted(KINDS), default="creators")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--update", action="store_true", help="Overwrite existing rows instead of skipping them")
+    parser.add_argument("--restart", action="store_true", help="Ignore any saved checkpoint")
+    args = parser.parse_args()
+    ingest_file(args.path, args.kind, args.batch_size, update=args.update, resume=not args.restart)
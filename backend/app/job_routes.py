@@ -0,0 +1,113 @@
+# backend/app/job_routes.py
+
+import os
+from typing import List, Optional
+from fastapi import APIRouter, Request, Response, Query, Path, HTTPException
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from . import schemas, jobs
+from .dependencies import FIELDS_DESCRIPTION, parse_fields
+
+# Job queue endpoints, included by main.py when "jobs" is in API_FEATURES.
+
+router = APIRouter()
+
+BULK_FORMAT = Query(None, pattern="^(csv|ndjson)$", description="Upload format; taken from the Content-Type if omitted")
+BULK_OUTPUT = Query("ndjson", pattern="^(csv|ndjson)$", description="Result file format")
+
+
+# --- Background jobs ---
+# Long operations run on the job queue (see jobs.py): submitting returns the
+# job (202) and its progress / result are fetched separately.
+
+def submit_job(kind: str, params: dict, job_id: Optional[str] = None):
+    try:
+        job = jobs.job_queue.submit(kind, params, job_id)
+    except jobs.QueueFull:
+        raise HTTPException(status_code=503, detail="Too many jobs waiting; try again later", headers={"Retry-After": "30"})
+    return JSONResponse(job, status_code=202, headers={"Location": f"/api/jobs/{job['id']}"})
+
+@router.post("/api/jobs/match/batch", response_model=schemas.Job, status_code=202)
+def submit_batch_match_job(request: schemas.BatchMatchRequest, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    """Queues /api/match/batch for a large list of briefs. The result is the same JSON."""
+    projection = parse_fields(fields)
+    params = {
+        "briefs": [brief.model_dump() for brief in request.briefs],
+        "limit": request.limit,
+        "fields": list(projection) if projection else None,
+    }
+    return submit_job("match.batch", params)
+
+@router.post("/api/jobs/billing/{kind}", response_model=schemas.Job, status_code=202)
+async def submit_billing_job(request: Request, kind: str = Path(..., pattern="^(brand|creator)$"),
+                             format: Optional[str] = BULK_FORMAT, output: str = BULK_OUTPUT):
+    """Queues a bulk billing file (see /api/billing/{kind}/bulk). The result is its per-row result file."""
+    from . import billing
+
+    try:
+        input_format = billing.detect_format(format, request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    job_id = jobs.job_queue.new_id()
+    path = await jobs.job_queue.save_upload(job_id, request.stream(), input_format)
+    return submit_job("billing", {"kind": kind, "format": input_format, "output": output, "input": path}, job_id)
+
+@router.post("/api/jobs/ingest", response_model=schemas.Job, status_code=202)
+async def submit_ingest_job(
+    request: Request,
+    kind: str = Query("creators", pattern="^(creators|brands)$"),
+    format: str = Query("ndjson", pattern="^(json|ndjson)$", description="A JSON array or NDJSON"),
+    update: bool = Query(False, description="Overwrite existing rows instead of skipping them"),
+):
+    """Queues an import of the uploaded creators / brands file (see ingest.py). The result is the import statistics."""
+    job_id = jobs.job_queue.new_id()
+    path = await jobs.job_queue.save_upload(job_id, request.stream(), format)
+    return submit_job("ingest", {"kind": kind, "update": update, "input": path}, job_id)
+
+@router.post("/api/jobs/seed", response_model=schemas.Job, status_code=202)
+def submit_seed_job():
+    """Queues loading the bundled sample data (see seed.py)."""
+    return submit_job("seed", {})
+
+@router.get("/api/jobs", response_model=List[schemas.Job])
+def list_jobs(limit: int = Query(50, ge=1, le=500), status: Optional[str] = Query(None)):
+    """The most recent jobs, newest first."""
+    return [jobs.job_dict(job) for job in jobs.job_queue.list(limit, status)]
+
+def get_job_or_404(job_id: str):
+    job = jobs.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/api/jobs/{job_id}", response_model=schemas.Job)
+def get_job(job_id: str):
+    """A job's status and progress."""
+    return jobs.job_dict(get_job_or_404(job_id))
+
+@router.get("/api/jobs/{job_id}/events")
+def stream_job_events(job_id: str):
+    """Streams the job's state as NDJSON, one line per change, until it finishes."""
+    get_job_or_404(job_id)
+    return StreamingResponse(jobs.job_queue.events(job_id), media_type="application/x-ndjson")
+
+@router.get("/api/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """The result file of a job that succeeded."""
+    job = get_job_or_404(job_id)
+    if job.status != jobs.SUCCEEDED or not job.resultFile:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}; no result")
+    if not os.path.exists(job.resultFile):
+        raise HTTPException(status_code=410, detail="Job result file is gone")
+    return FileResponse(job.resultFile, media_type=job.resultType)
+
+@router.delete("/api/jobs/{job_id}", response_model=schemas.Job)
+def cancel_job(job_id: str):
+    """
+    Cancels a queued or running job (a running one stops at its next
+    checkpoint). Deleting a finished job removes it and its result.
+    """
+    job = get_job_or_404(job_id)
+    if job.status in jobs.FINISHED:
+        jobs.job_queue.delete(job_id)
+        return Response(status_code=204)
+    return jobs.job_queue.cancel(job_id)
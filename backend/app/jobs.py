@@ -0,0 +1,487 @@
+# backend/app/jobs.py
+
+import asyncio
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from sqlalchemy import delete, select, update
+from . import models, schemas, serialize
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Background jobs for work too long for a request: batch matching over many
+# briefs, bulk billing files, ingestion and seeding.
+#
+#   submit -> job id (202) -> poll GET /api/jobs/{id} or stream its events
+#          -> GET /api/jobs/{id}/result
+#
+# - Job state lives in the `jobs` table, so any API process can report on
+#   any job, and results outlive the process. Inputs and results are files
+#   in JOBS_DIR; the row points at them.
+# - Each process runs the jobs it accepted on JOB_WORKERS threads, fed from
+#   a queue of at most JOB_QUEUE_MAX waiting jobs. A full queue rejects new
+#   submissions (the API answers 503 with Retry-After) instead of piling up.
+# - Handlers report progress and check for cancellation through their
+#   JobContext. Both go through the database at most every
+#   JOB_SYNC_SECONDS, so a cancel sent to another API process still
+#   reaches the job at its next checkpoint.
+# - Jobs left queued / running by a process that no longer exists (on this
+#   host) are marked failed when the app starts (startup.py), or at the
+#   queue's first use in processes that don't run the app (the CLIs).
+# - Finished jobs are kept for JOB_RETENTION_SECONDS, and the oldest are
+#   deleted early once their results take more than JOB_RESULTS_MAX_BYTES.
+#   Stray files (e.g. an upload whose submission was rejected) go after the
+#   same age.
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_QUEUE_MAX = int(os.environ.get("JOB_QUEUE_MAX", "100"))
+JOB_SYNC_SECONDS = float(os.environ.get("JOB_SYNC_SECONDS", "0.5"))
+JOBS_DIR = os.environ.get("JOBS_DIR", "./jobs")
+JOB_RETENTION_SECONDS = float(os.environ.get("JOB_RETENTION_SECONDS", "86400"))
+JOB_RESULTS_MAX_BYTES = int(os.environ.get("JOB_RESULTS_MAX_BYTES", str(1024 * 1024 * 1024)))
+PURGE_INTERVAL = 60.0 # Seconds between retention sweeps
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+WORKER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class QueueFull(Exception):
+    """Too many jobs are already waiting; try again later."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job was cancelled."""
+
+
+class JobContext:
+    """What a running handler sees: its parameters, progress reporting and its result file."""
+
+    def __init__(self, job_id: str, params: dict):
+        self.id = job_id
+        self.params = params
+        self.done = 0
+        self.total: Optional[int] = None
+        self.message: Optional[str] = None
+        self.result_file: Optional[str] = None
+        self.result_type: Optional[str] = None
+        self._synced = 0.0
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        """Records progress and checks for cancellation (both throttled)."""
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        self.check()
+
+    def check(self):
+        """Raises JobCancelled if the job was cancelled. Cheap to call often."""
+        now = time.monotonic()
+        if now - self._synced < JOB_SYNC_SECONDS:
+            return
+        self._synced = now
+        with SessionLocal() as db:
+            db.execute(
+                update(models.Job).where(models.Job.id == self.id)
+                .values(done=self.done, total=self.total, message=self.message)
+            )
+            db.commit()
+            cancelled = db.execute(select(models.Job.cancelRequested).where(models.Job.id == self.id)).scalar()
+        if cancelled:
+            raise JobCancelled()
+
+    def open_result(self, media_type: str, suffix: str):
+        """Opens the job's result file for writing (text)."""
+        self.result_file = job_path(self.id, f"result.{suffix}")
+        self.result_type = media_type
+        return open(self.result_file, "w", encoding="utf-8", newline="")
+
+
+# --- Handlers ---
+# handler(ctx) runs the job and writes its result with ctx.open_result.
+
+HANDLERS: Dict[str, Callable[[JobContext], None]] = {}
+
+
+def handler(kind: str):
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def job_path(job_id: str, name: str) -> str:
+    return os.path.join(JOBS_DIR, f"{job_id}.{name}")
+
+
+@handler("match.batch")
+def run_match_batch(ctx: JobContext):
+    """Ranked matches for every brief, as one JSON array of arrays (like /api/match/batch)."""
+    from . import batch, snapshot
+
+    briefs = [schemas.BrandBrief.model_validate(b) for b in ctx.params["briefs"]]
+    limit = ctx.params.get("limit")
+    fields = tuple(ctx.params["fields"]) if ctx.params.get("fields") else None
+    step = max(batch.CHUNK_SIZE, batch.BATCH_WORKERS * batch.CHUNK_SIZE)
+    with SessionLocal() as db:
+        roster = snapshot.get_snapshot(db) # One roster for the whole job
+    with ctx.open_result("application/json", "json") as out:
+        out.write("[")
+        for start in range(0, len(briefs), step):
+            ctx.progress(start, len(briefs))
+            results = batch.match_batch(briefs[start:start + step], roster, limit, fields)
+            out.write(("," if start else "") + ",".join(results))
+        out.write("]")
+    ctx.progress(len(briefs), message=f"roster version {roster.version}")
+
+
+@handler("billing")
+def run_billing(ctx: JobContext):
+    """A bulk billing file (see billing.py); the result is its per-row result file."""
+    from . import billing
+
+    kind = billing.BRAND if ctx.params["kind"] == "brand" else billing.CREATOR
+    output = ctx.params.get("output", "ndjson")
+    upload = open(ctx.params["input"], "rb")
+    total = os.fstat(upload.fileno()).st_size
+    media_type = "text/csv" if output == "csv" else "application/x-ndjson"
+    with ctx.open_result(media_type, output) as out:
+        for chunk in billing.process(upload, ctx.params["format"], kind, output):
+            out.write(chunk)
+            if not upload.closed:
+                ctx.progress(upload.tell(), total) # Bytes read
+    ctx.progress(total, total)
+
+
+@handler("ingest")
+def run_ingest(ctx: JobContext):
+    """Imports an uploaded creators / brands file (see ingest.py); the result is the import statistics."""
+    from . import ingest
+
+    path = ctx.params["input"]
+    total = os.path.getsize(path)
+    stats = ingest.ingest_file(
+        path, ctx.params["kind"], update=ctx.params.get("update", False), verbose=False,
+        progress=lambda offset, s: ctx.progress(offset, total, f"{s['read']:,} records read"),
+    )
+    with ctx.open_result("application/json", "json") as out:
+        out.write(serialize.dumps(stats))
+    ctx.progress(total, total)
+
+
+@handler("seed")
+def run_seed(ctx: JobContext):
+    """Loads the bundled data files (see seed.py); the result is the import statistics per kind."""
+    from . import seed
+
+    stats = seed.seed_data(verbose=False, progress=lambda kind, offset, s: ctx.progress(offset, message=f"{kind}: {s['read']:,} read"))
+    with ctx.open_result("application/json", "json") as out:
+        out.write(serialize.dumps(stats))
+
+
+# --- Queue ---
+
+def job_dict(job: models.Job) -> dict:
+    """The schemas.Job fields of a job row."""
+    progress = None
+    if job.total:
+        progress = round(min(job.done or 0, job.total) / job.total, 4)
+    elif job.status == SUCCEEDED:
+        progress = 1.0
+    return {
+        "id": job.id, "kind": job.kind, "status": job.status, "done": job.done or 0, "total": job.total,
+        "progress": progress, "message": job.message, "error": job.error, "createdAt": job.createdAt,
+        "startedAt": job.startedAt, "finishedAt": job.finishedAt,
+        "resultUrl": f"/api/jobs/{job.id}/result" if job.status == SUCCEEDED and job.resultFile else None,
+    }
+
+
+class JobQueue:
+    """A bounded queue of jobs run by a fixed pool of threads in this process."""
+
+    def __init__(self, workers: int = JOB_WORKERS, maxsize: int = JOB_QUEUE_MAX):
+        self.workers = workers
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._purged_at = 0.0
+        self._recovered = False
+
+    def housekeeping(self):
+        """Recovers interrupted jobs and purges old ones, once per process. Run at startup and on first use."""
+        with self._lock:
+            if self._recovered:
+                return
+            self._recovered = True
+            try:
+                self.recover()
+            except Exception: # E.g. the schema isn't there yet; the next process start retries
+                logger.exception("Recovering interrupted jobs failed")
+        self._maybe_purge()
+
+    def _start(self):
+        self.housekeeping()
+        with self._lock:
+            if self._threads:
+                return
+            os.makedirs(JOBS_DIR, exist_ok=True)
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def new_id(self) -> str:
+        """A fresh job id, for naming the input file before submitting."""
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        return uuid.uuid4().hex
+
+    def submit(self, kind: str, params: dict, job_id: Optional[str] = None) -> dict:
+        """Stores and queues a job. Raises QueueFull if too many are waiting."""
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        self._start()
+        if self._queue.full():
+            raise QueueFull()
+        job = models.Job(
+            id=job_id or self.new_id(), kind=kind, status=QUEUED, params=params, worker=WORKER,
+            cancelRequested=False, done=0, createdAt=time.time(),
+        )
+        with SessionLocal() as db:
+            db.add(job)
+            db.commit()
+            info = job_dict(job)
+        try:
+            self._queue.put_nowait(job.id)
+        except queue.Full: # Lost a race for the last slot
+            self._finish(job.id, FAILED, error="Job queue is full")
+            raise QueueFull() from None
+        return info
+
+    async def save_upload(self, job_id: str, chunks: AsyncIterator[bytes], suffix: str) -> str:
+        """Writes a request body to the job's input file and returns its path."""
+        path = job_path(job_id, f"input.{suffix}")
+        with open(path, "wb") as f:
+            async for chunk in chunks:
+                f.write(chunk)
+        return path
+
+    def get(self, job_id: str) -> Optional[models.Job]:
+        self.housekeeping()
+        with SessionLocal() as db:
+            return db.get(models.Job, job_id)
+
+    def list(self, limit: int = 50, status: Optional[str] = None) -> List[models.Job]:
+        self.housekeeping()
+        with SessionLocal() as db:
+            query = select(models.Job).order_by(models.Job.createdAt.desc()).limit(limit)
+            if status:
+                query = query.where(models.Job.status == status)
+            return list(db.execute(query).scalars())
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """
+        Cancels a job: a queued job is cancelled at once, a running one at its
+        next checkpoint. Finished jobs are left as they are. None if unknown.
+        """
+        self.housekeeping()
+        with SessionLocal() as db:
+            db.execute(
+                update(models.Job).where(models.Job.id == job_id, models.Job.status.in_((QUEUED, RUNNING)))
+                .values(cancelRequested=True)
+            )
+            db.execute(
+                update(models.Job).where(models.Job.id == job_id, models.Job.status == QUEUED)
+                .values(status=CANCELLED, finishedAt=time.time())
+            )
+            db.commit()
+            job = db.get(models.Job, job_id)
+            return job_dict(job) if job is not None else None
+
+    def delete(self, job_id: str) -> bool:
+        """Removes a finished job and its files."""
+        self.housekeeping()
+        with SessionLocal() as db:
+            job = db.get(models.Job, job_id)
+            if job is None or job.status not in FINISHED:
+                return False
+            db.delete(job)
+            db.commit()
+        _remove_files(job_id)
+        return True
+
+    async def events(self, job_id: str, poll: float = JOB_SYNC_SECONDS) -> AsyncIterator[str]:
+        """
+        NDJSON lines with the job's state whenever it changes, until it finishes.
+        Waits on the event loop, so a watcher holds a thread only for each lookup.
+        """
+        last = None
+        while True:
+            job = await asyncio.to_thread(self.get, job_id)
+            if job is None:
+                return
+            state = serialize.dumps(job_dict(job))
+            if state != last:
+                yield state + "\n"
+                last = state
+            if job.status in FINISHED:
+                return
+            await asyncio.sleep(poll)
+
+    def recover(self):
+        """Fails the unfinished jobs of processes on this host that are gone."""
+        host = socket.gethostname()
+        with SessionLocal() as db:
+            jobs = db.execute(
+                select(models.Job.id, models.Job.worker).where(models.Job.status.in_((QUEUED, RUNNING)))
+            ).all()
+        for job_id, worker in jobs:
+            worker_host, _, pid = (worker or "").rpartition(":")
+            if worker_host == host and pid.isdigit() and not _alive(int(pid)) and worker != WORKER:
+                self._finish(job_id, FAILED, error="Interrupted: the process running it exited")
+
+    def purge(self, retention: float = JOB_RETENTION_SECONDS, max_bytes: int = JOB_RESULTS_MAX_BYTES) -> int:
+        """
+        Deletes the finished jobs older than `retention` seconds, then the oldest
+        finished ones while their results take more than `max_bytes`, and stray
+        files older than `retention`. Returns the number of jobs deleted.
+        """
+        cutoff = time.time() - retention
+        with SessionLocal() as db:
+            finished = db.execute(
+                select(models.Job.id, models.Job.finishedAt, models.Job.resultFile)
+                .where(models.Job.status.in_(FINISHED)).order_by(models.Job.finishedAt)
+            ).all()
+            active = set(db.execute(select(models.Job.id).where(models.Job.status.in_((QUEUED, RUNNING)))).scalars())
+
+            expired = {job_id for job_id, finished_at, _ in finished if (finished_at or 0) < cutoff}
+            kept = [(job_id, _file_size(path)) for job_id, _, path in finished if job_id not in expired]
+            total = sum(size for _, size in kept)
+            for job_id, size in kept: # Oldest first
+                if total <= max_bytes:
+                    break
+                expired.add(job_id)
+                total -= size
+            if expired:
+                db.execute(delete(models.Job).where(models.Job.id.in_(expired)))
+                db.commit()
+
+        known = active | {job_id for job_id, _, _ in finished if job_id not in expired}
+        if os.path.isdir(JOBS_DIR):
+            for name in os.listdir(JOBS_DIR):
+                path = os.path.join(JOBS_DIR, name)
+                job_id = name.split(".", 1)[0]
+                try:
+                    if job_id in expired or (job_id not in known and os.path.getmtime(path) < cutoff):
+                        os.remove(path)
+                except OSError:
+                    pass
+        if expired:
+            logger.info("Purged %d finished jobs", len(expired))
+        return len(expired)
+
+    def _maybe_purge(self):
+        """Runs purge() at most every PURGE_INTERVAL seconds."""
+        now = time.monotonic()
+        if now - self._purged_at < PURGE_INTERVAL:
+            return
+        self._purged_at = now
+        try:
+            self.purge()
+        except Exception: # Retention must never fail a job
+            logger.exception("Purging old jobs failed")
+
+    # --- Workers ---
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            except Exception: # Keep the worker alive whatever happens
+                logger.exception("Job %s crashed", job_id)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id: str):
+        with SessionLocal() as db:
+            claimed = db.execute(
+                update(models.Job).where(models.Job.id == job_id, models.Job.status == QUEUED)
+                .values(status=RUNNING, startedAt=time.time())
+            ).rowcount
+            db.commit()
+            job = db.get(models.Job, job_id)
+        if not claimed: # Cancelled while it waited
+            _remove_files(job_id, keep_result=False)
+            return
+
+        ctx = JobContext(job_id, job.params or {})
+        logger.info("Job %s (%s) started", job_id, job.kind)
+        try:
+            HANDLERS[job.kind](ctx)
+        except JobCancelled:
+            self._finish(job_id, CANCELLED, ctx)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job_id, job.kind)
+            self._finish(job_id, FAILED, ctx, error=f"{type(e).__name__}: {e}")
+        else:
+            self._finish(job_id, SUCCEEDED, ctx)
+        logger.info("Job %s finished", job_id)
+
+    def _finish(self, job_id: str, status: str, ctx: Optional[JobContext] = None, error: Optional[str] = None):
+        values = {"status": status, "finishedAt": time.time(), "error": error}
+        if ctx is not None:
+            values.update(done=ctx.done, total=ctx.total, message=ctx.message)
+            if status == SUCCEEDED:
+                values.update(resultFile=ctx.result_file, resultType=ctx.result_type)
+        with SessionLocal() as db:
+            db.execute(update(models.Job).where(models.Job.id == job_id).values(**values))
+            db.commit()
+        _remove_files(job_id, keep_result=status == SUCCEEDED)
+        self._maybe_purge()
+
+    def wait(self):
+        """Blocks until every queued job has run (for scripts and benchmarks)."""
+        self._queue.join()
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _file_size(path: Optional[str]) -> int:
+    try:
+        return os.path.getsize(path) if path else 0
+    except OSError:
+        return 0
+
+
+def _remove_files(job_id: str, keep_result: bool = False):
+    """Deletes a job's input (and checkpoint) files, and its result unless kept."""
+    if not os.path.isdir(JOBS_DIR):
+        return
+    prefix = f"{job_id}."
+    for name in os.listdir(JOBS_DIR):
+        if name.startswith(prefix) and not (keep_result and name.startswith(prefix + "result.")):
+            try:
+                os.remove(os.path.join(JOBS_DIR, name))
+            except OSError:
+                pass
+
+
+# Process-wide queue used by the /api/jobs endpoints
+job_queue = JobQueue()
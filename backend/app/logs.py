@@ -0,0 +1,87 @@
+# backend/app/logs.py
+
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Logging for the app.* modules.
+#
+# Records are put on an in-memory queue and written by a background thread,
+# so a slow stdout never stalls a request; if the queue is full they are
+# dropped (and counted) instead of blocking.
+#
+# Logs written on every match (the diversification messages of scoring.py
+# and columnar.py) go to a "<module>.sampled" child logger (sampled_logger)
+# and their INFO and DEBUG records are sampled: only LOG_SAMPLE_RATE of them
+# are kept. Everything else (job lifecycle, startup, migrations) and all
+# warnings and errors are always kept.
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", "0.1"))
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+SAMPLED = ".sampled"
+
+
+def sampled_logger(name: str) -> logging.Logger:
+    """The logger for `name`'s hot-path messages, whose INFO / DEBUG records are sampled."""
+    return logging.getLogger(name + SAMPLED)
+
+
+class SampleFilter(logging.Filter):
+    """Keeps a random `rate` share of the sampled loggers' records below WARNING, and every other record."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not record.name.endswith(SAMPLED):
+            return True
+        return random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """A QueueHandler that drops records when the queue is full, instead of blocking."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: str = LOG_LEVEL, sample_rate: float = LOG_SAMPLE_RATE) -> logging.Logger:
+    """Routes the "app" loggers through the sampled, non-blocking queue. Idempotent."""
+    global _listener
+    logger = logging.getLogger("app")
+    if _listener is not None:
+        return logger
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    handler.addFilter(SampleFilter(sample_rate))
+
+    logger.setLevel(level)
+    logger.addHandler(handler)
+    logger.propagate = False # Don't print twice when the server also configures the root logger
+
+    _listener = QueueListener(handler.queue, output)
+    _listener.start()
+    atexit.register(_listener.stop) # Flushes what's still queued
+    return logger
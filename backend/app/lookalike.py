@@ -0,0 +1,217 @@
+# backend/app/lookalike.py
+
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .columnar import CreatorColumns
+
+# "Creators like @x": approximate nearest neighbours over audience features.
+#
+# Every creator becomes one fixed-length vector with four blocks:
+#   - audience share per city            (audienceGeo)
+#   - audience share per fixed age band  (audienceAge ranges spread over AGE_BANDS)
+#   - verticals, one-hot                 (lowercased, like the scorer)
+#   - content tones, one-hot             (lowercased)
+# Each block is L2-normalized and weighted, then the whole vector is
+# normalized, so the dot product of two vectors is their weighted cosine
+# similarity.
+#
+# The vectors are indexed with an IVF (inverted file) index: spherical
+# k-means splits them into `nlist` clusters, and a query only scans the
+# creators in the `nprobe` clusters whose centroids are closest to it.
+# nprobe is the recall / latency knob: 1 is fastest, nlist is an exact scan.
+#
+# New and edited creators are added incrementally (assigned to their nearest
+# centroid) without retraining. The vectors live in a growable buffer shared
+# between the index versions of consecutive roster snapshots, so an insert
+# doesn't copy the roster. A full snapshot rebuild retrains the clusters.
+# Cities / categories / tones first seen after the index was built don't get
+# a dimension until then.
+
+LOOKALIKE_NPROBE = int(os.environ.get("LOOKALIKE_NPROBE", "16"))
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 20000 # Creators used to train the centroids
+
+AGE_BANDS = ((13, 18), (18, 25), (25, 35), (35, 45), (45, 55), (55, 65)) # [low, high) years
+BLOCK_WEIGHTS = {"geo": 0.35, "age": 0.25, "verticals": 0.25, "tones": 0.15}
+
+_CHUNK = 65536 # Rows per matrix product when assigning clusters
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return np.divide(x, norms, out=np.zeros_like(x), where=norms > 0)
+
+
+def _translation(vocab: Dict[str, int], dims: Dict[str, int]) -> np.ndarray:
+    """Maps a column's codes to index dimensions (-1 = none). The _PAD code (-1) hits the last entry, also -1."""
+    table = np.full(len(vocab) + 1, -1, dtype=np.int64)
+    for name, code in vocab.items():
+        table[code] = dims.get(name, -1)
+    return table
+
+
+class LookalikeIndex:
+    """IVF index over creator audience vectors. Immutable; `updated` returns a new version."""
+
+    def __init__(self, dims: Dict[str, Dict[str, int]], centroids: np.ndarray, buffer: np.ndarray, assign: np.ndarray,
+                 lists: List[np.ndarray], size: int):
+        self.dims = dims # block -> {name: dimension}
+        self.centroids = centroids
+        self._buffer = buffer # Vectors; rows past `size` belong to newer versions
+        self._assign = assign # Cluster of each row, same sharing rule
+        self.lists = lists # Cluster -> sorted rows
+        self.size = size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._buffer[:self.size]
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    # --- Building ---
+
+    @classmethod
+    def build(cls, cols: CreatorColumns, nlist: Optional[int] = None, seed: int = 0) -> "LookalikeIndex":
+        n = len(cols)
+        dims = {
+            "geo": {name: i for i, name in enumerate(cols.geo_vocab)},
+            "categories": {name: i for i, name in enumerate(cols.category_vocab)},
+            "tones": {name: i for i, name in enumerate(cols.tone_vocab)},
+        }
+        index = cls(dims, np.zeros((0, 0), dtype=np.float32), np.zeros((0, 0), dtype=np.float32),
+                    np.zeros(0, dtype=np.int64), [], 0)
+        vectors = index.encode(cols, np.arange(n))
+
+        # Spherical k-means on a sample, then every creator goes to its nearest centroid
+        nlist = nlist or max(1, min(4 * int(np.sqrt(n)), 4096))
+        nlist = min(nlist, n) if n else 1
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, min(n, KMEANS_SAMPLE), replace=False)] if n else vectors
+        centroids = _kmeans(sample, nlist, rng) if n else np.zeros((1, vectors.shape[1]), dtype=np.float32)
+        assign = _nearest(vectors, centroids)
+
+        index.centroids = centroids
+        index._buffer, index._assign, index.size = vectors, assign, n
+        index.lists = _lists(assign, len(centroids))
+        return index
+
+    def encode(self, cols: CreatorColumns, rows: np.ndarray) -> np.ndarray:
+        """The normalized feature vectors of `rows` of `cols`, in this index's dimensions."""
+        n = len(rows)
+        blocks = {}
+
+        # 1. City shares
+        geo = np.zeros((n, len(self.dims["geo"])), dtype=np.float32)
+        dims = _translation(cols.geo_vocab, self.dims["geo"])[cols.geo_codes[rows]]
+        r, k = np.nonzero(dims >= 0)
+        np.add.at(geo, (r, dims[r, k]), cols.geo_shares[rows][r, k])
+        blocks["geo"] = geo
+
+        # 2. Age range shares, spread evenly over the years each range covers
+        low, high = cols.age_low[rows], cols.age_high[rows] + 1 # "18-24" covers 18..24
+        width = np.maximum(high - low, 1)
+        shares = np.where(cols.age_valid[rows], cols.age_shares[rows], 0)
+        blocks["age"] = np.stack([
+            (shares * np.clip(np.minimum(high, b) - np.maximum(low, a), 0, None) / width).sum(axis=1)
+            for a, b in AGE_BANDS
+        ], axis=1).astype(np.float32)
+
+        # 3. Verticals and 4. tones, one-hot
+        for block, codes in (("verticals", cols.vertical_codes), ("tones", cols.tone_codes)):
+            space = "categories" if block == "verticals" else "tones"
+            vocab = cols.category_vocab if block == "verticals" else cols.tone_vocab
+            onehot = np.zeros((n, len(self.dims[space])), dtype=np.float32)
+            dims = _translation(vocab, self.dims[space])[codes[rows]]
+            r, k = np.nonzero(dims >= 0)
+            onehot[r, dims[r, k]] = 1
+            blocks[block] = onehot
+
+        weighted = [_normalize(blocks[name]) * np.float32(np.sqrt(w)) for name, w in BLOCK_WEIGHTS.items()]
+        return _normalize(np.hstack(weighted))
+
+    # --- Incremental updates ---
+
+    def updated(self, cols: CreatorColumns, row: int) -> "LookalikeIndex":
+        """A new index version with `row` of `cols` added (row == size) or re-encoded (row < size)."""
+        vector = self.encode(cols, np.array([row]))[0]
+        cluster = int(np.argmax(self.centroids @ vector))
+        size = max(self.size, row + 1)
+
+        buffer, assign = self._buffer, self._assign
+        if size > len(buffer):
+            capacity = max(size, 2 * len(buffer), 1024)
+            buffer = np.concatenate([buffer[:self.size], np.zeros((capacity - self.size, buffer.shape[1]), dtype=buffer.dtype)])
+            assign = np.concatenate([assign[:self.size], np.zeros(capacity - self.size, dtype=assign.dtype)])
+        buffer[row] = vector
+
+        lists = list(self.lists)
+        if row < self.size:
+            old = int(assign[row])
+            lists[old] = lists[old][lists[old] != row]
+        assign[row] = cluster
+        lists[cluster] = np.sort(np.append(lists[cluster], row))
+        return LookalikeIndex(self.dims, self.centroids, buffer, assign, lists, size)
+
+    # --- Queries ---
+
+    def search(self, row: int, k: int = 10, nprobe: Optional[int] = None, exact: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The `k` creators most similar to `row` (itself excluded), best first,
+        as (rows, similarities). Ties go to the lower row.
+        """
+        query = self.vectors[row]
+        if exact:
+            candidates = np.arange(self.size)
+        else:
+            nprobe = min(nprobe or LOOKALIKE_NPROBE, self.nlist)
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            candidates = np.concatenate([self.lists[c] for c in probe])
+        candidates = candidates[candidates != row]
+        similarity = self.vectors[candidates] @ query
+
+        if len(candidates) > k:
+            top = np.argpartition(-similarity, k - 1)[:k]
+            threshold = similarity[top].min()
+            # Keep every candidate tied with the k-th best so ties resolve by row
+            top = np.flatnonzero(similarity >= threshold)
+            candidates, similarity = candidates[top], similarity[top]
+        order = np.lexsort((candidates, -similarity))[:k]
+        return candidates[order], similarity[order]
+
+    def stats(self) -> dict:
+        sizes = np.array([len(rows) for rows in self.lists])
+        return {
+            "creators": self.size,
+            "dimensions": int(self._buffer.shape[1]) if self._buffer.ndim == 2 else 0,
+            "nlist": self.nlist,
+            "largest_list": int(sizes.max()) if len(sizes) else 0,
+            "default_nprobe": LOOKALIKE_NPROBE,
+        }
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the closest (highest dot product) centroid for every vector."""
+    assign = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), _CHUNK):
+        assign[start:start + _CHUNK] = np.argmax(vectors[start:start + _CHUNK] @ centroids.T, axis=1)
+    return assign
+
+
+def _kmeans(x: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = _nearest(x, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        filled = np.bincount(assign, minlength=k) > 0
+        centroids[filled] = _normalize(sums[filled]) # Empty clusters keep their old centroid
+    return centroids
+
+
+def _lists(assign: np.ndarray, nlist: int) -> List[np.ndarray]:
+    order = np.argsort(assign, kind="stable")
+    bounds = np.cumsum(np.bincount(assign, minlength=nlist))[:-1]
+    return np.split(order, bounds)
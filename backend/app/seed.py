@@ -1,51 +1,27 @@
 # backend/app/seed.py
 
-import json
-# Import the engine and models
-from .database import SessionLocal, engine
-from . import crud, schemas, models # Add 'models' here
+from typing import Callable, Optional
+from . import ingest
 
-def seed_data():
-    """Populates the database with initial data from JSON files."""
-    
-    # Add this line to create tables if they don't exist
-    models.Base.metadata.create_all(bind=engine)
-    
-    db = SessionLocal()
-    try:
-        # --- Seed Creators ---
-        print("Seeding creators...")
-        with open('data/creators.json', 'r') as f:
-            creators_data = json.load(f)
-            for creator_data in creators_data:
-                # The rest of the file remains exactly the same...
-                db_creator = crud.get_creator_by_handle(db, handle=creator_data["handle"])
-                if not db_creator:
-                    creator = schemas.CreatorCreate(**creator_data)
-                    crud.create_creator(db, creator=creator)
-                    print(f"  Added creator: {creator.handle}")
-                else:
-                    print(f"  Skipped existing creator: {creator_data['handle']}")
-        
-        print("Creators seeded successfully.")
+SEED_FILES = {"creators": "data/creators.json", "brands": "data/brands.json"}
 
-        # --- Seed Brands ---
-        print("\nSeeding brands...")
-        with open('data/brands.json', 'r') as f:
-            brands_data = json.load(f)
-            for brand_data in brands_data:
-                db_brand = crud.get_brand_by_name(db, name=brand_data["name"])
-                if not db_brand:
-                    brand = schemas.BrandCreate(**brand_data)
-                    crud.create_brand(db, brand=brand)
-                    print(f"  Added brand: {brand.name}")
-                else:
-                    print(f"  Skipped existing brand: {brand_data['name']}")
-        
-        print("Brands seeded successfully.")
-
-    finally:
-        db.close()
+def seed_data(verbose: bool = True, progress: Optional[Callable[[str, int, dict], None]] = None) -> dict:
+    """
+    Populates the database with initial data from JSON files. Returns the
+    import statistics per kind. `progress(kind, byte offset, stats)` is
+    called after every batch (see ingest.ingest_file).
+    """
+    # Both files go through the bulk ingestion pipeline, which creates the
+    # tables if needed and skips creators / brands that already exist.
+    stats = {}
+    for kind, path in SEED_FILES.items():
+        if verbose:
+            print(f"Seeding {kind}...")
+        on_batch = (lambda offset, s, kind=kind: progress(kind, offset, s)) if progress else None
+        stats[kind] = ingest.ingest_file(path, kind=kind, verbose=verbose, progress=on_batch)
+        if verbose:
+            print(f"{kind.capitalize()} seeded successfully.\n")
+    return stats
 
 if __name__ == "__main__":
     print("Running database seeder...")
@@ -0,0 +1,131 @@
+# backend/app/serialize.py
+
+import json
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+from . import schemas
+
+if TYPE_CHECKING: # Imported where it's used, so the API can import this module without NumPy
+    from . import columnar
+
+try: # Optional, ~5x faster than the json module
+    import orjson
+except ImportError:
+    orjson = None
+
+# Writing match results straight to JSON text.
+#
+# Building a MatchedCreator (and a nested Creator) per result, then letting
+# FastAPI validate and encode them again, costs far more than scoring. The
+# creator part of a result only changes when the creator does, so each
+# creator's JSON is rendered once per roster snapshot and reused; a result
+# is then just that fragment plus its score and reasons. The output has the
+# same shape as List[schemas.MatchedCreator].
+
+CREATOR_FIELDS = tuple(schemas.Creator.model_fields)
+MAX_PROJECTIONS = 16 # Distinct `fields=` projections cached per snapshot
+
+
+def dumps(value) -> str:
+    """Compact JSON, via orjson when it's installed."""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parses a `fields=handle,platforms` projection of the creator object. The
+    id is always included. None means the full creator. Raises ValueError on
+    unknown fields.
+    """
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in names if f not in CREATOR_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown creator field(s): {', '.join(unknown)}. Choose from: {', '.join(CREATOR_FIELDS)}")
+    return tuple(f for f in CREATOR_FIELDS if f == "id" or f in names) # Schema order, id always kept
+
+
+class Fragments:
+    """Lazily rendered JSON of every creator in a roster, optionally projected."""
+
+    def __init__(self, creators: Sequence[schemas.Creator], previous: Optional["Fragments"] = None, changed: Iterable[int] = ()):
+        self.creators = creators
+        self._full: List[Optional[str]] = [None] * len(creators)
+        self._projected: Dict[Tuple[str, ...], List[Optional[str]]] = {}
+        self._lock = threading.Lock()
+        if previous is not None:
+            # Keep what was already rendered for creators that didn't change
+            kept = previous._full[:len(creators)]
+            self._full[:len(kept)] = kept
+            for row in changed:
+                if row < len(self._full):
+                    self._full[row] = None
+
+    def creator(self, row: int, fields: Optional[Tuple[str, ...]] = None) -> str:
+        """The JSON object for the creator at `row`."""
+        cache = self._full if fields is None else self._projection(fields)
+        fragment = cache[row]
+        if fragment is None:
+            if fields is None and hasattr(self.creators, "json"):
+                fragment = cache[row] = self.creators.json(row) # Roster files store it pre-rendered
+                return fragment
+            data = self.creators[row].model_dump()
+            if fields is not None:
+                data = {f: data[f] for f in fields}
+            fragment = cache[row] = dumps(data) # Races just render the same string twice
+        return fragment
+
+    def _projection(self, fields: Tuple[str, ...]) -> List[Optional[str]]:
+        cache = self._projected.get(fields)
+        if cache is None:
+            cache = [None] * len(self.creators)
+            with self._lock:
+                if len(self._projected) >= MAX_PROJECTIONS:
+                    self._projected.pop(next(iter(self._projected)))
+                cache = self._projected.setdefault(fields, cache)
+        return cache
+
+    def __getstate__(self):
+        # Worker processes render their own; don't ship the rendered strings
+        return {"creators": self.creators}
+
+    def __setstate__(self, state):
+        self.__init__(state["creators"])
+
+
+def match_json(brief: schemas.BrandBrief, cols: "columnar.CreatorColumns", scores: "columnar.BriefScores",
+               row: int, fragments: Fragments, promoted: Optional[int] = None,
+               fields: Optional[Tuple[str, ...]] = None, roster_row: Optional[int] = None) -> str:
+    """
+    One MatchedCreator as JSON. `roster_row` is the creator's row in the
+    fragments' roster when `cols` / `scores` only cover part of it.
+    """
+    from .columnar import match_reasons
+
+    reasons = match_reasons(brief, cols, scores, row)
+    if row == promoted:
+        reasons.append("Promoted for Diversity")
+    score = float(scores.final[row]) if scores.qualified[row] else 0.0
+    creator = fragments.creator(row if roster_row is None else roster_row, fields)
+    return f'{{"creator":{creator},"score":{score!r},"reasons":{dumps(reasons)}}}'
+
+
+def matches_json(brief: schemas.BrandBrief, cols: "columnar.CreatorColumns", scores: "columnar.BriefScores",
+                 order, fragments: Fragments, promoted: Optional[int] = None,
+                 fields: Optional[Tuple[str, ...]] = None, roster_rows=None) -> List[str]:
+    """
+    MatchedCreator JSON objects for the given rows, in order. `roster_rows`
+    maps rows of a partial `cols` / `scores` back to roster rows.
+    """
+    return [
+        match_json(brief, cols, scores, int(row), fragments, promoted, fields,
+                   None if roster_rows is None else int(roster_rows[row]))
+        for row in order
+    ]
+
+
+def json_array(items: List[str]) -> str:
+    return "[" + ",".join(items) + "]"
@@ -0,0 +1,296 @@
+# backend/app/sessions.py
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional, Set
+import numpy as np
+from . import schemas, columnar, metrics, serialize, snapshot
+from .snapshot import RosterSnapshot
+
+# Match sessions: a brief that is edited one field at a time.
+#
+# The final score is a weighted sum of independent components, and each
+# brief field feeds only some of them:
+#
+#   category          -> category match  -> relevance
+#   tone              -> tone matches    -> relevance
+#   targetLocations   -> geo overlap     -> audience
+#   targetAges        -> age overlap     -> audience
+#   budgetINR         -> budget check
+#   platforms         -> platform check
+#   noAdultContent    -> safety check
+#   (performance doesn't depend on the brief at all)
+#
+# A session keeps every component for the whole roster (not just the current
+# candidates, so a loosened constraint needs no rescoring), and an edit only
+# recomputes what the changed fields feed:
+#   - a budget change flips the budget check only for the creators priced
+#     between the old and the new budget (a slice of the price index);
+#   - added locations / tones are added to the existing overlap / count;
+#   - final scores are recomputed only for the rows whose relevance or
+#     audience score actually changed.
+# Ranking and diversification then run as usual on the updated scores, so a
+# session always returns exactly what /api/match would for its brief.
+#
+# Sessions live in this process (an LRU with a TTL). Their arrays take about
+# 60 bytes per creator, so the store is bounded by bytes as well as by count
+# (performance scores are shared through the snapshot, not copied). A session
+# whose roster snapshot was replaced is parked: its arrays and the old
+# snapshot are let go, and it is rescored in full on its next use.
+
+MATCH_SESSIONS_MAX = int(os.environ.get("MATCH_SESSIONS_MAX", "1000"))
+MATCH_SESSIONS_MAX_BYTES = int(os.environ.get("MATCH_SESSIONS_MAX_BYTES", str(512 * 1024 * 1024)))
+MATCH_SESSION_TTL = float(os.environ.get("MATCH_SESSION_TTL", "1800")) # seconds
+
+COMPONENTS = ("budget", "platforms", "safety", "category", "tone", "geo", "age")
+
+
+class MatchSession:
+    """A brief being edited, with its per-creator score components kept for incremental updates."""
+
+    def __init__(self, session_id: str, brief: schemas.BrandBrief, roster: RosterSnapshot):
+        self.id = session_id
+        self.lock = threading.Lock() # One edit at a time
+        self.recomputed: List[str] = []
+        self._score_all(brief, roster)
+
+    # --- Full scoring ---
+
+    def _score_all(self, brief: schemas.BrandBrief, roster: RosterSnapshot):
+        cols = roster.columns
+        with metrics.stage("session.full"):
+            budget_ok, platform_ok, safety_ok = roster.index.constraint_masks(brief)
+            category_match = self._category_match(brief.category, roster)
+            tone_matches = columnar.tone_match_counts(brief.tone, cols)
+            geo_overlap = columnar.geo_overlaps(brief.targetLocations, cols)
+            age_overlap = columnar.age_overlaps(brief.targetAges, cols)
+            relevance = columnar.relevance_total(brief, category_match, tone_matches)
+            audience = columnar.audience_total(geo_overlap, age_overlap)
+            final = columnar.final_scores(relevance, audience, roster.performance)
+        # Nothing is replaced until every component is computed, so a failure leaves the session as it was
+        self.brief, self.roster, self.performance = brief, roster, roster.performance
+        self.budget_ok, self.platform_ok, self.safety_ok = budget_ok, platform_ok, safety_ok
+        self.category_match, self.tone_matches = category_match, tone_matches
+        self.geo_overlap, self.age_overlap = geo_overlap, age_overlap
+        self.relevance, self.audience, self.final = relevance, audience, final
+        self.recomputed = list(COMPONENTS)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by this session's own arrays (0 when parked)."""
+        if self.roster is None:
+            return 0
+        return sum(getattr(self, name).nbytes for name in self._ARRAYS)
+
+    _ARRAYS = ("budget_ok", "platform_ok", "safety_ok", "category_match", "tone_matches", "geo_overlap",
+               "age_overlap", "relevance", "audience", "final")
+
+    def park(self):
+        """Drops the arrays and the roster; the next update() rescores in full. Call with the lock held."""
+        self.roster = None
+        for name in self._ARRAYS + ("performance",):
+            setattr(self, name, None)
+
+    @staticmethod
+    def _category_match(category: str, roster: RosterSnapshot) -> np.ndarray:
+        vertical_rows, past_rows = roster.index.category_rows(category)
+        category_match = np.zeros(len(roster), dtype=np.int64)
+        category_match[past_rows] = 2
+        category_match[vertical_rows] = 1 # Vertical wins over past work
+        return category_match
+
+    # --- Incremental updates ---
+
+    def update(self, brief: schemas.BrandBrief, roster: RosterSnapshot) -> List[str]:
+        """Moves the session to `brief`, recomputing only what changed. Returns the recomputed components."""
+        if roster is not self.roster:
+            self._score_all(brief, roster)
+            return self.recomputed
+
+        old, cols, index = self.brief, roster.columns, roster.index
+        # Work on local copies of the components and publish them (and the
+        # brief) only once every step succeeded, so a failed edit leaves the
+        # session on its previous brief
+        budget_ok, platform_ok, safety_ok = self.budget_ok, self.platform_ok, self.safety_ok
+        category_match, tone_matches = self.category_match, self.tone_matches
+        geo_overlap, age_overlap = self.geo_overlap, self.age_overlap
+        relevance, audience, final = self.relevance, self.audience, self.final
+        recomputed: Set[str] = set()
+        relevance_changed = audience_changed = False
+
+        with metrics.stage("session.update"):
+            # 1. Hard constraints
+            if brief.budgetINR != old.budgetINR:
+                # Only creators priced between the two budgets change sides
+                low, high = sorted((old.budgetINR, brief.budgetINR))
+                start = np.searchsorted(index.sorted_prices, low, side="right")
+                stop = np.searchsorted(index.sorted_prices, high, side="right")
+                budget_ok = budget_ok.copy()
+                budget_ok[index.price_order[start:stop]] = brief.budgetINR > old.budgetINR
+                recomputed.add("budget")
+            if set(brief.platforms) != set(old.platforms):
+                platform_ok = index.platform_mask(brief.platforms)
+                recomputed.add("platforms")
+            if bool(brief.constraints.get("noAdultContent")) != bool(old.constraints.get("noAdultContent")):
+                safety_ok = index.safety_mask(brief)
+                recomputed.add("safety")
+
+            # 2. Relevance
+            if brief.category.lower() != old.category.lower():
+                category_match = self._category_match(brief.category, roster)
+                recomputed.add("category")
+                relevance_changed = True
+            old_tones, new_tones = {t.lower() for t in old.tone}, {t.lower() for t in brief.tone}
+            if new_tones != old_tones:
+                if new_tones > old_tones: # Only additions: count the new tones on top
+                    tone_matches = tone_matches + columnar.tone_match_counts(list(new_tones - old_tones), cols)
+                else:
+                    tone_matches = columnar.tone_match_counts(brief.tone, cols)
+                recomputed.add("tone")
+                relevance_changed = True
+            elif len(brief.tone) != len(old.tone):
+                relevance_changed = True # Same tones, but the fit is a share of the brief's tone count
+
+            # 3. Audience (geo overlap is summed in location order, so only appends are incremental)
+            if brief.targetLocations != old.targetLocations:
+                n_old = len(old.targetLocations)
+                if brief.targetLocations[:n_old] == old.targetLocations:
+                    geo_overlap = columnar.geo_overlaps(brief.targetLocations[n_old:], cols, start=geo_overlap)
+                else:
+                    geo_overlap = columnar.geo_overlaps(brief.targetLocations, cols)
+                recomputed.add("geo")
+                audience_changed = True
+            if list(brief.targetAges) != list(old.targetAges):
+                age_overlap = columnar.age_overlaps(brief.targetAges, cols)
+                recomputed.add("age")
+                audience_changed = True
+
+            # 4. Final scores, only where a component score moved
+            changed = np.zeros(len(roster), dtype=bool)
+            if relevance_changed:
+                new_relevance = columnar.relevance_total(brief, category_match, tone_matches)
+                changed |= new_relevance != relevance
+                relevance = new_relevance
+            if audience_changed:
+                new_audience = columnar.audience_total(geo_overlap, age_overlap)
+                changed |= new_audience != audience
+                audience = new_audience
+            rows = np.flatnonzero(changed)
+            if len(rows):
+                final = final.copy()
+                final[rows] = columnar.final_scores(relevance[rows], audience[rows], self.performance[rows])
+
+        self.brief = brief
+        self.budget_ok, self.platform_ok, self.safety_ok = budget_ok, platform_ok, safety_ok
+        self.category_match, self.tone_matches = category_match, tone_matches
+        self.geo_overlap, self.age_overlap = geo_overlap, age_overlap
+        self.relevance, self.audience, self.final = relevance, audience, final
+        self.recomputed = [c for c in COMPONENTS if c in recomputed]
+        return self.recomputed
+
+    # --- Results ---
+
+    def scores(self) -> columnar.BriefScores:
+        """The current scores, shaped like columnar.score_brief's (zeros for disqualified creators)."""
+        qualified = self.budget_ok & self.platform_ok & self.safety_ok
+        parts = (self.category_match, self.tone_matches, self.geo_overlap, self.age_overlap,
+                 self.relevance, self.audience, self.performance, self.final)
+        return columnar.BriefScores(
+            self.budget_ok, self.platform_ok, self.safety_ok, qualified,
+            *(np.where(qualified, part, 0).astype(part.dtype) for part in parts),
+        )
+
+    def select(self, limit: Optional[int] = None):
+        """(scores, order, promoted) for the current brief, like columnar.select."""
+        return columnar.select(self.brief, self.roster.columns, limit=limit, scores=self.scores())
+
+
+def apply_patch(brief: schemas.BrandBrief, patch: schemas.BrandBriefPatch) -> schemas.BrandBrief:
+    """`brief` with the fields set in `patch` replaced."""
+    return brief.model_copy(update=patch.model_dump(exclude_unset=True, exclude_none=True))
+
+
+def session_json(session: MatchSession, limit: Optional[int] = None, fields=None) -> str:
+    """The session's current ranking as schemas.MatchSessionResult JSON."""
+    scores, order, promoted = session.select(limit)
+    roster = session.roster
+    with metrics.stage("serialize"):
+        items = serialize.matches_json(session.brief, roster.columns, scores, order, roster.fragments, promoted, fields)
+        return (
+            f'{{"session_id":{serialize.dumps(session.id)},"roster_version":{roster.version},'
+            f'"brief":{session.brief.model_dump_json()},"recomputed":{serialize.dumps(session.recomputed)},'
+            f'"items":{serialize.json_array(items)}}}'
+        )
+
+
+class SessionStore:
+    """Thread-safe LRU of match sessions with an idle timeout."""
+
+    def __init__(self, maxsize: int = MATCH_SESSIONS_MAX, ttl: float = MATCH_SESSION_TTL,
+                 max_bytes: int = MATCH_SESSIONS_MAX_BYTES):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict() # id -> (session, expires_at)
+        self._lock = threading.Lock()
+
+    def create(self, brief: schemas.BrandBrief, roster: RosterSnapshot) -> MatchSession:
+        session = MatchSession(uuid.uuid4().hex, brief, roster)
+        with self._lock:
+            self._sessions[session.id] = (session, time.monotonic() + self.ttl)
+            self._evict()
+        return session
+
+    def _evict(self):
+        """
+        Drops the expired sessions and parks those of replaced rosters, then
+        drops the least recently used ones until both limits hold (the newest
+        is always kept). Call with _lock held.
+        """
+        now, current = time.monotonic(), snapshot.loaded()
+        for session_id in [key for key, (_, expires_at) in self._sessions.items() if expires_at < now]:
+            del self._sessions[session_id]
+        total = 0
+        for session, _ in self._sessions.values():
+            if session.roster is not None and session.roster is not current and session.lock.acquire(blocking=False):
+                try: # Busy sessions are being rescored against the new roster anyway
+                    session.park()
+                finally:
+                    session.lock.release()
+            total += session.nbytes
+        while len(self._sessions) > 1 and (len(self._sessions) > self.maxsize or total > self.max_bytes):
+            session, _ = self._sessions.popitem(last=False)[1]
+            total -= session.nbytes
+
+    def nbytes(self) -> int:
+        """Memory held by all sessions' arrays."""
+        with self._lock:
+            return sum(session.nbytes for session, _ in self._sessions.values())
+
+    def get(self, session_id: str) -> Optional[MatchSession]:
+        """The session, or None if it doesn't exist or has expired. Using a session extends it."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            session, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._sessions[session_id]
+                return None
+            self._sessions[session_id] = (session, time.monotonic() + self.ttl)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+# Process-wide sessions used by /api/match/sessions
+match_sessions = SessionStore()
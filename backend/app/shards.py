@@ -0,0 +1,176 @@
+# backend/app/shards.py
+
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from . import schemas, columnar, indexes, metrics, rosterfile
+from .snapshot import RosterSnapshot
+
+# Scoring one brief on several cores.
+#
+# The roster columns are written once per snapshot as .npy files (under
+# /dev/shm when it exists, so they live in RAM) and memory-mapped by a pool
+# of worker processes; every worker shares the same pages instead of getting
+# its own copy. A snapshot mapped from a roster file (ROSTER_FILE) is not
+# exported again: the workers map that file. A request is split into contiguous row shards. Each worker
+# scores its shard and returns a small local result: its top K qualified
+# creators, its first K rejects and the two creators the diversification
+# rule could promote from it. The coordinator merges those into a partial
+# BriefScores and runs the usual rank + diversify on it, which gives exactly
+# the ranking of the single-process path.
+#
+# Set MATCH_SHARDS to the number of worker processes (0, the default, keeps
+# matching in-process). Only requests with a `limit` on rosters of at least
+# MATCH_SHARD_MIN_ROSTER creators are sharded.
+
+MATCH_SHARDS = int(os.environ.get("MATCH_SHARDS", "0"))
+SHARD_MIN_ROSTER = int(os.environ.get("MATCH_SHARD_MIN_ROSTER", "50000"))
+SHARD_DIR = os.environ.get("MATCH_SHARD_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
+
+SCORE_FIELDS = columnar.BriefScores._fields
+
+
+class Selection(NamedTuple):
+    """A ranked selection; `roster_rows` maps rows of a partial `cols` / `scores` to roster rows."""
+    cols: columnar.CreatorColumns
+    scores: columnar.BriefScores
+    order: np.ndarray
+    promoted: Optional[int]
+    roster_rows: Optional[np.ndarray]
+
+
+# --- Column files ---
+
+def export_columns(cols: columnar.CreatorColumns, directory: str) -> dict:
+    """Writes every array column to `directory`. Returns the spec open_columns needs."""
+    for name in cols.ARRAYS:
+        np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(getattr(cols, name)))
+    return {"dir": directory, "vocabs": {name: getattr(cols, name) for name in cols.VOCABS}}
+
+
+def open_columns(spec: dict) -> columnar.CreatorColumns:
+    """Memory-maps the columns written by export_columns, or a roster file (read-only, no copy)."""
+    if "file" in spec:
+        return rosterfile.RosterFile(spec["file"]).columns(with_creators=False)
+    arrays = {
+        name: np.load(os.path.join(spec["dir"], f"{name}.npy"), mmap_mode="r")
+        for name in columnar.CreatorColumns.ARRAYS
+    }
+    return columnar.CreatorColumns.from_arrays(arrays, spec["vocabs"])
+
+
+def shard_ranges(n: int, shards: int) -> List[Tuple[int, int]]:
+    bounds = np.linspace(0, n, shards + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+# --- Worker side ---
+
+_worker_columns: Dict[str, tuple] = {} # export dir / file -> (columns, {(start, stop): (shard columns, index)})
+
+
+def _shard(spec: dict, start: int, stop: int):
+    key = spec.get("file") or spec["dir"]
+    entry = _worker_columns.get(key)
+    if entry is None:
+        _worker_columns.clear() # A newer snapshot replaced the old one
+        entry = _worker_columns[key] = (open_columns(spec), {})
+    cols, shards = entry
+    shard = shards.get((start, stop))
+    if shard is None:
+        view = cols.slice(start, stop)
+        shard = shards[(start, stop)] = (view, indexes.ConstraintIndex(view))
+    return shard
+
+
+def _shard_top(spec: dict, start: int, stop: int, brief: schemas.BrandBrief, k: int) -> Dict[str, np.ndarray]:
+    """Scores one shard and returns the rows the global ranking can need, with their scores."""
+    cols, index = _shard(spec, start, stop)
+    scores = columnar.score_brief(brief, cols, index)
+    qualified = np.flatnonzero(scores.qualified)
+
+    top = columnar.rank(scores, k)
+    top = top[scores.qualified[top]]
+    rejected = np.flatnonzero(~scores.qualified)[:k]
+    # Whatever the dominating vertical turns out to be, the best replacement
+    # from this shard is its best creator or its best one with another vertical
+    candidates = []
+    if len(qualified):
+        best = qualified[np.argmax(scores.final[qualified])]
+        other = qualified[cols.primary_vertical[qualified] != cols.primary_vertical[best]]
+        candidates = [best] + ([other[np.argmax(scores.final[other])]] if len(other) else [])
+
+    rows = np.unique(np.concatenate([top, rejected, np.array(candidates, dtype=np.int64)]).astype(np.int64))
+    part = {name: getattr(scores, name)[rows] for name in SCORE_FIELDS}
+    part["rows"] = rows + start
+    return part
+
+
+# --- Coordinator ---
+
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_exported: Optional[Tuple[RosterSnapshot, dict]] = None
+_export_dirs: List[str] = []
+
+
+def _export(roster: RosterSnapshot) -> dict:
+    """The column files of `roster`, written on first use."""
+    global _exported
+    with _lock:
+        if _exported is not None and _exported[0] is roster:
+            return _exported[1]
+        if roster.path is not None:
+            spec = {"file": roster.path}
+            _exported = (roster, spec)
+            return spec
+        directory = tempfile.mkdtemp(prefix=f"taag-roster-{roster.version}-", dir=SHARD_DIR)
+        spec = export_columns(roster.columns, directory)
+        _exported = (roster, spec)
+        _export_dirs.append(directory)
+        # Keep the previous export for requests still running against it
+        while len(_export_dirs) > 2:
+            shutil.rmtree(_export_dirs.pop(0), ignore_errors=True)
+        return spec
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(MATCH_SHARDS)
+        return _pool
+
+
+@atexit.register
+def _cleanup():
+    for directory in _export_dirs:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def select(brief: schemas.BrandBrief, roster: RosterSnapshot, limit: Optional[int] = None) -> Selection:
+    """columnar.select for a roster snapshot, fanned out over the shard workers when enabled."""
+    cols = roster.columns
+    if MATCH_SHARDS <= 1 or limit is None or len(roster) < SHARD_MIN_ROSTER:
+        scores, order, promoted = columnar.select(brief, cols, roster.index, limit)
+        return Selection(cols, scores, order, promoted, None)
+
+    spec = _export(roster)
+    pool = _get_pool()
+    k = max(limit, 3) # Diversification looks at the top 3
+    with metrics.stage("shards"):
+        futures = [pool.submit(_shard_top, spec, start, stop, brief, k) for start, stop in shard_ranges(len(roster), MATCH_SHARDS)]
+        parts = [future.result() for future in futures]
+
+    # Shards are contiguous, so the merged rows stay in roster order and the
+    # stable ranking breaks ties exactly like the single-process one
+    rows = np.concatenate([part["rows"] for part in parts])
+    scores = columnar.BriefScores(*(np.concatenate([part[name] for part in parts]) for name in SCORE_FIELDS))
+    merged = cols.subset(rows)
+    _, order, promoted = columnar.select(brief, merged, limit=limit, scores=scores)
+    return Selection(merged, scores, order, promoted, rows)
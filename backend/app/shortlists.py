@@ -0,0 +1,424 @@
+# backend/app/shortlists.py
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+import numpy as np
+from pydantic import ValidationError
+from sqlalchemy import select
+from . import models, schemas, columnar, cache, snapshot, generations
+from .database import SessionLocal
+from .scoring import WEIGHTS
+from .shards import Selection
+from .snapshot import RosterSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Precomputed candidate shortlists for the briefs /api/match sees most.
+#
+# A background refresher reads the stored brands and keeps two kinds of
+# shortlists per roster version:
+#   - per brand brief: its top SHORTLIST_SIZE qualified creators, the score
+#     of the last of them (the threshold), and the best creator of every
+#     primary vertical (the diversification rule's possible replacements);
+#   - per category / platforms combination common among the brands (the
+#     SHORTLIST_COMBOS most frequent): every creator on those platforms,
+#     ordered by the best score they could get for that category (perfect
+#     tone fit and audience, their own performance score).
+#
+# A match request with a `limit` for a known brief is then scored on the
+# shortlist plus the creators changed since it was built (the roster keeps a
+# change log, see snapshot.py), instead of the whole roster:
+#   - brief shortlists: every creator outside the list scored at most the
+#     threshold, so the top `limit` is exact as long as at least `limit`
+#     listed creators are unchanged. The diversification replacement is exact
+#     if it scores above the threshold, or if the best creator of every other
+#     vertical is unchanged.
+#   - combination shortlists: a growing prefix of the list is scored (after
+#     the brief's budget / safety rules) until the `limit`-th score, and the
+#     diversification replacement, beat the bound of the next unscanned
+#     creator.
+# Both give exactly the full ranking; when that can't be shown (a limit past
+# the shortlist, too many changes, an unknown brief) the request is scored
+# on the whole roster as usual.
+#
+# Only requests with a `limit` can be served this way: without one the
+# response is the whole roster, ranked, which needs every creator scored.
+# The dashboard asks for its top 50 (MATCH_LIMIT in the frontend), so its
+# requests are served from here.
+#
+# The refresher wakes every SHORTLIST_REFRESH_SECONDS, and right away when a
+# brand is stored through this process. A pass does nothing unless the
+# brands (their counter in the database, see generations.py) or the roster
+# changed since the last one. It builds shortlists for new briefs and
+# rebuilds those the roster has moved past by SHORTLIST_MAX_CHANGES creators
+# (or by a full reload), at most SHORTLIST_MAX_BUILDS per pass so a cold
+# start or a reload doesn't hog the API process; the rest wait for the next
+# passes, and outdated lists keep serving whatever they still can meanwhile.
+# Shortlists live in this process.
+
+SHORTLIST_REFRESH = os.environ.get("SHORTLIST_REFRESH", "1") == "1"
+SHORTLIST_REFRESH_SECONDS = float(os.environ.get("SHORTLIST_REFRESH_SECONDS", "5"))
+SHORTLIST_SIZE = int(os.environ.get("SHORTLIST_SIZE", "200"))
+SHORTLIST_COMBOS = int(os.environ.get("SHORTLIST_COMBOS", "20"))
+SHORTLIST_MAX_BRIEFS = int(os.environ.get("SHORTLIST_MAX_BRIEFS", "5000"))
+SHORTLIST_MAX_CHANGES = int(os.environ.get("SHORTLIST_MAX_CHANGES", "256"))
+SHORTLIST_MAX_BUILDS = int(os.environ.get("SHORTLIST_MAX_BUILDS", "20"))
+
+_SCAN_START = 1024 # Combination list entries scored first; doubled until the ranking is proven
+_BOUND_SLACK = 0.01 # Scores are rounded to 2 decimals
+
+
+class BriefShortlist(NamedTuple):
+    """The best creators for one brief, as of roster `version`."""
+    version: int
+    ids: np.ndarray # Top SHORTLIST_SIZE qualified creators, best first
+    rows: np.ndarray # Their roster rows (edits and inserts keep them; a deletion needs a rebuild)
+    threshold: float # Score of the last of them; -inf if they are all the qualified creators
+    group_ids: np.ndarray # Best qualified creator of each primary vertical
+    group_rows: np.ndarray
+    group_verticals: List[Optional[str]] # ... and that vertical (None = creators without one)
+
+
+class ComboShortlist(NamedTuple):
+    """Creators on a set of platforms, by their best possible score for a category, as of roster `version`."""
+    version: int
+    ids: np.ndarray
+    rows: np.ndarray
+    bounds: np.ndarray # Descending
+    prices: np.ndarray # To apply a brief's budget / safety rules before scoring
+    adult: np.ndarray
+
+
+def brand_brief(brand: models.Brand) -> Optional[schemas.BrandBrief]:
+    """The brief a stored brand matches with, or None if its row doesn't make a valid one."""
+    try:
+        return schemas.BrandBrief.model_validate(brand, from_attributes=True)
+    except ValidationError: # E.g. a target age range that isn't [min, max]
+        return None
+
+
+def combo_key(brief: schemas.BrandBrief) -> Tuple[str, Tuple[str, ...]]:
+    return brief.category.lower(), tuple(sorted(set(brief.platforms)))
+
+
+def _vertical(cols: columnar.CreatorColumns, row: int) -> Optional[str]:
+    verticals = cols.creators[row].verticals
+    return verticals[0] if verticals else None
+
+
+def _rows_valid(roster: RosterSnapshot, ids: np.ndarray, rows: np.ndarray) -> bool:
+    """Whether `ids` are still at `rows` (no creator before them was deleted)."""
+    return not len(rows) or (rows.max() < len(roster) and np.array_equal(roster.ids[rows], ids))
+
+
+def valid(shortlist, roster: RosterSnapshot) -> bool:
+    if isinstance(shortlist, BriefShortlist):
+        return (_rows_valid(roster, shortlist.ids, shortlist.rows)
+                and _rows_valid(roster, shortlist.group_ids, shortlist.group_rows))
+    return _rows_valid(roster, shortlist.ids, shortlist.rows)
+
+
+def _changed_rows(roster: RosterSnapshot, changed: Set[int]) -> np.ndarray:
+    if not changed:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(np.isin(roster.ids, list(changed)))
+
+
+# --- Building ---
+
+def build_brief(brief: schemas.BrandBrief, roster: RosterSnapshot, size: int = SHORTLIST_SIZE) -> BriefShortlist:
+    cols = roster.columns
+    scores = columnar.score_brief(brief, cols, roster.index)
+    qualified = np.flatnonzero(scores.qualified)
+    top = columnar.rank(scores, size)
+    top = top[scores.qualified[top]]
+    threshold = float(scores.final[top[-1]]) if len(qualified) > len(top) else -np.inf
+
+    # Best of each primary vertical: the first of it in score order (roster order on ties)
+    ranked = qualified[np.lexsort((qualified, -scores.final[qualified]))]
+    _, first = np.unique(cols.primary_vertical[ranked], return_index=True)
+    best = ranked[first]
+    return BriefShortlist(roster.version, roster.ids[top], top, threshold, roster.ids[best], best,
+                          [_vertical(cols, int(r)) for r in best])
+
+
+def build_combo(category: str, platforms: Tuple[str, ...], roster: RosterSnapshot) -> ComboShortlist:
+    cols = roster.columns
+    vertical_rows, past_rows = roster.index.category_rows(category)
+    relevance = np.full(len(cols), 30.0) # Full tone fit
+    relevance[past_rows] += 50
+    relevance[vertical_rows] = 100 # Vertical wins over past work
+    bounds = (
+        relevance * WEIGHTS["relevance"] + 100 * WEIGHTS["audience"]
+        + roster.performance * WEIGHTS["performance"] + 100 * WEIGHTS["constraints"]
+        + _BOUND_SLACK
+    )
+    rows = np.flatnonzero(roster.index.platform_mask(list(platforms)))
+    rows = rows[np.argsort(-bounds[rows], kind="stable")]
+    return ComboShortlist(roster.version, roster.ids[rows], rows, bounds[rows], cols.base_price[rows], cols.adult[rows])
+
+
+# --- Serving ---
+
+def _select(brief: schemas.BrandBrief, roster: RosterSnapshot, rows: np.ndarray, limit: int) -> Selection:
+    """columnar.select over the given roster rows only."""
+    rows = np.unique(rows) # Roster order, so ties break like the full ranking
+    cols = roster.columns.subset(rows)
+    scores, order, promoted = columnar.select(brief, cols, limit=limit, scores=columnar.score_brief(brief, cols))
+    return Selection(cols, scores, order, promoted, rows)
+
+
+def _dominating(cols: columnar.CreatorColumns, top: np.ndarray) -> Optional[str]:
+    """The vertical shared by the top 3 rows, which the diversification rule breaks up; None if it doesn't apply."""
+    verticals = {_vertical(cols, int(i)) for i in top[:3]}
+    if len(top) < 3 or len(verticals) != 1:
+        return None
+    return verticals.pop()
+
+
+def serve_brief(shortlist: BriefShortlist, brief: schemas.BrandBrief, roster: RosterSnapshot, limit: int,
+                changed: Set[int]) -> Optional[Selection]:
+    """The top `limit` for `brief` from its shortlist, or None if they can't be shown to be exact."""
+    need = max(limit, 3)
+    if (~np.isin(shortlist.ids, list(changed))).sum() < need:
+        return None
+    selection = _select(brief, roster, np.concatenate([shortlist.rows, shortlist.group_rows, _changed_rows(roster, changed)]), need)
+
+    promoted = selection.promoted
+    dominating = _dominating(selection.cols, selection.order) if promoted is None else _vertical(selection.cols, int(selection.order[0]))
+    if dominating is not None and shortlist.threshold != -np.inf:
+        if promoted is None or selection.scores.final[promoted] <= shortlist.threshold:
+            # Creators outside the list could beat the replacement unless each
+            # other vertical's best is still the same creator
+            changed_groups = np.isin(shortlist.group_ids, list(changed))
+            if any(c and v != dominating for c, v in zip(changed_groups, shortlist.group_verticals)):
+                return None
+    return selection._replace(order=selection.order[:limit])
+
+
+def serve_combo(shortlist: ComboShortlist, brief: schemas.BrandBrief, roster: RosterSnapshot, limit: int,
+                changed: Set[int]) -> Optional[Selection]:
+    """The top `limit` for `brief` from its combination's shortlist, or None if they can't be shown to be exact."""
+    need = max(limit, 3)
+    cols = roster.columns
+    # Unchanged creators the brief's budget / safety rules let through; changed ones are always scored
+    keep = shortlist.prices <= brief.budgetINR
+    if brief.constraints.get("noAdultContent"):
+        keep &= ~shortlist.adult
+    if changed:
+        keep &= ~np.isin(shortlist.ids, list(changed))
+    rows, bounds = shortlist.rows[keep], shortlist.bounds[keep]
+
+    # Score the list a block at a time (best bounds first), keeping the qualified creators
+    found_rows, found_scores = [], []
+
+    def score(block: np.ndarray):
+        scores = columnar.score_brief(brief, cols.subset(block))
+        found_rows.append(block[scores.qualified])
+        found_scores.append(scores.final[scores.qualified])
+
+    score(_changed_rows(roster, changed))
+    done, size = 0, min(len(rows), max(_SCAN_START, 8 * need))
+    while True:
+        score(rows[done:size])
+        done = size
+        bound = bounds[size] if size < len(rows) else -np.inf # Nobody unscanned can score more
+        found, final = np.concatenate(found_rows), np.concatenate(found_scores)
+        if len(found) >= need:
+            order = np.lexsort((found, -final))
+            top = order[:need]
+            if final[top[-1]] > bound:
+                # The top `need` is exact; so is the diversification replacement
+                # (the best of another vertical) if it beats the bound too
+                keep_rows = [found[top]]
+                dominating = _dominating(cols, found[top])
+                if dominating is None:
+                    return _select(brief, roster, keep_rows[0], limit)
+                others = order[cols.primary_vertical[found[order]] != cols.primary_vertical[found[top[0]]]]
+                if len(others) and final[others[0]] > bound:
+                    return _select(brief, roster, np.append(found[top], found[others[0]]), limit)
+                if not len(others) and bound == -np.inf:
+                    return _select(brief, roster, found[top], limit)
+        if size == len(rows):
+            return None
+        size = min(2 * size, len(rows))
+
+
+# --- Store and refresher ---
+
+class ShortlistStore:
+    """The shortlists of this process, and the background thread that keeps them fresh."""
+
+    def __init__(self, interval: float = SHORTLIST_REFRESH_SECONDS):
+        self.interval = interval
+        self._briefs: Dict[str, BriefShortlist] = {}
+        self._combos: Dict[Tuple[str, Tuple[str, ...]], ComboShortlist] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.hits = {"brief": 0, "combo": 0}
+        self.misses = 0
+        self.refreshes = 0
+        self.last_refresh: Optional[dict] = None
+        # What the last pass saw, so an unchanged database costs one query
+        self._brands_generation: Optional[int] = None
+        self._brand_briefs: List[schemas.BrandBrief] = []
+        self._roster_version: Optional[int] = None
+        self._pending = False # Builds left over by the last pass
+
+    # --- Requests ---
+
+    def select(self, brief: schemas.BrandBrief, roster: RosterSnapshot, limit: Optional[int]) -> Optional[Selection]:
+        """The ranking for `brief` from a shortlist, or None to score it on the whole roster."""
+        if limit is None or (not self._briefs and not self._combos):
+            return None
+        candidates = (
+            ("brief", self._briefs.get(cache.brief_key(brief)), serve_brief),
+            ("combo", self._combos.get(combo_key(brief)), serve_combo),
+        )
+        for kind, shortlist, serve in candidates:
+            if shortlist is None or shortlist.version > roster.version:
+                continue
+            changed = snapshot.changed_since(shortlist.version)
+            if changed is None or not valid(shortlist, roster):
+                self.notify() # Reloaded roster / deleted creators: rebuild it now
+                continue
+            selection = serve(shortlist, brief, roster, limit, changed)
+            if selection is not None:
+                with self._lock:
+                    self.hits[kind] += 1
+                return selection
+        with self._lock:
+            self.misses += 1
+        return None
+
+    # --- Refreshing ---
+
+    def _stale(self, shortlist, roster: RosterSnapshot) -> bool:
+        if shortlist is None or shortlist.version > roster.version:
+            return True
+        if shortlist.version == roster.version:
+            return False
+        changed = snapshot.changed_since(shortlist.version)
+        return changed is None or len(changed) >= SHORTLIST_MAX_CHANGES or not valid(shortlist, roster)
+
+    def refresh(self, briefs: List[schemas.BrandBrief], roster: RosterSnapshot, max_builds: int = SHORTLIST_MAX_BUILDS) -> dict:
+        """
+        Builds the missing / stale shortlists for `briefs` (at most `max_builds`
+        of them) and drops the others. Returns counts.
+        """
+        start = time.perf_counter()
+        unique: Dict[str, schemas.BrandBrief] = {}
+        for brief in briefs:
+            if len(unique) >= SHORTLIST_MAX_BRIEFS:
+                break
+            unique.setdefault(cache.brief_key(brief), brief)
+        combos = [key for key, _ in Counter(combo_key(b) for b in unique.values()).most_common(SHORTLIST_COMBOS)]
+
+        built = deferred = 0
+        new_briefs, new_combos = {}, {}
+        # Combinations first: each one serves many briefs
+        for key in combos:
+            shortlist = self._combos.get(key)
+            if self._stale(shortlist, roster):
+                if built >= max_builds:
+                    deferred += 1
+                else:
+                    shortlist = build_combo(*key, roster)
+                    built += 1
+            if shortlist is not None:
+                new_combos[key] = shortlist
+        for key, brief in unique.items():
+            shortlist = self._briefs.get(key)
+            if self._stale(shortlist, roster):
+                if built >= max_builds:
+                    deferred += 1
+                else:
+                    try:
+                        shortlist = build_brief(brief, roster)
+                    except Exception:
+                        logger.exception("Could not build the shortlist of brief %s", key)
+                        continue
+                    built += 1
+            if shortlist is not None:
+                new_briefs[key] = shortlist
+
+        with self._lock:
+            self._briefs, self._combos = new_briefs, new_combos
+            self._pending = deferred > 0
+            self.refreshes += 1
+            self.last_refresh = {
+                "roster_version": roster.version,
+                "briefs": len(new_briefs),
+                "combos": len(new_combos),
+                "built": built,
+                "deferred": deferred,
+                "seconds": round(time.perf_counter() - start, 3),
+            }
+        return self.last_refresh
+
+    def refresh_from_db(self) -> Optional[dict]:
+        """
+        Refreshes the shortlists for the brands in the database. Skipped (None)
+        when neither the brands nor the roster changed and nothing is pending.
+        """
+        db = SessionLocal()
+        try:
+            brands_generation = generations.read(db, generations.BRANDS)
+            roster = snapshot.get_snapshot(db)
+            if (brands_generation == self._brands_generation and roster.version == self._roster_version
+                    and not self._pending):
+                return None
+            if brands_generation != self._brands_generation:
+                brands = db.execute(select(models.Brand).order_by(models.Brand.id)).scalars().all()
+                self._brand_briefs = [b for b in map(brand_brief, brands) if b is not None]
+                self._brands_generation = brands_generation
+        finally:
+            db.close()
+        self._roster_version = roster.version
+        return self.refresh(self._brand_briefs, roster)
+
+    def start(self):
+        """Starts the background refresher (once)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="shortlist-refresher", daemon=True)
+                self._thread.start()
+
+    def notify(self):
+        """Brands changed: refresh now instead of at the next interval."""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.refresh_from_db()
+            except Exception:
+                logger.exception("Shortlist refresh failed")
+
+    def clear(self):
+        with self._lock:
+            self._briefs, self._combos = {}, {}
+            self._brands_generation = self._roster_version = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "briefs": len(self._briefs),
+                "combos": len(self._combos),
+                "size": SHORTLIST_SIZE,
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "last_refresh": self.last_refresh,
+            }
+
+
+# Process-wide shortlists used by /api/match
+match_shortlists = ShortlistStore()
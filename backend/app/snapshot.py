@@ -0,0 +1,334 @@
+# backend/app/snapshot.py
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from functools import cached_property
+from typing import Dict, List, Optional, Set
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from . import models, columnar, indexes, features, serialize, rosterfile, records, lookalike, generations
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# A process-wide, read-only copy of the creators table that the match
+# endpoints score against. It is built once from the database and then kept
+# up to date by the CRUD write paths, so a match request never has to query
+# or hydrate ORM rows. Creators are held as compact records.CreatorRecord
+# objects rather than ORM rows or Pydantic models.
+#
+# Snapshots are never mutated after they are published: a write builds a new
+# snapshot and swaps it in, so readers can keep using the one they grabbed.
+#
+# Writes made by other processes (other uvicorn workers, the ingest / seed
+# CLIs, jobs run elsewhere) are found through the creators counter in the
+# database (generations.py), which every creator write bumps. At most every
+# ROSTER_SYNC_SECONDS a reader compares it with the value the snapshot was
+# built from and reloads the roster if it moved; the other readers keep
+# using the current snapshot meanwhile. Writes made through this process
+# keep patching the snapshot instead.
+#
+# With ROSTER_FILE set (see rosterfile.py), the first snapshot is mapped from
+# that file instead of being read from the database, which takes milliseconds.
+# The file is used only if the creators counter it was exported at is still
+# the database's; otherwise the roster is read from the database as usual
+# (re-export the file after bulk changes to keep startup fast). Later writes
+# are picked up as above.
+#
+# The last ROSTER_CHANGELOG patched creators are remembered, so a result
+# computed for an older version can be brought up to date by rescoring just
+# the creators changed since (see shortlists.py). A full invalidation
+# forgets them.
+
+ROSTER_FILE = os.environ.get("ROSTER_FILE")
+ROSTER_CHANGELOG = int(os.environ.get("ROSTER_CHANGELOG", "10000"))
+ROSTER_SYNC_SECONDS = float(os.environ.get("ROSTER_SYNC_SECONDS", "1"))
+
+
+class RosterSnapshot:
+    """An immutable, versioned view of the creator roster."""
+
+    def __init__(self, version: int, creators: List[records.CreatorRecord], columns: Optional[columnar.CreatorColumns] = None,
+                 path: Optional[str] = None):
+        self.version = version
+        self.creators = creators
+        self.columns = columns if columns is not None else columnar.CreatorColumns(creators)
+        self.path = path # The roster file this snapshot is mapped from, if any
+
+    def __len__(self) -> int:
+        return len(self.creators)
+
+    def __reduce__(self):
+        # Worker processes map the same file instead of receiving a copy
+        if self.path is not None:
+            return load_file, (self.path, self.version)
+        return object.__reduce__(self)
+
+    @cached_property
+    def row_by_id(self) -> Dict[int, int]:
+        ids = getattr(self.creators, "ids", None) # Roster files store them as a column
+        if ids is not None:
+            return dict(zip(ids.tolist(), range(len(ids))))
+        return {c.id: i for i, c in enumerate(self.creators)}
+
+    @cached_property
+    def ids(self) -> np.ndarray:
+        """The creator id of every row."""
+        ids = getattr(self.creators, "ids", None)
+        if ids is not None:
+            return np.asarray(ids, dtype=np.int64)
+        return np.fromiter((c.id for c in self.creators), dtype=np.int64, count=len(self.creators))
+
+    @cached_property
+    def performance(self) -> np.ndarray:
+        """Every creator's performance score. Independent of the brief, so computed once per snapshot."""
+        return columnar.performance_scores(self.columns)
+
+    @cached_property
+    def index(self) -> indexes.ConstraintIndex:
+        """Hard-constraint indexes, built the first time a match needs them."""
+        return indexes.ConstraintIndex(self.columns)
+
+    @cached_property
+    def fragments(self) -> serialize.Fragments:
+        """Per-creator response JSON, rendered the first time each creator is returned."""
+        return serialize.Fragments(self.creators)
+
+    @cached_property
+    def lookalikes(self) -> lookalike.LookalikeIndex:
+        """Audience-similarity index, built the first time a lookalike search needs it."""
+        return lookalike.LookalikeIndex.build(self.columns)
+
+    def _inherit_fragments(self, previous: "RosterSnapshot", changed=()):
+        """Reuses the fragments `previous` already rendered, except for the `changed` rows."""
+        if "fragments" in previous.__dict__: # Only if they were ever built
+            self.fragments = serialize.Fragments(self.creators, previous.fragments, changed)
+
+    def _inherit_ids(self, previous: "RosterSnapshot", appended: Optional[int] = None, removed: Optional[int] = None):
+        """Derives the id column from `previous`'s, if it was built: one id appended or one row removed."""
+        if "ids" in previous.__dict__:
+            ids = previous.ids
+            if appended is not None:
+                ids = np.append(ids, appended)
+            if removed is not None:
+                ids = np.delete(ids, removed)
+            self.ids = ids
+
+    def _inherit_lookalikes(self, previous: "RosterSnapshot", row: int):
+        """Adds (or re-encodes) `row` to the lookalike index of `previous`, if it was built."""
+        if "lookalikes" in previous.__dict__:
+            self.lookalikes = previous.lookalikes.updated(self.columns, row)
+
+
+_lock = threading.Lock()
+_snapshot: Optional[RosterSnapshot] = None
+_generation = 0 # Bumped on every roster change, even when no snapshot is loaded
+_changes: "deque" = deque() # (generation, creator id) of the recent patches, oldest first
+_changes_from = 0 # Every change after this generation is in _changes
+_db_generation: Optional[int] = None # The database's creators counter the snapshot reflects
+_sync_lock = threading.Lock()
+_synced_at = 0.0
+
+
+def load_creators(db: Session) -> List[records.CreatorRecord]:
+    """Reads every creator row once, in id order, without building ORM objects."""
+    columns = [getattr(models.Creator, name) for name in records.FIELDS]
+    rows = db.execute(select(*columns).order_by(models.Creator.id))
+    return records.from_rows(rows)
+
+
+def load_file(path: str, version: int = 0) -> RosterSnapshot:
+    """A snapshot memory-mapped from a roster file (not published)."""
+    roster = rosterfile.RosterFile(path)
+    return RosterSnapshot(version, roster.creators(), roster.columns(), path=path)
+
+
+def get_snapshot(db: Optional[Session] = None) -> RosterSnapshot:
+    """Returns the current snapshot, building it on first use and reloading it after outside writes."""
+    global _snapshot, _db_generation
+    snap = _snapshot
+    if snap is not None:
+        if _written_elsewhere():
+            _forget_changes()
+            return rebuild(db)
+        return snap
+    if ROSTER_FILE and _generation == 0 and os.path.exists(ROSTER_FILE):
+        with _lock:
+            if _snapshot is None and _generation == 0: # Nothing changed since startup
+                try:
+                    roster = rosterfile.RosterFile(ROSTER_FILE)
+                    file_generation, db_generation = roster.db_generation, _read_generation(db)
+                    if file_generation is not None and file_generation == db_generation:
+                        _snapshot = RosterSnapshot(0, roster.creators(), roster.columns(), path=ROSTER_FILE)
+                        _db_generation = db_generation
+                        logger.info("Loaded %d creators from roster file %s", len(_snapshot), ROSTER_FILE)
+                        return _snapshot
+                    logger.warning("Ignoring roster file %s: exported at creators generation %s, the database is at %s",
+                                   ROSTER_FILE, file_generation, db_generation)
+                except rosterfile.RosterFileError as e:
+                    logger.warning("Ignoring roster file: %s", e)
+    return rebuild(db)
+
+
+def _read_generation(db: Optional[Session] = None) -> Optional[int]:
+    """The database's creators counter, or None if it can't be read."""
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+    try:
+        return generations.read(db, generations.CREATORS)
+    except SQLAlchemyError as e:
+        logger.warning("Can't read the roster generation: %s", e)
+        return None
+    finally:
+        if own_session:
+            db.close()
+
+
+def _written_elsewhere() -> bool:
+    """
+    True if the creators counter in the database moved past the snapshot's.
+    Checked by one reader at a time, at most every ROSTER_SYNC_SECONDS.
+    """
+    global _synced_at
+    now = time.monotonic()
+    if now - _synced_at < ROSTER_SYNC_SECONDS or _db_generation is None:
+        return False
+    if not _sync_lock.acquire(blocking=False):
+        return False # Another reader is checking
+    try:
+        _synced_at = now
+        generation = _read_generation()
+        return generation is not None and generation != _db_generation
+    finally:
+        _sync_lock.release()
+
+
+def loaded() -> Optional[RosterSnapshot]:
+    """The current snapshot, or None if none is loaded. Never builds one."""
+    return _snapshot
+
+
+def rebuild(db: Optional[Session] = None) -> RosterSnapshot:
+    """Reloads the whole roster from the database and publishes a new snapshot."""
+    global _snapshot, _db_generation
+    with _lock:
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        try:
+            # Read first: a write landing during the load leaves it behind, so the next check reloads again
+            db_generation = generations.read(db, generations.CREATORS)
+            creators = load_creators(db)
+            columns = features.load_columns(db, creators) # From the precomputed features
+        finally:
+            if own_session:
+                db.close()
+        _snapshot = RosterSnapshot(_generation, creators, columns)
+        _db_generation = db_generation
+        return _snapshot
+
+
+def current_version() -> int:
+    """The roster generation number. Changes whenever the creator data changes."""
+    return _generation
+
+
+def changed_since(version: int) -> Optional[Set[int]]:
+    """Ids of the creators changed after roster `version`, or None if that's no longer known."""
+    with _lock:
+        if version < _changes_from:
+            return None
+        changed = set()
+        for generation, creator_id in reversed(_changes):
+            if generation <= version:
+                break
+            changed.add(creator_id)
+        return changed
+
+
+def _log_change(creator_id: int):
+    """Records a patch made at the current generation. Call with _lock held."""
+    global _changes_from
+    _changes.append((_generation, creator_id))
+    while len(_changes) > ROSTER_CHANGELOG:
+        _changes_from = _changes.popleft()[0]
+
+
+def _forget_changes():
+    """Starts a new generation that can't be reached by patches (a full reload follows)."""
+    global _generation, _changes_from
+    with _lock:
+        _generation += 1
+        _changes.clear()
+        _changes_from = _generation
+
+
+def invalidate():
+    """Drops the snapshot; the next reader rebuilds it from the database."""
+    global _snapshot
+    _forget_changes()
+    _snapshot = None
+
+
+def _follow(db_generation: Optional[int]):
+    """
+    Records that a local write moved the database counter to `db_generation`.
+    If other writes came in between, the snapshot stays behind and the next
+    check reloads it. Call with _lock held.
+    """
+    global _db_generation
+    if db_generation is not None and _db_generation is not None and db_generation == _db_generation + 1:
+        _db_generation = db_generation
+
+
+def on_creator_saved(db_creator: models.Creator, db_generation: Optional[int] = None):
+    """
+    Patches the snapshot after a creator was inserted or updated.
+    `db_generation` is the creators counter the write committed (generations.bump).
+    """
+    global _snapshot, _generation
+    creator = records.CreatorRecord.from_creator(db_creator)
+    with _lock:
+        _generation += 1
+        _log_change(creator.id)
+        snap = _snapshot
+        if snap is None:
+            return # Nothing loaded yet; the first reader will see the new row
+        _follow(db_generation)
+
+        row = snap.row_by_id.get(creator.id)
+        if row is None:
+            # New creator: extend the columns instead of re-encoding everything
+            creators = snap.creators + [creator]
+            columns = snap.columns.extended([creator])
+        else:
+            creators = list(snap.creators)
+            creators[row] = creator
+            columns = None # Updated in place; re-encode from the in-memory records
+        _snapshot = RosterSnapshot(_generation, creators, columns)
+        _snapshot._inherit_fragments(snap, changed=() if row is None else (row,))
+        _snapshot._inherit_ids(snap, appended=creator.id if row is None else None)
+        _snapshot._inherit_lookalikes(snap, len(snap) if row is None else row)
+
+
+def on_creator_deleted(creator_id: int, db_generation: Optional[int] = None):
+    """Patches the snapshot after a creator was deleted (see on_creator_saved)."""
+    global _snapshot, _generation
+    with _lock:
+        _generation += 1
+        _log_change(creator_id)
+        snap = _snapshot
+        if snap is None:
+            return
+        _follow(db_generation)
+        if creator_id not in snap.row_by_id:
+            return
+        creators = [c for c in snap.creators if c.id != creator_id]
+        _snapshot = RosterSnapshot(_generation, creators)
+        _snapshot._inherit_ids(snap, removed=snap.row_by_id[creator_id])
@@ -0,0 +1,188 @@
+# backend/app/startup.py
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Process startup, kept out of module import.
+#
+# Importing app.main used to create / upgrade the schema against the database
+# and build every endpoint's models, so each new worker paid for it before it
+# could even be started. Now importing the app does no I/O, and:
+#   - migrate() creates / upgrades the schema (features.upgrade). The app's
+#     lifespan runs it unless MIGRATE_ON_STARTUP=0; deployments that set that
+#     run `python -m app.startup migrate` once before the new workers start.
+#   - warm() loads the roster snapshot and builds its constraint index in a
+#     background thread, so the server accepts connections right away and the
+#     first match doesn't pay for the build. /api/ready answers 503 until it's
+#     done (and retries a warm-up that failed), 200 from then on: later roster
+#     changes are applied incrementally and don't make the worker cold again.
+#     The match shortlist refresher (shortlists.py) is started as well, and
+#     so is the job queue's recovery / retention sweep (jobs.py).
+#   - `python -m app.startup check` measures, in fresh interpreters, how long
+#     importing app.main takes and how long until the app is ready, and exits
+#     with status 1 when either is over its budget (for deploy checks).
+#     tests/test_startup.py runs the same check when STARTUP_BUDGET_TESTS=1
+#     (timings are too noisy for the default test run).
+#
+# This module only imports the standard library at the top, so the check
+# measures the app and not itself.
+
+MIGRATE_ON_STARTUP = os.environ.get("MIGRATE_ON_STARTUP", "1") == "1"
+ROSTER_WARM_ON_STARTUP = os.environ.get("ROSTER_WARM_ON_STARTUP", "1") == "1"
+STARTUP_IMPORT_BUDGET_MS = float(os.environ.get("STARTUP_IMPORT_BUDGET_MS", "1500"))
+STARTUP_READY_BUDGET_MS = float(os.environ.get("STARTUP_READY_BUDGET_MS", "10000"))
+
+_lock = threading.Lock()
+_ready = threading.Event()
+_warmer: Optional[threading.Thread] = None
+_state = {"migrated": False, "warm_seconds": None, "error": None}
+
+
+def migrate(verbose: bool = True) -> int:
+    """Creates the tables and upgrades older databases. Returns the number of backfilled creators."""
+    from . import features
+    from .database import engine
+
+    backfilled = features.upgrade(engine, verbose=verbose)
+    _state["migrated"] = True
+    return backfilled
+
+
+def warm():
+    """Loads the roster snapshot and its constraint index, then marks the process ready."""
+    from . import snapshot
+
+    start = time.perf_counter()
+    try:
+        roster = snapshot.get_snapshot()
+        roster.index # Built on first use otherwise
+    except Exception as e:
+        logger.exception("Roster warm-up failed")
+        _state["error"] = f"{type(e).__name__}: {e}"
+        return
+    _state.update(warm_seconds=round(time.perf_counter() - start, 3), error=None)
+    logger.info("Roster warm: %d creators in %.2fs", len(roster), _state["warm_seconds"])
+    _ready.set()
+
+
+def _start_warming():
+    global _warmer
+    with _lock:
+        if _warmer is None or not _warmer.is_alive():
+            _warmer = threading.Thread(target=warm, name="roster-warmup", daemon=True)
+            _warmer.start()
+
+
+def start(jobs: bool = False):
+    """
+    What the app runs on startup: the migration (if enabled), then the
+    warm-up in the background. With `jobs` (the app serves /api/jobs), jobs
+    interrupted by a dead process are failed and old ones purged, also in
+    the background.
+    """
+    from . import shortlists
+
+    if MIGRATE_ON_STARTUP:
+        migrate(verbose=False)
+    if ROSTER_WARM_ON_STARTUP:
+        _start_warming()
+    else:
+        _ready.set() # The roster is built by the first match instead
+    if shortlists.SHORTLIST_REFRESH:
+        shortlists.match_shortlists.start()
+    if jobs:
+        from .jobs import job_queue
+        threading.Thread(target=job_queue.housekeeping, name="job-housekeeping", daemon=True).start()
+
+
+def wait_ready(timeout: Optional[float] = None) -> bool:
+    return _ready.wait(timeout)
+
+
+def readiness() -> dict:
+    """The /api/ready body. A warm-up that failed is retried (in the background) by the next call."""
+    from . import snapshot
+
+    ready = _ready.is_set()
+    if not ready and _state["error"] is not None and ROSTER_WARM_ON_STARTUP:
+        _start_warming()
+    roster = snapshot.loaded()
+    return {
+        "ready": ready,
+        "migrated": _state["migrated"],
+        "roster_version": roster.version if roster is not None else None,
+        "creators": len(roster) if roster is not None else None,
+        "warm_seconds": _state["warm_seconds"],
+        "error": _state["error"],
+    }
+
+
+# --- Startup time budget ---
+
+def _probe(ready: bool) -> float:
+    """Seconds to import app.main (and, with `ready`, to then start it and wait until it's ready)."""
+    start = time.perf_counter()
+    from . import main
+    if ready:
+        # What the app's lifespan does. (main's app.startup, not this __main__ copy of the module)
+        main.startup.start(jobs="jobs" in main.API_FEATURES)
+        main.startup.wait_ready()
+    return time.perf_counter() - start
+
+
+def measure(ready: bool, runs: int, features: Optional[str] = None) -> float:
+    """Median milliseconds of `_probe(ready)` over `runs` fresh interpreters."""
+    env = dict(os.environ)
+    if features is not None:
+        env["API_FEATURES"] = features
+    command = [sys.executable, "-m", "app.startup", "probe"] + (["--ready"] if ready else [])
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+        samples.append(float(out.strip().splitlines()[-1]) * 1000)
+    return statistics.median(samples)
+
+
+def check(import_budget_ms: float, ready_budget_ms: float, runs: int, features: Optional[str] = None) -> bool:
+    """Measures import and startup-to-ready time against their budgets. Prints the results; True if both fit."""
+    results = {
+        "import_ms": round(measure(False, runs, features), 1),
+        "import_budget_ms": import_budget_ms,
+        "ready_ms": round(measure(True, runs, features), 1),
+        "ready_budget_ms": ready_budget_ms,
+    }
+    results["ok"] = results["import_ms"] <= import_budget_ms and results["ready_ms"] <= ready_budget_ms
+    print(json.dumps(results, indent=2))
+    return results["ok"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Schema migration and startup-time checks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help="Create / upgrade the database schema")
+    checker = commands.add_parser("check", help="Measure import and startup-to-ready time against budgets")
+    checker.add_argument("--import-budget-ms", type=float, default=STARTUP_IMPORT_BUDGET_MS)
+    checker.add_argument("--ready-budget-ms", type=float, default=STARTUP_READY_BUDGET_MS)
+    checker.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement (the median counts)")
+    checker.add_argument("--features", help="API_FEATURES for the measured app, e.g. match (default: the environment's)")
+    probe = commands.add_parser("probe") # One measurement, run by `check` in a subprocess
+    probe.add_argument("--ready", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate()
+        print("Database schema is up to date.")
+    elif args.command == "check":
+        sys.exit(0 if check(args.import_budget_ms, args.ready_budget_ms, args.runs, args.features) else 1)
+    else:
+        print(_probe(args.ready))
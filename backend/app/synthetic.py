@@ -0,0 +1,116 @@
+# backend/app/synthetic.py
+
+import argparse
+import json
+import math
+import random
+from typing import Dict, Iterator, List
+from . import schemas
+
+# Synthetic creators and brand briefs for benchmarks and load tests.
+#
+# The shapes follow data/creators.json and data/brands.json; the value
+# distributions are rough but realistic: a long tail of views, prices that
+# track views, mostly-overlapping vocabularies with some case drift, and a
+# few malformed age buckets like the ones the scorer has to skip.
+
+VERTICALS = [
+    "Fitness", "Lifestyle", "Technology", "Education", "Food", "Fashion", "Travel", "Finance",
+    "Fintech", "Beauty", "Gaming", "Parenting", "Wellness", "Automotive", "Comedy", "Music",
+]
+PLATFORMS = ["Instagram", "YouTube", "Reels", "LinkedIn", "Twitter", "Moj", "ShareChat"]
+PLATFORM_WEIGHTS = [40, 30, 15, 6, 4, 3, 2]
+CITIES = [
+    "Mumbai", "Delhi", "Bengaluru", "Hyderabad", "Chennai", "Kolkata", "Pune", "Ahmedabad",
+    "Jaipur", "Lucknow", "Chandigarh", "Kochi", "Indore", "Surat", "Nagpur",
+]
+AGE_BUCKETS = ["13-17", "18-24", "25-34", "35-44", "45-54", "55+"] # "55+" doesn't parse, on purpose
+TONES = [
+    "energetic", "fun", "informative", "serious", "casual", "clean", "trustworthy",
+    "witty", "calm", "bold", "inspirational", "authentic",
+]
+
+
+def _pick(r: random.Random, values: List[str], low: int, high: int) -> List[str]:
+    return r.sample(values, r.randint(low, high))
+
+
+def _weighted_pick(r: random.Random, values: List[str], weights: List[int], k: int) -> List[str]:
+    """k distinct values, popular ones more likely."""
+    picked: Dict[str, None] = {}
+    while len(picked) < k:
+        picked[r.choices(values, weights)[0]] = None
+    return list(picked)
+
+
+def _shares(r: random.Random, keys: List[str], total: float) -> Dict[str, float]:
+    """Random shares over `keys` that add up to about `total`."""
+    weights = [r.random() + 0.1 for _ in keys]
+    scale = total / sum(weights)
+    return {k: round(w * scale, 2) for k, w in zip(keys, weights)}
+
+
+def _vary_case(r: random.Random, value: str) -> str:
+    return value.lower() if r.random() < 0.1 else value
+
+
+def creator(r: random.Random, i: int) -> dict:
+    """One creator record, as accepted by schemas.CreatorCreate."""
+    avg_views = 0 if r.random() < 0.01 else int(math.exp(r.gauss(11, 1.2))) # Median ~60k views
+    cost_per_view = math.exp(r.gauss(-0.3, 0.6)) # Median ~0.75 INR / view
+    base_price = max(5000, round(avg_views * cost_per_view, -3)) if avg_views else r.randint(5, 300) * 1000
+    return {
+        "handle": f"@creator{i}",
+        "verticals": [_vary_case(r, v) for v in _pick(r, VERTICALS, 1, 3)],
+        "platforms": _weighted_pick(r, PLATFORMS, PLATFORM_WEIGHTS, r.randint(1, 3)),
+        "audienceGeo": _shares(r, _pick(r, CITIES, 1, 4), r.uniform(0.4, 0.95)),
+        "audienceAge": _shares(r, _pick(r, AGE_BUCKETS, 1, 4), r.uniform(0.7, 1.0)),
+        "avgViews": avg_views,
+        "engagementRate": round(min(0.2, max(0.001, r.gauss(0.035, 0.015))), 4),
+        "pastBrandCategories": [_vary_case(r, v) for v in _pick(r, VERTICALS, 0, 3)],
+        "contentTone": _pick(r, TONES, 1, 3),
+        "safetyFlags": {"adult": r.random() < 0.05, "controversial": r.random() < 0.08},
+        "basePriceINR": int(base_price),
+    }
+
+
+def brief(r: random.Random) -> schemas.BrandBrief:
+    """One brand brief with a realistic mix of budgets, targets and constraints."""
+    min_age = r.randint(13, 35)
+    return schemas.BrandBrief(
+        category=_vary_case(r, r.choice(VERTICALS)),
+        budgetINR=int(math.exp(r.gauss(11.5, 0.8))), # Median ~100k INR
+        targetLocations=_pick(r, CITIES, 1, 4),
+        targetAges=[min_age, min_age + r.randint(5, 20)],
+        tone=_pick(r, TONES, 1, 3),
+        platforms=_pick(r, PLATFORMS[:4], 1, 2),
+        constraints={"noAdultContent": r.random() < 0.7, "timelineDays": r.choice([14, 21, 30])},
+    )
+
+
+def creators(count: int, seed: int = 0) -> Iterator[dict]:
+    r = random.Random(seed)
+    for i in range(count):
+        yield creator(r, i)
+
+
+def briefs(count: int, seed: int = 0) -> List[schemas.BrandBrief]:
+    r = random.Random(seed + 1) # Independent of the creator stream
+    return [brief(r) for _ in range(count)]
+
+
+def roster(count: int, seed: int = 0) -> List[schemas.Creator]:
+    """A validated in-memory roster with ids 1..count, without touching the database."""
+    return [schemas.Creator(id=i + 1, **data) for i, data in enumerate(creators(count, seed))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic creators as NDJSON (for app.ingest).")
+    parser.add_argument("path")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    with open(args.path, "w") as f:
+        for record in creators(args.count, args.seed):
+            f.write(json.dumps(record) + "\n")
+    print(f"Wrote {args.count:,} creators to {args.path}")
@@ -1,27 +1,55 @@
 # backend/app/validation.py
 
 import re
+from typing import List
 
 # NOTE: We are no longer raising HTTPException here. We will raise ValueError.
 # This makes the functions more reusable.
 
+# Compiled once at import; the bulk billing endpoints call these per row.
+GSTIN_PATTERN = re.compile(r"^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}Z[0-9A-Z]{1}$")
+PAN_PATTERN = re.compile(r"^[A-Z]{5}[0-9]{4}[A-Z]{1}$")
+IFSC_PATTERN = re.compile(r"^[A-Z]{4}0[A-Z0-9]{6}$")
+
+GSTIN_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_GSTIN_VALUES = {c: i for i, c in enumerate(GSTIN_CHARSET)}
+
 def validate_gstin(gstin: str) -> str:
     """Validates the format of a GSTIN. Returns the value if valid, else raises ValueError."""
-    pattern = re.compile(r"^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}Z[0-9A-Z]{1}$")
-    if not pattern.match(gstin):
+    if not GSTIN_PATTERN.match(gstin):
         raise ValueError(f"Invalid GSTIN format for '{gstin}'")
     return gstin
 
+def gstin_check_character(gstin: str) -> str:
+    """The check character (15th) for the first 14 characters of a GSTIN."""
+    # Weights alternate 1, 2; each product is folded into base 36 (quotient + remainder)
+    total = 0
+    for i, char in enumerate(gstin[:14]):
+        product = _GSTIN_VALUES[char] * (2 if i % 2 else 1)
+        total += product // 36 + product % 36
+    return GSTIN_CHARSET[(36 - total % 36) % 36]
+
+def validate_gstin_checksum(gstin: str) -> str:
+    """Validates the format and the check character of a GSTIN. Returns the value if valid, else raises ValueError."""
+    validate_gstin(gstin)
+    if gstin[14] != gstin_check_character(gstin):
+        raise ValueError(f"Invalid GSTIN checksum for '{gstin}'")
+    return gstin
+
 def validate_pan(pan: str) -> str:
     """Validates the format of a PAN card number. Returns the value if valid, else raises ValueError."""
-    pattern = re.compile(r"^[A-Z]{5}[0-9]{4}[A-Z]{1}$")
-    if not pattern.match(pan):
+    if not PAN_PATTERN.match(pan):
         raise ValueError(f"Invalid PAN format for '{pan}'")
     return pan
 
 def validate_ifsc(ifsc: str) -> str:
     """Validates the format of an IFSC code. Returns the value if valid, else raises ValueError."""
-    pattern = re.compile(r"^[A-Z]{4}0[A-Z0-9]{6}$")
-    if not pattern.match(ifsc):
+    if not IFSC_PATTERN.match(ifsc):
         raise ValueError(f"Invalid IFSC format for '{ifsc}'")
-    return ifsc
\ No newline at end of file
+    return ifsc
+
+def validate_age_range(ages: List[int]) -> List[int]:
+    """Validates a [min, max] target age range. Returns the value if valid, else raises ValueError."""
+    if len(ages) != 2 or ages[0] > ages[1]:
+        raise ValueError(f"Invalid age range {ages}: expected [min, max] with min <= max")
+    return ages
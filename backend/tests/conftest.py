@@ -0,0 +1,43 @@
+# backend/tests/conftest.py
+
+import os
+import sys
+import pytest
+
+# Run from anywhere: the tests import the `app` package from backend/
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# Never touch ./taag.db: the app's engine is created at import, so this has to
+# be set before any test imports it. Tests that need a file database (or a
+# fresh process) pass their own DATABASE_URL to a subprocess.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SHORTLIST_REFRESH", "0")
+
+
+# --- Shared matching fixtures: a synthetic roster and briefs, built once ---
+
+
+@pytest.fixture(scope="session")
+def creators():
+    from app import synthetic
+    return synthetic.roster(1500, seed=11)
+
+
+@pytest.fixture(scope="session")
+def roster(creators):
+    from ranking import make_roster
+    return make_roster(creators)
+
+
+@pytest.fixture(scope="session")
+def briefs():
+    from app import synthetic
+    return synthetic.briefs(30, seed=12)
+
+
+@pytest.fixture(scope="session")
+def expected(creators, briefs):
+    """The reference ranking of every brief."""
+    from ranking import reference
+    return [reference(brief, creators) for brief in briefs]
@@ -0,0 +1,38 @@
+# backend/tests/ranking.py
+
+from app import records, scoring
+from app.snapshot import RosterSnapshot
+
+# Every fast path must rank exactly like the per-creator reference scorer:
+# scoring.calculate_final_score for each creator, a stable sort by score,
+# then scoring.apply_diversification. Rankings are compared as
+# [(creator id, score, promoted)].
+
+PROMOTED = "Promoted for Diversity"
+
+
+def make_roster(creators, version: int = 1) -> RosterSnapshot:
+    return RosterSnapshot(version, [records.CreatorRecord.from_creator(c) for c in creators])
+
+
+def reference(brief, creators, limit=None):
+    """The ranking from the reference scorer."""
+    ranked = sorted((scoring.calculate_final_score(brief, c) for c in creators), key=lambda m: m.score, reverse=True)
+    ranked = scoring.apply_diversification(ranked)[:limit]
+    return [(m.creator.id, m.score, PROMOTED in m.reasons) for m in ranked]
+
+
+def selected(roster, selection):
+    """The ranking of a shards.Selection (or anything shaped like one)."""
+    cols, scores, order, promoted, roster_rows = selection
+    out = []
+    for row in map(int, order):
+        roster_row = row if roster_rows is None else int(roster_rows[row])
+        score = float(scores.final[row]) if scores.qualified[row] else 0.0
+        out.append((int(roster.ids[roster_row]), score, row == promoted))
+    return out
+
+
+def from_json(items):
+    """The ranking of serialized match results."""
+    return [(m["creator"]["id"], m["score"], PROMOTED in m["reasons"]) for m in items]
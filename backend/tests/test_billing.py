@@ -0,0 +1,41 @@
+# backend/tests/test_billing.py
+
+import io
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app import billing, billing_routes
+
+CREATOR_ROWS = 'name,pan\nAsha Rao,ABCPR1234F\n'
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(billing_routes.router)
+    return TestClient(app)
+
+
+def test_non_utf8_upload_is_rejected_before_streaming(client):
+    body = CREATOR_ROWS.encode() + "Zoë Singh,ABCPS1234F\n".encode("latin-1")
+    response = client.post("/api/billing/creator/bulk", content=body, headers={"content-type": "text/csv"})
+    assert response.status_code == 400
+    assert "not UTF-8" in response.json()["detail"]
+
+
+def test_utf8_upload_with_bom_is_accepted():
+    upload = io.BytesIO(b"\xef\xbb\xbf" + "name,pan\nZoë Singh,ABCPS1234F\n".encode())
+    billing.check_encoding(upload)
+    assert upload.tell() == 0
+    rows = list(billing.read_rows(upload, "csv"))
+    assert rows == [(1, {"name": "Zoë Singh", "pan": "ABCPS1234F"}, None)]
+
+
+def test_unchecked_non_utf8_rows_are_reported_per_row():
+    # The job path reads its input file without the up-front check
+    upload = io.BytesIO(CREATOR_ROWS.encode() + b"Zo\xeb Singh,ABCPS1234F\n" * 5000 + b"Ravi Iyer,ABCPI1234F\n")
+    lines = [json.loads(line) for line in "".join(billing.process(upload, "csv", billing.CREATOR)).splitlines()]
+    assert lines[-1]["summary"]["rows"] == 5002
+    assert [line["errors"] == ["Row is not valid UTF-8"] for line in lines[:-1]] == [False] + [True] * 5000 + [False]
+    assert (lines[0]["name"], lines[-2]["name"]) == ("Asha Rao", "Ravi Iyer") # Schema errors only
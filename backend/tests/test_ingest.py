@@ -0,0 +1,33 @@
+# backend/tests/test_ingest.py
+
+import json
+from app import ingest, synthetic
+
+
+def test_malformed_lines_are_reported_and_skipped(tmp_path):
+    creators = [dict(c, handle=c["handle"] + "-ingest") for c in synthetic.creators(3, seed=21)]
+    lines = [
+        json.dumps(creators[0]),
+        '{"handle": "@broken", ', # Cut off
+        json.dumps(creators[1]),
+        "[1, 2]", # Not an object
+        json.dumps({"handle": "@incomplete"}), # Fails validation
+        "",
+        json.dumps(creators[2]),
+    ]
+    path = tmp_path / "creators.ndjson"
+    path.write_text("\n".join(lines) + "\n")
+
+    stats = ingest.ingest_file(str(path), "creators", batch_size=2, verbose=False)
+    assert (stats["read"], stats["inserted"], stats["invalid"]) == (6, 3, 3)
+    assert [error.split(":")[0] for error in stats["errors"]] == ["line 2", "line 4", "@incomplete"]
+
+
+def test_resumed_read_keeps_line_numbers(tmp_path):
+    path = tmp_path / "creators.ndjson"
+    path.write_bytes(b'{"a": 1}\n{"b": 2}\nnot json\n')
+    with open(path, "rb") as f:
+        first = next(ingest._iter_ndjson(f, 0))
+        invalid, _ = next(ingest._iter_ndjson(f, len(b'{"a": 1}\n{"b": 2}\n')))
+    assert first == ({"a": 1}, 9)
+    assert invalid.line == 3
@@ -0,0 +1,48 @@
+# backend/tests/test_jobs.py
+
+import socket
+import subprocess
+import sys
+import time
+from app import jobs, models, startup
+from app.database import SessionLocal
+
+
+def _orphan(job_id: str, status: str):
+    """A job row left behind by a process on this host that has exited."""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    with SessionLocal() as db:
+        db.add(models.Job(id=job_id, kind="seed", status=status, params={}, worker=f"{socket.gethostname()}:{process.pid}",
+                          cancelRequested=False, done=0, createdAt=time.time()))
+        db.commit()
+
+
+def test_orphaned_jobs_fail_on_first_lookup(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOBS_DIR", str(tmp_path))
+    startup.migrate(False)
+    _orphan("orphan-running", jobs.RUNNING)
+    _orphan("orphan-queued", jobs.QUEUED)
+
+    queue = jobs.JobQueue(workers=0) # No submit(), no worker threads
+    assert queue.get("orphan-running").status == jobs.FAILED
+    assert {job.id: job.status for job in queue.list()}["orphan-queued"] == jobs.FAILED
+
+
+def test_orphaned_jobs_fail_at_startup(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOBS_DIR", str(tmp_path))
+    monkeypatch.setattr(startup, "ROSTER_WARM_ON_STARTUP", False)
+    startup.migrate(False)
+    _orphan("orphan-at-startup", jobs.RUNNING)
+    monkeypatch.setattr(jobs, "job_queue", jobs.JobQueue(workers=0))
+
+    startup.start(jobs=True)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        with SessionLocal() as db:
+            if db.get(models.Job, "orphan-at-startup").status == jobs.FAILED:
+                break
+        time.sleep(0.05)
+    with SessionLocal() as db:
+        job = db.get(models.Job, "orphan-at-startup")
+        assert job.status == jobs.FAILED and "Interrupted" in job.error
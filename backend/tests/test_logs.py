@@ -0,0 +1,17 @@
+# backend/tests/test_logs.py
+
+import logging
+from app import logs
+
+
+def _record(name: str, level: int) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 0, "message", None, None)
+
+
+def test_only_the_hot_path_loggers_are_sampled():
+    never = logs.SampleFilter(0.0)
+    assert never.filter(_record("app.jobs", logging.INFO))
+    assert never.filter(_record("app.startup", logging.INFO))
+    assert not never.filter(_record(logs.sampled_logger("app.columnar").name, logging.INFO))
+    assert not never.filter(_record(logs.sampled_logger("app.scoring").name, logging.DEBUG))
+    assert never.filter(_record(logs.sampled_logger("app.columnar").name, logging.WARNING))
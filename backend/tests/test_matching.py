@@ -0,0 +1,29 @@
+# backend/tests/test_matching.py
+
+import pytest
+from app import columnar, scoring
+from ranking import selected
+
+# The columnar engine against the reference scorer (see ranking.py).
+
+
+def test_reference_briefs_exercise_diversification(expected):
+    # Otherwise the promotion checks below would prove nothing
+    assert any(promoted for ranking in expected for _, _, promoted in ranking)
+
+
+def test_columnar_match_equals_reference(creators, roster, briefs):
+    for brief in briefs:
+        ranked = sorted((scoring.calculate_final_score(brief, c) for c in creators), key=lambda m: m.score, reverse=True)
+        want = scoring.apply_diversification(ranked)
+        got = columnar.match(brief, roster.columns, roster.index)
+        assert [m.creator.id for m in got] == [m.creator.id for m in want]
+        assert [m.score for m in got] == [m.score for m in want]
+        assert [set(m.reasons) for m in got] == [set(m.reasons) for m in want]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 10, 100])
+def test_columnar_select_with_limit(roster, briefs, expected, limit):
+    for brief, want in zip(briefs, expected):
+        scores, order, promoted = columnar.select(brief, roster.columns, roster.index, limit)
+        assert selected(roster, (roster.columns, scores, order, promoted, None)) == want[:limit]
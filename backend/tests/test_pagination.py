@@ -0,0 +1,34 @@
+# backend/tests/test_pagination.py
+
+import json
+import pytest
+from app import pagination
+from ranking import from_json, make_roster
+
+
+def test_pages_follow_the_reference_ranking(roster, briefs, expected):
+    for brief, want in zip(briefs[:6], expected):
+        items, cursor = [], None
+        while True:
+            page = json.loads(pagination.match_page(brief, roster, cursor, 97))
+            items.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert from_json(items) == want
+
+
+def test_stream_follows_the_reference_ranking(roster, briefs, expected):
+    for brief, want in zip(briefs[:6], expected):
+        lines = "".join(pagination.stream_matches(brief, roster, limit=700, chunk_size=50)).splitlines()
+        assert from_json(map(json.loads, lines)) == want[:700]
+
+
+def test_cursor_is_tied_to_brief_and_roster_version(creators, roster, briefs):
+    cursor = json.loads(pagination.match_page(briefs[0], roster, None, 5))["next_cursor"]
+    with pytest.raises(pagination.CursorError):
+        pagination.match_page(briefs[1], roster, cursor, 5)
+    with pytest.raises(pagination.CursorError):
+        pagination.match_page(briefs[0], make_roster(creators, version=2), cursor, 5)
+    with pytest.raises(pagination.CursorError):
+        pagination.match_page(briefs[0], roster, "not-a-cursor", 5)
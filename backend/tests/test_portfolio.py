@@ -0,0 +1,53 @@
+# backend/tests/test_portfolio.py
+
+from itertools import combinations
+import numpy as np
+import pytest
+from app import portfolio
+
+
+def brute_force(values, prices, groups, budget, group_cap, max_items):
+    """The best total value over every feasible subset."""
+    best = 0.0
+    n = len(values)
+    for size in range(1, n + 1 if max_items is None else min(n, max_items) + 1):
+        for rows in combinations(range(n), size):
+            rows = list(rows)
+            if prices[rows].sum() > budget:
+                continue
+            if group_cap is not None:
+                capped = groups[rows][groups[rows] >= 0]
+                if len(capped) and np.bincount(capped).max() > group_cap:
+                    continue
+            best = max(best, float(values[rows].sum()))
+    return best
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_solve_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 13))
+    values = rng.uniform(0.1, 100, n).round(2)
+    prices = rng.integers(1_000, 50_000, n)
+    groups = rng.integers(-1, 3, n) # -1: uncapped
+    budget = int(rng.integers(1_000, prices.sum() + 1))
+    group_cap = [None, 1, 2][seed % 3]
+    max_items = [None, 3][seed % 2]
+
+    result = portfolio.solve(values, prices, groups, budget, group_cap, max_items, time_limit=5.0)
+    rows = result.rows
+    assert result.optimal
+    assert result.value == pytest.approx(brute_force(values, prices, groups, budget, group_cap, max_items))
+    assert result.value == pytest.approx(values[rows].sum())
+    assert result.cost == prices[rows].sum() <= budget
+    assert len(set(rows.tolist())) == len(rows)
+    if max_items is not None:
+        assert len(rows) <= max_items
+    if group_cap is not None:
+        capped = groups[rows][groups[rows] >= 0]
+        assert len(capped) == 0 or np.bincount(capped).max() <= group_cap
+
+
+def test_solve_with_nothing_affordable():
+    result = portfolio.solve(np.array([5.0, 3.0]), np.array([200, 300]), np.array([0, 1]), budget=100)
+    assert len(result.rows) == 0 and result.value == 0 and result.optimal
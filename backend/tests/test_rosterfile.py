@@ -0,0 +1,63 @@
+# backend/tests/test_rosterfile.py
+
+import os
+import subprocess
+import sys
+from collections import deque
+from app import columnar, rosterfile, snapshot
+from conftest import BACKEND
+from ranking import make_roster, reference, selected
+
+# Exports are loaded by a fresh process, like a worker starting up.
+
+ADD_CREATORS = """
+import sys
+from app import crud, schemas, startup, synthetic
+from app.database import SessionLocal
+startup.migrate(False)
+with SessionLocal() as db:
+    for c in synthetic.creators(int(sys.argv[1]), int(sys.argv[2])):
+        crud.create_creator(db, schemas.CreatorCreate(**dict(c, handle=c["handle"] + "-" + sys.argv[2])))
+"""
+LOAD = "from app import snapshot; roster = snapshot.get_snapshot(); print(len(roster), roster.path is not None)"
+
+
+def _run(tmp_path, *args, roster_file=None) -> str:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'roster.db'}", SHORTLIST_REFRESH="0")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [BACKEND, env.get("PYTHONPATH")]))
+    if roster_file:
+        env["ROSTER_FILE"] = roster_file
+    return subprocess.run([sys.executable, *args], cwd=BACKEND, env=env, check=True, capture_output=True, text=True).stdout
+
+
+def test_outdated_roster_file_is_not_used(tmp_path):
+    path = str(tmp_path / "roster.bin")
+    _run(tmp_path, "-c", ADD_CREATORS, "40", "1")
+    _run(tmp_path, "-m", "app.rosterfile", "export", path)
+    assert _run(tmp_path, "-c", LOAD, roster_file=path).split() == ["40", "True"]
+
+    # Written after the export: the file must not hide them
+    _run(tmp_path, "-c", ADD_CREATORS, "3", "2")
+    assert _run(tmp_path, "-c", LOAD, roster_file=path).split() == ["43", "False"]
+
+
+
+def test_creators_added_to_a_mapped_roster_stay_lazy(tmp_path, creators, briefs, monkeypatch):
+    path = str(tmp_path / "roster.bin")
+    rosterfile.write(path, make_roster(creators[:-2]))
+    # A private copy of the process-wide snapshot state
+    monkeypatch.setattr(snapshot, "_snapshot", snapshot.load_file(path))
+    monkeypatch.setattr(snapshot, "_db_generation", None)
+    monkeypatch.setattr(snapshot, "_generation", 0)
+    monkeypatch.setattr(snapshot, "_changes", deque())
+    for creator in creators[-2:]: # Inserted after the export
+        snapshot.on_creator_saved(creator)
+    roster = snapshot.loaded()
+
+    assert roster.ids.tolist() == [c.id for c in creators]
+    assert len(roster.creators._parsed) == 0 # Nothing decoded from the file to append
+    for brief in briefs[:5]:
+        scores, order, promoted = columnar.select(brief, roster.columns, roster.index, 20)
+        assert selected(roster, (roster.columns, scores, order, promoted, None)) == reference(brief, creators, 20)
+    last = len(creators) - 1
+    assert roster.fragments.creator(last) == make_roster(creators).fragments.creator(last)
@@ -0,0 +1,65 @@
+# backend/tests/test_sessions.py
+
+import pytest
+from pydantic import ValidationError
+from app import schemas, sessions, synthetic
+from ranking import make_roster, reference, selected
+
+
+def _patches(brief):
+    """Edits touching every brief field, one or two at a time."""
+    tones = [t for t in synthetic.TONES if t not in brief.tone]
+    yield {"budgetINR": brief.budgetINR // 2}
+    yield {"budgetINR": brief.budgetINR * 3}
+    yield {"tone": list(brief.tone) + tones[:1]} # Addition only
+    yield {"tone": tones[1:3]}
+    yield {"targetLocations": list(brief.targetLocations) + ["Pune"]} # Append
+    yield {"targetLocations": ["Delhi"]}
+    yield {"targetAges": [25, 40]}
+    yield {"category": "Tech"}
+    yield {"platforms": ["YouTube"]}
+    yield {"constraints": {"noAdultContent": not brief.constraints.get("noAdultContent")}}
+    yield {"category": brief.category, "budgetINR": brief.budgetINR, "platforms": list(brief.platforms)}
+
+
+def test_session_updates_equal_reference(creators, roster, briefs):
+    for brief in briefs[:5]:
+        session = sessions.MatchSession("test", brief, roster)
+        current = brief
+        for patch in _patches(brief):
+            current = current.model_copy(update=patch)
+            session.update(current, roster)
+            scores, order, promoted = session.select()
+            assert selected(roster, (roster.columns, scores, order, promoted, None)) == reference(current, creators)
+
+
+def test_session_rescored_on_a_new_roster(creators, roster, briefs):
+    session = sessions.MatchSession("test", briefs[0], roster)
+    session.park()
+    other = make_roster(creators, version=2)
+    session.update(briefs[1], other)
+    scores, order, promoted = session.select(20)
+    assert selected(other, (other.columns, scores, order, promoted, None)) == reference(briefs[1], creators, 20)
+
+
+@pytest.mark.parametrize("ages", [[1, 2, 3], [30], [], [40, 25]])
+def test_patch_rejects_an_invalid_age_range(ages):
+    with pytest.raises(ValidationError):
+        schemas.BrandBriefPatch(targetAges=ages)
+
+
+def test_failed_update_leaves_the_session_unchanged(creators, roster, briefs, monkeypatch):
+    session = sessions.MatchSession("test", briefs[0], roster)
+    before = session.select()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(sessions.columnar, "age_overlaps", fail)
+    edited = briefs[0].model_copy(update={"budgetINR": briefs[0].budgetINR * 2, "targetAges": [20, 30]})
+    with pytest.raises(RuntimeError):
+        session.update(edited, roster)
+
+    assert session.brief == briefs[0]
+    scores, order, promoted = session.select()
+    assert selected(roster, (roster.columns, scores, order, promoted, None)) == \
+        selected(roster, (roster.columns, *before, None)) == reference(briefs[0], creators)
@@ -0,0 +1,19 @@
+# backend/tests/test_shards.py
+
+from app import shards
+from ranking import selected
+
+
+def test_sharded_select_equals_reference(roster, briefs, expected, monkeypatch):
+    monkeypatch.setattr(shards, "MATCH_SHARDS", 3)
+    monkeypatch.setattr(shards, "SHARD_MIN_ROSTER", 0)
+    try:
+        for brief, want in zip(briefs[:8], expected):
+            for limit in (1, 5, 40):
+                selection = shards.select(brief, roster, limit)
+                assert selection.roster_rows is not None # Really went through the workers
+                assert selected(roster, selection) == want[:limit]
+    finally:
+        if shards._pool is not None:
+            shards._pool.shutdown()
+            shards._pool = None
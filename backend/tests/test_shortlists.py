@@ -0,0 +1,51 @@
+# backend/tests/test_shortlists.py
+
+import numpy as np
+import pytest
+from app import shortlists
+from ranking import make_roster, reference, selected
+
+
+def _edited(creators, rng, count):
+    """A copy of `creators` where `count` of them took another creator's attributes (ids / handles kept)."""
+    edited = list(creators)
+    rows = rng.choice(len(creators), count, replace=False)
+    for row in rows:
+        donor = creators[int(rng.integers(len(creators)))]
+        edited[row] = donor.model_copy(update={"id": creators[row].id, "handle": creators[row].handle})
+    return edited, {creators[row].id for row in rows}
+
+
+@pytest.mark.parametrize("kind", ["brief", "combo"])
+def test_shortlists_serve_exact_rankings(creators, roster, briefs, kind):
+    rng = np.random.default_rng(13)
+    edited, changed = _edited(creators, rng, 25)
+    later = make_roster(edited, version=2)
+    served = 0
+    for brief in briefs:
+        if kind == "brief":
+            shortlist = shortlists.build_brief(brief, roster, size=60)
+            serve = shortlists.serve_brief
+        else:
+            shortlist = shortlists.build_combo(*shortlists.combo_key(brief), roster)
+            serve = shortlists.serve_combo
+        for target, target_creators, target_changed in ((roster, creators, set()), (later, edited, changed)):
+            assert shortlists.valid(shortlist, target)
+            want = reference(brief, target_creators)
+            for limit in (1, 3, 10, 59, 80):
+                selection = serve(shortlist, brief, target, limit, target_changed)
+                if selection is None: # Couldn't be proven exact; /api/match scores the whole roster
+                    continue
+                served += 1
+                assert selected(target, selection) == want[:limit]
+    assert served > 0
+
+
+def test_store_serves_the_dashboards_top_n(creators, roster, briefs, expected):
+    store = shortlists.ShortlistStore()
+    store.refresh(briefs, roster, max_builds=10**6)
+    for brief, want in zip(briefs, expected):
+        selection = store.select(brief, roster, 50) # MATCH_LIMIT in frontend/app/dashboard/page.tsx
+        assert selection is not None
+        assert selected(roster, selection) == want[:50]
+    assert store.hits["brief"] == len(briefs)
@@ -0,0 +1,33 @@
+# backend/tests/test_validation.py
+
+import pytest
+from app import validation
+
+VALID_GSTIN = "27AAPFU0939F1ZV"
+
+
+def test_valid_gstin_passes():
+    assert validation.validate_gstin_checksum(VALID_GSTIN) == VALID_GSTIN
+    assert validation.gstin_check_character(VALID_GSTIN) == VALID_GSTIN[14]
+
+
+def test_wrong_check_character_is_rejected():
+    for char in validation.GSTIN_CHARSET:
+        if char != VALID_GSTIN[14]:
+            with pytest.raises(ValueError, match="checksum"):
+                validation.validate_gstin_checksum(VALID_GSTIN[:14] + char)
+
+
+def test_single_character_typos_are_caught():
+    # Any one changed character in the PAN part changes the check character
+    for i in (2, 3, 7, 9, 11):
+        for char in "ABCDE" if VALID_GSTIN[i].isalpha() else "01234":
+            if char != VALID_GSTIN[i]:
+                with pytest.raises(ValueError, match="checksum"):
+                    validation.validate_gstin_checksum(VALID_GSTIN[:i] + char + VALID_GSTIN[i + 1:])
+
+
+@pytest.mark.parametrize("gstin", ["", "27AAPFU0939F1Z", "27aapfu0939f1zv", "27AAPFU0939F1XV", "AAAPFU0939F1ZVV"])
+def test_bad_format_is_rejected(gstin):
+    with pytest.raises(ValueError, match="format"):
+        validation.validate_gstin_checksum(gstin)
@@ -27,6 +27,11 @@ import Link from 'next/link';
 
 type View = 'brief' | 'match' | 'billing';
 
+// The Match Console lists the best creators only. Asking the API for a top N
+// (rather than the whole ranked roster) also lets it answer from its
+// precomputed shortlists.
+const MATCH_LIMIT = 50;
+
 export default function DashboardPage() {
   const [user, setUser] = useState<User | null>(null);
   const [activeView, setActiveView] = useState<View>('brief');
@@ -62,7 +67,7 @@ export default function DashboardPage() {
     setActiveView('match');
 
     try {
-      const response = await fetch('http://127.0.0.1:8000/api/match', {
+      const response = await fetch(`http://127.0.0.1:8000/api/match?limit=${MATCH_LIMIT}`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({